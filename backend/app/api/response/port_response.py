@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -8,4 +10,9 @@ class PortResponse(BaseModel):
     service: str
     banner: str | None
     state: str
+    tls_subject: str | None
+    tls_issuer: str | None
+    tls_san: str | None
+    tls_not_after: datetime | None
+    tls_sha256: str | None
     
\ No newline at end of file
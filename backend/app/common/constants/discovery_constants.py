@@ -7,29 +7,68 @@ MDNS_AUTHORITY_COUNT: Final[int] = 0
 MDNS_DEVICE_NAME_PREFIX: Final[str] = "mDNS-"
 MDNS_DEVICE_TYPE: Final[str] = "mDNS/Bonjour Device"
 MDNS_FLAGS: Final[int] = 0x0000
-MDNS_HEADER_LENGTH: Final[int] = 12
+MDNS_MULTICAST_GROUP: Final[str] = "224.0.0.251"
 MDNS_PORT: Final[int] = 5353
 MDNS_PROTOCOL_NAME: Final[str] = "mdns"
 MDNS_QUESTIONS_COUNT: Final[int] = 1
 MDNS_SERVICE_QUERY: Final[bytes] = b'\x09_services\x07_dns-sd\x04_udp\x05local\x00\x00\x0c\x00\x01'
 MDNS_TRANSACTION_ID: Final[int] = 0x0000
 
+# mDNS record interpretation
+MDNS_LOCAL_SUFFIX: Final[str] = ".local"
+MDNS_SERVICE_ENUMERATION_NAME: Final[str] = "_services._dns-sd._udp.local"
+MDNS_SERVICE_LABEL_PREFIX: Final[str] = "_"
+MDNS_MODEL_TXT_KEYS: Final[tuple[str, ...]] = ("model", "md", "ty", "usb_mdl")
+MDNS_MANUFACTURER_TXT_KEYS: Final[tuple[str, ...]] = ("manufacturer", "usb_mfg", "mfg")
+
+# DNS message constants
+DNS_HEADER_FORMAT: Final[str] = '>HHHHHH'
+DNS_HEADER_LENGTH: Final[int] = 12
+DNS_QUESTION_TRAILER_LENGTH: Final[int] = 4
+DNS_RECORD_FORMAT: Final[str] = '>HHIH'
+DNS_RECORD_FIXED_LENGTH: Final[int] = 10
+DNS_POINTER_MASK: Final[int] = 0xC0
+DNS_POINTER_LENGTH: Final[int] = 2
+DNS_MAX_POINTER_JUMPS: Final[int] = 32
+DNS_LABEL_SEPARATOR: Final[str] = "."
+DNS_TYPE_A: Final[int] = 1
+DNS_TYPE_CNAME: Final[int] = 5
+DNS_TYPE_PTR: Final[int] = 12
+DNS_TYPE_TXT: Final[int] = 16
+DNS_TYPE_AAAA: Final[int] = 28
+DNS_TYPE_SRV: Final[int] = 33
+DNS_SRV_PORT_FORMAT: Final[str] = '>H'
+DNS_SRV_PORT_OFFSET: Final[int] = 4
+DNS_SRV_TARGET_OFFSET: Final[int] = 6
+DNS_IPV4_LENGTH: Final[int] = 4
+DNS_IPV6_LENGTH: Final[int] = 16
+TXT_ATTRIBUTE_SEPARATOR: Final[str] = "="
+
 # NetBIOS constants
 NETBIOS_ADDITIONAL_COUNT: Final[int] = 0
 NETBIOS_ANSWERS_COUNT: Final[int] = 0
 NETBIOS_AUTHORITY_COUNT: Final[int] = 0
 NETBIOS_HEADER_LENGTH: Final[int] = 12
-NETBIOS_MAX_NAME_LENGTH: Final[int] = 15
-NETBIOS_MIN_RESPONSE_LENGTH: Final[int] = 50
-NETBIOS_MIN_WORD_LENGTH: Final[int] = 2
-NETBIOS_NAME_LENGTH: Final[bytes] = b'\x20'
 NETBIOS_PORT: Final[int] = 137
 NETBIOS_PROTOCOL_NAME: Final[str] = "netbios"
-NETBIOS_QUERY_FLAGS: Final[int] = 0x0110
-NETBIOS_QUERY_SUFFIX: Final[bytes] = b'\x00\x00\x20\x00\x01'
+NETBIOS_QUERY_FLAGS: Final[int] = 0x0000
 NETBIOS_QUESTIONS_COUNT: Final[int] = 1
 NETBIOS_TRANSACTION_ID: Final[int] = 0x1234
-NETBIOS_WILDCARD: Final[bytes] = b'A' * 31
+NETBIOS_TRANSACTION_ID_MASK: Final[int] = 0xFFFF
+NETBIOS_WILDCARD_NAME: Final[bytes] = b'\x20CK' + b'A' * 30 + b'\x00'
+NETBIOS_NBSTAT_QUESTION: Final[bytes] = b'\x00\x21\x00\x01'
+
+# NetBIOS node status reply layout
+NETBIOS_NBSTAT_TYPE: Final[int] = 0x0021
+NETBIOS_RESOURCE_FORMAT: Final[str] = '>HHIH'
+NETBIOS_NAME_POINTER_MASK: Final[int] = 0xC0
+NETBIOS_NAME_POINTER_LENGTH: Final[int] = 2
+NETBIOS_NAME_ENTRY_LENGTH: Final[int] = 18
+NETBIOS_NAME_FIELD_LENGTH: Final[int] = 15
+NETBIOS_NAME_PADDING: Final[str] = ' \x00'
+NETBIOS_GROUP_NAME_FLAG: Final[int] = 0x8000
+NETBIOS_WORKSTATION_SUFFIX: Final[int] = 0x00
+NETBIOS_MAC_LENGTH: Final[int] = 6
 
 # UPnP / SSDP / common discovery constants
 UPNP_DEVICE_TYPE: Final[str] = "UPnP Device"
@@ -44,8 +83,25 @@ UPNP_PROTOCOL_NAME: Final[str] = "upnp"
 UPNP_SERVER_HEADER_PREFIX: Final[str] = 'SERVER:'
 UPNP_SPLIT_LIMIT: Final[int] = 1
 
-DEVICE_INFO_SERVICE_TYPE: Final[bytes] = b'_device-info._tcp'
-HTTP_SERVICE_TYPE: Final[bytes] = b'_http._tcp'
+# SSDP sweep constants
+SSDP_MULTICAST_GROUP: Final[str] = "239.255.255.250"
+SSDP_RESPONSE_SLACK_S: Final[float] = 0.5
+SSDP_SERVER_HEADER: Final[str] = "server"
+SSDP_ST_HEADER_NAME: Final[str] = "st"
+SSDP_USN_HEADER: Final[str] = "usn"
+SSDP_LOCATION_HEADER: Final[str] = "location"
+UPNP_DESCRIPTION_MAX_BYTES: Final[int] = 65536
+UPNP_DEVICE_NAMESPACE: Final[str] = "{urn:schemas-upnp-org:device-1-0}"
+UPNP_DEVICE_ELEMENT: Final[str] = "device"
+UPNP_FRIENDLY_NAME_ELEMENT: Final[str] = "friendlyName"
+UPNP_DEVICE_TYPE_ELEMENT: Final[str] = "deviceType"
+UPNP_MANUFACTURER_ELEMENT: Final[str] = "manufacturer"
+UPNP_MODEL_NAME_ELEMENT: Final[str] = "modelName"
+ETAG_HEADER: Final[str] = "ETag"
+IF_NONE_MATCH_HEADER: Final[str] = "If-None-Match"
+HTTP_OK_STATUS: Final[int] = 200
+HTTP_NOT_MODIFIED: Final[int] = 304
+
 IP_SEPARATOR: Final[str] = '.'
 LAST_OCTET_INDEX: Final[int] = -1
 ASCII_ENCODING: Final[str] = 'ascii'
@@ -53,5 +109,9 @@ HTTP_OK_RESPONSE: Final[str] = "HTTP/1.1 200 OK"
 ST_HEADER_PREFIX: Final[str] = 'ST:'
 WINDOWS_DEVICE_TYPE: Final[str] = "Windows/SMB Device"
 
+# Multicast sweep constants
+MULTICAST_TTL: Final[int] = 255
+MULTICAST_RECV_BUFFER_SIZE: Final[int] = 9000
+
 CRLF: Final[str] = "\r\n"
 STRUCT_PACK_FORMAT: Final[str] = '>HHHHHH'
\ No newline at end of file
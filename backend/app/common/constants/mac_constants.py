@@ -3,4 +3,44 @@ from typing import Final
 # MAC service constants
 BROADCAST_MAC_ADDRESS: Final[str] = "ff:ff:ff:ff:ff:ff"
 MAC_ADDRESS_ATTR: Final[str] = "hwsrc"
-MAC_OUI_LENGTH: Final[int] = 6
\ No newline at end of file
+MAC_OUI_LENGTH: Final[int] = 6
+ARP_SOURCE_IP_ATTR: Final[str] = "psrc"
+
+# OUI index constants
+MAC_BITS: Final[int] = 48
+MAC_HEX_DIGITS: Final[int] = 12
+MAC_FIRST_OCTET_SHIFT: Final[int] = 40
+MAC_MULTICAST_BIT: Final[int] = 0x01
+MAC_LOCALLY_ADMINISTERED_BIT: Final[int] = 0x02
+MAC_LOCALLY_ADMINISTERED_VENDOR: Final[str] = "Locally administered"
+MAC_SEPARATOR_TABLE: Final[dict[int, None]] = str.maketrans("", "", ":-. ")
+OUI_PREFIX_BITS: Final[tuple[int, ...]] = (36, 28, 24)  # MA-S, MA-M, MA-L, most specific first
+OUI_REGISTRY_PATH_SEPARATOR: Final[str] = ","
+OUI_CSV_SUFFIX: Final[str] = ".csv"
+OUI_CSV_ASSIGNMENT_FIELD: Final[int] = 1
+OUI_CSV_VENDOR_FIELD: Final[int] = 2
+OUI_LINE_SEPARATOR: Final[str] = ":"
+
+# Routing table constants
+ROUTE_TABLE_PATH: Final[str] = "/proc/net/route"
+ROUTE_IFACE_FIELD: Final[int] = 0
+ROUTE_DESTINATION_FIELD: Final[int] = 1
+ROUTE_FLAGS_FIELD: Final[int] = 3
+ROUTE_METRIC_FIELD: Final[int] = 6
+ROUTE_MASK_FIELD: Final[int] = 7
+ROUTE_MIN_FIELDS: Final[int] = 8
+ROUTE_FLAG_UP: Final[int] = 0x0001
+UDP_PROBE_PORT: Final[int] = 9
+
+# Neighbor table constants
+IP_NEIGH_COMMAND: Final[list[str]] = ["ip", "-s", "-j", "neigh", "show"]
+IP_NEIGH_TIMEOUT_S: Final[int] = 5
+NEIGHBOR_STATE_REACHABLE: Final[str] = "REACHABLE"
+NEIGHBOR_STATE_STALE: Final[str] = "STALE"
+NEIGHBOR_USABLE_STATES: Final[tuple[str, ...]] = (NEIGHBOR_STATE_REACHABLE, NEIGHBOR_STATE_STALE)
+PROC_ARP_PATH: Final[str] = "/proc/net/arp"
+PROC_ARP_IP_FIELD: Final[int] = 0
+PROC_ARP_FLAGS_FIELD: Final[int] = 2
+PROC_ARP_MAC_FIELD: Final[int] = 3
+PROC_ARP_MIN_FIELDS: Final[int] = 4
+PROC_ARP_FLAG_COMPLETE: Final[int] = 0x2
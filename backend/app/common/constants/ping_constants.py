@@ -6,6 +6,7 @@ PLATFORM_LINUX: Final[str] = "Linux"
 PLATFORM_MACOS: Final[str] = "Darwin"
 SUCCESSFUL_PING_EXIT_CODE: Final[int] = 0
 TTL_REGEX: Final[str] = r'[tT][tT][lL][=](\d+)'
+RTT_REGEX: Final[str] = r'time[=<]\s?(\d+(?:\.\d+)?)\s?ms'
 ROUTER_TTL_TEMPLATE: Final[str] = "{os_name} (via router)"
 UNKNOWN_OS_TEMPLATE: Final[str] = "Unknown (TTL: {ttl})"
 TTL_OS_MAPPING: Final[dict[int, str]] = {
@@ -15,4 +16,36 @@ TTL_OS_MAPPING: Final[dict[int, str]] = {
     64: "Linux/Unix/macOS",
     128: "Windows XP/Vista/7/8/10/11",
     255: "Cisco/Network Device",
-}
\ No newline at end of file
+}
+
+# ICMP sweep constants
+ICMP_ECHO_REQUEST: Final[int] = 8
+ICMP_ECHO_REPLY: Final[int] = 0
+ICMP_HEADER_FORMAT: Final[str] = '!BBHHH'
+ICMP_HEADER_LENGTH: Final[int] = 8
+ICMP_PAYLOAD: Final[bytes] = b'SimpleNetworkMonitor'
+ICMP_RECV_BUFFER_SIZE: Final[int] = 2048
+IP_HEADER_TTL_OFFSET: Final[int] = 8
+IP_RECVTTL_OPTION: Final[int] = 12  # Linux value, not exported by the socket module
+IP_TTL_CMSG_TYPE: Final[int] = 2
+
+# Adaptive timeout constants (RFC 6298 smoothing gains)
+RTT_SMOOTHING_GAIN: Final[float] = 0.125
+RTT_VARIANCE_GAIN: Final[float] = 0.25
+
+# Reverse DNS constants
+DNS_QUERY_FLAGS: Final[int] = 0x0100  # Recursion desired
+DNS_RESPONSE_FLAG: Final[int] = 0x8000
+DNS_RCODE_MASK: Final[int] = 0x000F
+DNS_RCODE_NOERROR: Final[int] = 0
+DNS_RCODE_NXDOMAIN: Final[int] = 3
+DNS_CLASS_IN: Final[int] = 1
+DNS_TRANSACTION_ID_MASK: Final[int] = 0xFFFF
+DNS_QUESTION_FORMAT: Final[str] = '>HH'
+DNS_RECV_BUFFER_SIZE: Final[int] = 4096
+DNS_REVERSE_SUFFIX: Final[str] = "in-addr.arpa"
+RESOLV_CONF_PATH: Final[str] = "/etc/resolv.conf"
+# System resolver fallback: lookups in flight at once
+RESOLVER_SYSTEM_WORKERS: Final[int] = 8
+RESOLVER_THREAD_PREFIX: Final[str] = "reverse-dns"
+RESOLV_CONF_NAMESERVER: Final[str] = "nameserver"
@@ -1,11 +1,30 @@
+import errno
+import struct
 from typing import Final
 
 # Port service constants
-MAX_WORKERS: Final[int] = 20
 OPEN_PORT_RESULT: Final[int] = 0
 UNKNOWN_PORT_NAME: Final[str] = "unknown"
 TCP_PROTOCOL: Final[str] = "tcp"
 UDP_PROTOCOL: Final[str] = "udp"
+PORT_STATE_OPEN: Final[str] = "open"
+PORT_STATE_CLOSED: Final[str] = "closed"
+PORT_STATE_FILTERED: Final[str] = "filtered"
+
+# Service registry constants
+SERVICES_FILE_PATHS: Final[tuple[str, ...]] = ("/etc/services", r"C:\Windows\System32\drivers\etc\services")
+SERVICES_COMMENT: Final[str] = "#"
+SERVICES_PORT_SEPARATOR: Final[str] = "/"
+SERVICE_KIND_HTTP: Final[str] = "http"
+SERVICE_KIND_SSH: Final[str] = "ssh"
+SERVICE_KIND_BANNER: Final[str] = "banner"
+TLS_SERVICE_NAMES: Final[frozenset[str]] = frozenset({"https", "https-alt", "smtps", "submissions", "imaps", "pop3s", "ldaps", "ftps", "docker-tls"})
+SPEAK_FIRST_SERVICE_KINDS: Final[frozenset[str]] = frozenset({SERVICE_KIND_SSH, SERVICE_KIND_BANNER})
+
+# Connect scan constants
+CONNECT_IN_PROGRESS_ERRORS: Final[frozenset[int]] = frozenset({errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY})
+CONNECT_REFUSED_ERRORS: Final[frozenset[int]] = frozenset({errno.ECONNREFUSED})
+SO_LINGER_ABORT: Final[bytes] = struct.pack('ii', 1, 0)
 PORT_SERVICE_MAP: Final[dict[int, str]] = {
     # File Transfer
     20: "ftp-data",
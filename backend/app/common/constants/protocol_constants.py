@@ -3,10 +3,9 @@ from typing import Final
 # HTTP
 HTTP_DEFAULT_SERVER: Final[str] = "Unknown HTTP Server"
 HTTP_INFO_TEMPLATE: Final[str] = "Status: {status}"
+HTTP_TITLE_INFO_TEMPLATE: Final[str] = "Status: {status}, Title: {title}"
 HTTP_SCHEME: Final[str] = "http"
-HTTPS_SCHEME: Final[str] = "https"
-HTTP_URL_TEMPLATE: Final[str] = "{protocol_scheme}://{ip_address}:{port}/"
-HTTPS_PORT: Final[int] = 443
+HTTPS_SERVICE_NAME: Final[str] = "https"
 SERVER_HEADER: Final[str] = "Server"
 USER_AGENT_HEADER: Final[str] = "User-Agent"
 USER_AGENT_VALUE: Final[str] = "NetworkMonitor/1.0"
@@ -19,4 +18,58 @@ SSH_BANNER_PREFIX: Final[str] = "SSH-"
 MAX_BANNER_LENGTH: Final[int] = 100
 
 # Encoding
-DEFAULT_VERSION: Final[str] = "Unknown"
\ No newline at end of file
+DEFAULT_VERSION: Final[str] = "Unknown"
+
+# Raw HTTP probing
+HTTP_GET_METHOD: Final[str] = "GET"
+HTTP_HEAD_METHOD: Final[str] = "HEAD"
+HTTP_VERSION_PREFIX: Final[str] = "HTTP/"
+HTTP_REQUEST_TEMPLATE: Final[str] = "{method} / HTTP/1.1\r\nHost: {ip_address}\r\nUser-Agent: {user_agent}\r\nConnection: {connection}\r\n\r\n"
+HTTP_HEADER_SEPARATOR: Final[str] = ":"
+HTTP_HEAD_TERMINATOR: Final[bytes] = b"\r\n\r\n"
+HTTP_CONNECTION_KEEP_ALIVE: Final[str] = "keep-alive"
+HTTP_CONNECTION_CLOSE: Final[str] = "close"
+CONNECTION_HEADER: Final[str] = "connection"
+CONTENT_LENGTH_HEADER: Final[str] = "content-length"
+CONTENT_TYPE_HEADER: Final[str] = "content-type"
+HTML_CONTENT_TYPE_MARKER: Final[str] = "html"
+HTTP_HEAD_UNSUPPORTED_STATUSES: Final[frozenset[int]] = frozenset({405, 501})
+HTTP_TITLE_PATTERN: Final[bytes] = rb"<title[^>]*>(.*?)</title>"
+HTTP_TITLE_END: Final[bytes] = b"</title>"
+MAX_TITLE_LENGTH: Final[int] = 100
+
+# TLS certificate harvesting
+TLS_CERTIFICATE_CACHE_SIZE: Final[int] = 4096
+TLS_SUBJECT_SEPARATOR: Final[str] = ", "
+TLS_SAN_SEPARATOR: Final[str] = ","
+
+# X.509 DER layout
+DER_LONG_LENGTH_FLAG: Final[int] = 0x80
+DER_LENGTH_BYTES_MASK: Final[int] = 0x7F
+DER_MAX_LENGTH_BYTES: Final[int] = 4
+DER_HIGH_TAG_NUMBER: Final[int] = 0x1F
+X509_VERSION_TAG: Final[int] = 0xA0
+X509_EXTENSIONS_TAG: Final[int] = 0xA3
+X509_UTC_TIME_TAG: Final[int] = 0x17
+X509_GENERALIZED_TIME_TAG: Final[int] = 0x18
+X509_UTC_TIME_FORMAT: Final[str] = "%y%m%d%H%M%SZ"
+X509_GENERALIZED_TIME_FORMAT: Final[str] = "%Y%m%d%H%M%SZ"
+X509_SAN_OID: Final[bytes] = b"\x55\x1d\x11"
+X509_SAN_DNS_TAG: Final[int] = 0x82
+X509_SAN_IP_TAG: Final[int] = 0x87
+X509_NAME_ATTRIBUTES: Final[dict[bytes, str]] = {
+    b"\x55\x04\x03": "CN",
+    b"\x55\x04\x06": "C",
+    b"\x55\x04\x07": "L",
+    b"\x55\x04\x08": "ST",
+    b"\x55\x04\x0a": "O",
+    b"\x55\x04\x0b": "OU",
+}
+X509_STRING_ENCODINGS: Final[dict[int, str]] = {
+    0x0C: "utf-8",
+    0x13: "ascii",
+    0x14: "latin-1",
+    0x16: "ascii",
+    0x1C: "utf-32-be",
+    0x1E: "utf-16-be",
+}
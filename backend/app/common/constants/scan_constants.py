@@ -1,6 +1,51 @@
 from typing import Final
 
 # Scan service constants
+SCAN_ENGINE_THREADED: Final[str] = "threaded"
+SCAN_ENGINE_ASYNCIO: Final[str] = "asyncio"
+SCAN_ORDER_HOST: Final[str] = "host"
+SCAN_ORDER_STAGE: Final[str] = "stage"
+ASYNC_PRODUCER_THREAD_NAME: Final[str] = "async-scan"
+
+# Resource budget pools
+RESOURCE_SOCKETS: Final[str] = "sockets"
+RESOURCE_SUBPROCESSES: Final[str] = "subprocesses"
+RESOURCE_PROBES: Final[str] = "probes"
+FD_LIMIT_HEADROOM: Final[int] = 64
+
+# Per-host probe graph stages
+PROBE_STAGE_MAC: Final[str] = "mac"
+PROBE_STAGE_TTL: Final[str] = "ttl"
+PROBE_STAGE_HOSTNAME: Final[str] = "hostname"
+PROBE_STAGE_VENDOR: Final[str] = "vendor"
+PROBE_STAGE_OS: Final[str] = "os"
+PROBE_STAGE_PORTS: Final[str] = "ports"
+PROBE_STAGE_HTTP: Final[str] = "http"
+PROBE_STAGE_TLS: Final[str] = "tls"
+PROBE_STAGE_BANNERS: Final[str] = "banners"
+PROBE_STAGE_DISCOVERIES: Final[str] = "discoveries"
+PROBE_STAGE_VERIFY: Final[str] = "verify"
+# Cheap link-layer stages that run on every scan; the rest are skipped for hosts verified unchanged
+PROBE_STAGES_LINK: Final[tuple[str, ...]] = (PROBE_STAGE_MAC, PROBE_STAGE_TTL, PROBE_STAGE_HOSTNAME, PROBE_STAGE_VENDOR, PROBE_STAGE_OS)
+PROBE_STAGE_THREAD_PREFIX: Final[str] = "probe-stage"
+
+# Stage-major pipeline stages, each a group of probe stages run for every live host
+PIPELINE_STAGE_LIVENESS: Final[str] = "liveness"
+PIPELINE_STAGE_LINK: Final[str] = "link"
+PIPELINE_STAGE_PORTS: Final[str] = "ports"
+PIPELINE_STAGE_SERVICES: Final[str] = "services"
+PIPELINE_STAGE_DISCOVERY: Final[str] = "discovery"
+PIPELINE_THREAD_PREFIX: Final[str] = "pipeline"
+PIPELINE_POLL_INTERVAL_S: Final[float] = 0.1
+
+# Adaptive host scheduler: interval growth per unchanged check and per missed check
+SCHEDULER_STABLE_GROWTH: Final[float] = 1.5
+SCHEDULER_DEAD_BACKOFF: Final[float] = 2.0
+
+# Dead-address suppression: probe interval growth per further missed probe
+SUPPRESSION_BACKOFF: Final[float] = 2.0
+SUPPRESSION_MAX_DOUBLINGS: Final[int] = 32
+
 BANNER_SERVICE_NAMES: Final[list[str]] = ["telnet", "smtp", "pop3", "imap", "ftp"]
 
 # Expanded list of most common TCP ports (top 100)
@@ -44,5 +89,6 @@ UDP_COMMON_PORTS: Final[list[int]] = [
 ]
 
 HTTP_PORTS: Final[list[int]] = [80, 443, 8080, 8443]
+HTTPS_PORTS: Final[list[int]] = [443, 8443]
 SSH_PORT: Final[int] = 22
 MAX_MESSAGE_LENGTH: Final[int] = 80
\ No newline at end of file
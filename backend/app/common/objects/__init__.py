@@ -1,19 +1,55 @@
 from .address_data import AddressData
+from .device_description import DeviceDescription
 from .discovery_info import DiscoveryInfo
+from .dns_record import DnsRecord
+from .host_fingerprint import HostFingerprint
+from .http_fingerprint import HttpFingerprint
+from .neighbor_entry import NeighborEntry
+from .neighbor_stats import NeighborStats
+from .netbios_name import NetbiosName
+from .netbios_name_table import NetbiosNameTable
 from .ping_command import PingCommand
+from .pipeline_stage import PipelineStage
+from .ping_reply import PingReply
+from .probe_stage import ProbeStage
 from .port_info import PortInfo
+from .resolver_stats import ResolverStats
+from .resource_usage import ResourceUsage
 from .scan_options import ScanOptions
+from .scheduler_stats import SchedulerStats
 from .service_info import ServiceInfo
+from .ssdp_response import SsdpResponse
+from .stage_throughput import StageThroughput
+from .timeout_stats import TimeoutStats
+from .tls_certificate import TlsCertificate
 from .owner_input import OwnerInput
 from .device_input import DeviceInput
 
 __all__ = [
     "AddressData",
+    "DeviceDescription",
     "DiscoveryInfo",
+    "DnsRecord",
+    "HostFingerprint",
+    "HttpFingerprint",
+    "NeighborEntry",
+    "NeighborStats",
+    "NetbiosName",
+    "NetbiosNameTable",
     "PingCommand",
+    "PipelineStage",
+    "PingReply",
+    "ProbeStage",
     "PortInfo",
+    "ResolverStats",
+    "ResourceUsage",
     "ScanOptions",
+    "SchedulerStats",
     "ServiceInfo",
+    "SsdpResponse",
+    "StageThroughput",
+    "TimeoutStats",
+    "TlsCertificate",
     "OwnerInput",
     "DeviceInput",
 ]
\ No newline at end of file
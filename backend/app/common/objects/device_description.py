@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class DeviceDescription:
+    """Root device fields from a UPnP device description document."""
+    friendly_name: str | None = None
+    device_type: str | None = None
+    manufacturer: str | None = None
+    model_name: str | None = None
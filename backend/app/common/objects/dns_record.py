@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class DnsRecord:
+    """One resource record of a DNS message, with its RDATA decoded by type.
+
+    value holds the PTR/SRV/CNAME target or the A/AAAA address, port the SRV port
+    and attributes the key=value strings of a TXT record.
+    """
+    name: str
+    record_type: int
+    ttl: int
+    value: str | None = None
+    port: int | None = None
+    attributes: dict[str, str] = field(default_factory=dict)
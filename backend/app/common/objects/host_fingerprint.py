@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+from app.common.objects.address_data import AddressData
+from app.common.objects.scan_options import ScanOptions
+
+
+@dataclass
+class HostFingerprint:
+    """What a host looked like after its last deep scan, to tell whether the next full scan can skip it."""
+    mac_address: str | None
+    ttl: int | None
+    hostname: str | None
+    ports_hash: int
+    scan_options: ScanOptions
+    result: AddressData
+    verified_scans: int = 0
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class HttpFingerprint:
+    """What a web server told us about itself in reply to HEAD and GET requests."""
+    status: int
+    server: str | None = None
+    title: str | None = None
+    tls: bool = False
+    # DER certificate presented in the TLS handshake
+    certificate: bytes | None = None
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class NeighborEntry:
+    """Entry from the kernel neighbor (ARP) cache."""
+    ip_address: str
+    mac_address: str
+    state: str
+    age_s: int | None = None
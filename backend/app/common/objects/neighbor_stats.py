@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class NeighborStats:
+    """MAC lookups answered from the kernel neighbor cache versus active ARP probes."""
+    entries: int = 0
+    hits: int = 0
+    misses: int = 0
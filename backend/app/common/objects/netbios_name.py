@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class NetbiosName:
+    """One entry of a NetBIOS node status name table."""
+    name: str
+    suffix: int
+    group: bool = False
@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+
+from .netbios_name import NetbiosName
+
+
+@dataclass
+class NetbiosNameTable:
+    """Decoded NetBIOS node status reply: the host's registered names and adapter MAC."""
+    ip_address: str
+    names: list[NetbiosName] = field(default_factory=list)
+    mac_address: str | None = None
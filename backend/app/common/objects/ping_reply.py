@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class PingReply:
+    """ICMP echo reply matched to the request that triggered it."""
+    ip_address: str
+    rtt_ms: float
+    ttl: int | None = None
+    identifier: int = 0
+    sequence: int = 0
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class PipelineStage:
+    """One stage of a stage-major pipeline: how many workers it gets and what each does to an item.
+
+    run returns the item to hand to the next stage, or None to drop it.
+    """
+    name: str
+    workers: int
+    run: Callable[[Any], Any]
@@ -1,6 +1,8 @@
 
 from dataclasses import dataclass
 
+from app.common.objects.tls_certificate import TlsCertificate
+
 
 @dataclass
 class PortInfo:
@@ -10,4 +12,5 @@ class PortInfo:
     service: str | None = None
     banner: str | None = None
     state: str = "open"
+    certificate: TlsCertificate | None = None
 
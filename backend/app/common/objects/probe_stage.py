@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class ProbeStage:
+    """One node of a host's probe graph: the probe to run and the stages it must wait for."""
+    name: str
+    run: Callable[[], Any]
+    after: tuple[str, ...] = ()
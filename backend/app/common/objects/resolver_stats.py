@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ResolverStats:
+    """Reverse DNS lookups served from the cache versus sent to the DNS server."""
+    lookups: int = 0
+    cache_hits: int = 0
+    queries: int = 0
+    answered: int = 0
+    timeouts: int = 0
+    mean_latency_ms: float = 0.0
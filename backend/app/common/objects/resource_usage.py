@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ResourceUsage:
+    """Current and peak usage of one shared resource budget pool."""
+    name: str
+    limit: int
+    in_use: int = 0
+    peak: int = 0
+    waits: int = 0
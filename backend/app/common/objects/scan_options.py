@@ -14,6 +14,7 @@ class ScanOptions:
     detect_http: bool = False
     detect_ssh: bool = False
     detect_banners: bool = False
+    detect_tls: bool = False
     discover_netbios: bool = False
     discover_upnp: bool = False
     discover_mdns: bool = False
@@ -23,6 +24,10 @@ class ScanOptions:
         """Create scan options for MAC resolution only."""
         return cls(mac_resolution=True)
     
+    def is_mac_only(self) -> bool:
+        """Whether MAC resolution is the only enabled step."""
+        return self == ScanOptions.mac_only()
+    
     @classmethod
     def full_scan(cls) -> 'ScanOptions':
         """Create scan options for full comprehensive scanning."""
@@ -36,6 +41,7 @@ class ScanOptions:
             detect_http=True,
             detect_ssh=True,
             detect_banners=True,
+            detect_tls=True,
             discover_netbios=True,
             discover_upnp=True,
             discover_mdns=True
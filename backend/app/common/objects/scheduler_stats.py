@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class SchedulerStats:
+    """State of the per-host check queue and how far it has drifted from a fixed-interval sweep."""
+    queue_depth: int = 0
+    due: int = 0
+    checks: int = 0
+    mean_lateness_s: float = 0.0
+    max_lateness_s: float = 0.0
+    pulled_forward: int = 0
+    probes_saved: int = 0
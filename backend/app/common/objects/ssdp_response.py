@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class SsdpResponse:
+    """Headers of one SSDP M-SEARCH reply, indexed by the address that sent it."""
+    ip_address: str
+    server: str | None = None
+    st: str | None = None
+    usn: str | None = None
+    location: str | None = None
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class StageThroughput:
+    """Items one pipeline stage passed on or dropped, and how long its workers were busy.
+
+    elapsed_s runs from the stage's first item starting to its last item finishing.
+    """
+    name: str
+    workers: int
+    processed: int = 0
+    dropped: int = 0
+    busy_s: float = 0.0
+    elapsed_s: float = 0.0
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class TimeoutStats:
+    """Probe timeouts derived from measured RTT and the wait time they saved."""
+    hosts: int = 0
+    adaptive: int = 0
+    fallback: int = 0
+    expired: int = 0
+    saved_ms: float = 0.0
@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass
+class TlsCertificate:
+    """Identity and expiry of a certificate presented in a TLS handshake."""
+    sha256: str
+    subject: str | None = None
+    issuer: str | None = None
+    san: list[str] = field(default_factory=list)
+    not_after: datetime | None = None
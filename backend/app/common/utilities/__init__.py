@@ -1,4 +1,21 @@
+from .async_udp import udp_request
+from .connect_scan import connect_scan
+from .dns_message import encode_dns_name, parse_dns_message, read_dns_name
+from .x509_certificate import parse_certificate
+from .host_scheduler import HostScheduler
+from .http_fingerprinter import HttpFingerprinter
+from .multicast import multicast_query
+from .neighbor_table import read_neighbor_table
+from .oui_index import OuiIndex
+from .probe_graph import run_probe_graph, run_probe_graph_async
+from .probe_timeouts import ProbeTimeout, ProbeTimeouts
+from .resource_budget import ResourceBudget, ResourcePool
+from .reverse_resolver import ReverseResolver
+from .route_table import find_route_interface, read_route_table
+from .service_registry import ServiceRegistry
+from .stage_pipeline import StagePipeline
+from .tls_inspector import TlsInspector
 from .timer import Time, time_operation
-from .retry import RetryStatus, run_and_retry
+from .retry import RetryStatus, run_and_retry, run_and_retry_async
 
-__all__ = ["Time", "time_operation", "RetryStatus", "run_and_retry"]
+__all__ = ["Time", "time_operation", "RetryStatus", "run_and_retry", "run_and_retry_async", "udp_request", "connect_scan", "encode_dns_name", "parse_dns_message", "read_dns_name", "parse_certificate", "find_route_interface", "read_route_table", "read_neighbor_table", "HostScheduler", "HttpFingerprinter", "OuiIndex", "ResourceBudget", "ResourcePool", "ReverseResolver", "ServiceRegistry", "StagePipeline", "TlsInspector", "run_probe_graph", "run_probe_graph_async", "ProbeTimeout", "ProbeTimeouts", "multicast_query"]
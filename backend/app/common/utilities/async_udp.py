@@ -0,0 +1,39 @@
+"""
+Non-blocking UDP request/response helper for asyncio based probes.
+"""
+import asyncio
+from typing import Any
+
+
+class _SingleResponseProtocol(asyncio.DatagramProtocol):
+    def __init__(self, response: "asyncio.Future[bytes]") -> None:
+        self.response = response
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        if not self.response.done():
+            self.response.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        if not self.response.done():
+            self.response.set_exception(exc)
+
+
+async def udp_request(ip_address: str, port: int, payload: bytes, timeout: float) -> bytes | None:
+    """Send a single datagram and wait for the first reply.
+
+    Returns None when nothing arrives within the timeout. Errors reported by the
+    peer (e.g. ICMP port unreachable) are raised as OSError.
+    """
+    loop = asyncio.get_running_loop()
+    response: asyncio.Future[bytes] = loop.create_future()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _SingleResponseProtocol(response),
+        remote_addr=(ip_address, port),
+    )
+    try:
+        transport.sendto(payload)
+        return await asyncio.wait_for(response, timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        transport.close()
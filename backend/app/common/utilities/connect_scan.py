@@ -0,0 +1,180 @@
+"""
+Multi-host TCP connect scanner built on non-blocking sockets and selectors.
+"""
+import heapq
+import itertools
+import selectors
+import socket
+import time
+from collections import deque
+from typing import Callable
+
+from app.common.constants import *
+from app.common.utilities.resource_budget import ResourcePool, available_descriptors
+
+
+def connect_scan(
+    targets: dict[str, list[int]],
+    timeout_for: Callable[[str, int], float],
+    max_in_flight: int,
+    max_in_flight_per_host: int,
+    sockets: ResourcePool | None = None,
+    on_expired: Callable[[str, int], None] | None = None,
+    grab_window_for: Callable[[str, int], float] | None = None,
+    on_banner: Callable[[str, int, bytes], None] | None = None,
+) -> dict[str, dict[int, str]]:
+    """Connect-scan every (host, port) pair from a single selector loop.
+
+    Hosts are served round robin so one large host cannot starve the others, and no
+    more than max_in_flight connects (max_in_flight_per_host for a single host) are
+    outstanding at once; the global limit is also kept below the process fd limit.
+    When a shared sockets pool is given, every connect also holds one of its slots.
+    timeout_for gives the connect timeout per (host, port); on_expired is told about
+    every connect that ran into it.
+    grab_window_for gives, per (host, port), how long to keep a freshly opened
+    connection to read the greeting of a service that speaks first (0 to skip);
+    whatever arrives in that window is passed to on_banner.
+    Each port ends up open (handshake completed), closed (refused) or filtered
+    (timed out or unreachable). Sockets are closed with SO_LINGER 0 so finished
+    probes do not linger in TIME_WAIT.
+    """
+    states: dict[str, dict[int, str]] = {ip: {} for ip in targets}
+    remaining = {ip: deque(ports) for ip, ports in targets.items() if ports}
+    host_in_flight = {ip: 0 for ip in remaining}
+    ready = deque(remaining)
+    max_in_flight = min(max_in_flight, available_descriptors())
+
+    selector = selectors.DefaultSelector()
+    deadlines: list[tuple[float, int, socket.socket]] = []
+    pending: dict[socket.socket, tuple[str, int]] = {}
+    grabbing: dict[socket.socket, float] = {}
+    sequence = itertools.count()
+
+    def take_slot() -> bool:
+        if sockets is None:
+            return True
+        if pending:
+            return sockets.try_acquire()
+        sockets.acquire()
+        return True
+
+    def close(sock: socket.socket) -> None:
+        _abort(sock)
+        if sockets is not None:
+            sockets.release()
+
+    def finish(sock: socket.socket, state: str) -> None:
+        ip_address, port = pending.pop(sock)
+        grabbing.pop(sock, None)
+        selector.unregister(sock)
+        close(sock)
+        states[ip_address][port] = state
+        host_in_flight[ip_address] -= 1
+        if remaining[ip_address] and host_in_flight[ip_address] == max_in_flight_per_host - 1:
+            ready.append(ip_address)
+
+    try:
+        while ready or pending:
+            while ready and len(pending) < max_in_flight:
+                ip_address = ready.popleft()
+                port = remaining[ip_address].popleft()
+                if not take_slot():
+                    # Budget exhausted elsewhere: retry once our own probes release slots
+                    remaining[ip_address].appendleft(port)
+                    ready.appendleft(ip_address)
+                    break
+                try:
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                except OSError:
+                    if sockets is not None:
+                        sockets.release()
+                    if pending:
+                        # Out of descriptors: retry once running probes release some
+                        remaining[ip_address].appendleft(port)
+                        ready.appendleft(ip_address)
+                        break
+                    states[ip_address][port] = PORT_STATE_FILTERED
+                    if remaining[ip_address]:
+                        ready.append(ip_address)
+                    continue
+
+                sock.setblocking(False)
+                result = sock.connect_ex((ip_address, port))
+                if result in CONNECT_IN_PROGRESS_ERRORS:
+                    pending[sock] = (ip_address, port)
+                    host_in_flight[ip_address] += 1
+                    selector.register(sock, selectors.EVENT_WRITE)
+                    heapq.heappush(deadlines, (time.monotonic() + timeout_for(ip_address, port), next(sequence), sock))
+                else:
+                    close(sock)
+                    states[ip_address][port] = _state_from_error(result)
+
+                if remaining[ip_address] and host_in_flight[ip_address] < max_in_flight_per_host:
+                    ready.append(ip_address)
+
+            if not pending:
+                continue
+
+            wait = max(0.0, deadlines[0][0] - time.monotonic())
+            for key, _ in selector.select(wait):
+                sock = key.fileobj  # type: ignore[assignment]
+                if sock in grabbing:
+                    _read_banner(sock, *pending[sock], on_banner)
+                    finish(sock, PORT_STATE_OPEN)
+                    continue
+
+                state = _state_from_error(sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR))
+                window = grab_window_for(*pending[sock]) if grab_window_for is not None and state == PORT_STATE_OPEN else 0.0
+                if window > 0:
+                    # Keep the connection to read the greeting instead of opening another one later
+                    grabbing[sock] = time.monotonic() + window
+                    selector.modify(sock, selectors.EVENT_READ)
+                    heapq.heappush(deadlines, (grabbing[sock], next(sequence), sock))
+                else:
+                    finish(sock, state)
+
+            now = time.monotonic()
+            while deadlines and (deadlines[0][0] <= now or deadlines[0][2] not in pending):
+                deadline, _, sock = heapq.heappop(deadlines)
+                if sock not in pending:
+                    continue
+                if sock in grabbing:
+                    # A connect deadline left over from before the grab started is not the grab's own
+                    if deadline == grabbing[sock]:
+                        finish(sock, PORT_STATE_OPEN)
+                    continue
+                if on_expired is not None:
+                    on_expired(*pending[sock])
+                finish(sock, PORT_STATE_FILTERED)
+    finally:
+        for sock in list(pending):
+            close(sock)
+        selector.close()
+
+    return states
+
+
+def _state_from_error(error: int) -> str:
+    if error == OPEN_PORT_RESULT:
+        return PORT_STATE_OPEN
+    if error in CONNECT_REFUSED_ERRORS:
+        return PORT_STATE_CLOSED
+    return PORT_STATE_FILTERED
+
+
+def _read_banner(sock: socket.socket, ip_address: str, port: int, on_banner: Callable[[str, int, bytes], None] | None) -> None:
+    try:
+        data = sock.recv(SOCKET_BUFFER_SIZE)
+    except OSError:
+        return
+    if data and on_banner is not None:
+        on_banner(ip_address, port, data)
+
+
+def _abort(sock: socket.socket) -> None:
+    """Close with SO_LINGER 0 so the kernel resets the connection instead of keeping TIME_WAIT."""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, SO_LINGER_ABORT)
+    except OSError:
+        pass
+    sock.close()
@@ -0,0 +1,111 @@
+"""
+DNS wire-format decoding for mDNS and unicast DNS replies.
+"""
+import socket
+import struct
+
+from app.common.constants import *
+from app.common.objects import DnsRecord
+
+
+def parse_dns_message(packet: bytes) -> list[DnsRecord] | None:
+    """Decode every answer, authority and additional record of a DNS message.
+
+    The packet is read through one memoryview, so names and record data are
+    decoded in place rather than sliced into intermediate byte strings. Records
+    of types without a decoder are kept with value None. Returns None for a
+    packet that is truncated or malformed.
+    """
+    view = memoryview(packet)
+    try:
+        _, _, questions, answers, authorities, additionals = struct.unpack_from(DNS_HEADER_FORMAT, view)
+        offset = DNS_HEADER_LENGTH
+        for _ in range(questions):
+            offset = skip_dns_name(view, offset) + DNS_QUESTION_TRAILER_LENGTH
+
+        records: list[DnsRecord] = []
+        for _ in range(answers + authorities + additionals):
+            name, offset = read_dns_name(view, offset)
+            record_type, _, ttl, data_length = struct.unpack_from(DNS_RECORD_FORMAT, view, offset)
+            offset += DNS_RECORD_FIXED_LENGTH
+            end = offset + data_length
+            if end > len(view):
+                return None
+            records.append(_decode_record(view, name, record_type, ttl, offset, end))
+            offset = end
+    except (struct.error, IndexError, ValueError):
+        return None
+
+    return records
+
+
+def read_dns_name(view: memoryview, offset: int) -> tuple[str, int]:
+    """Decode the name at offset, following compression pointers.
+
+    Returns the dotted name and the offset just past it in the original
+    position. Raises ValueError on pointer loops or names past the packet end.
+    """
+    labels: list[str] = []
+    end: int | None = None
+    jumps = 0
+    while True:
+        length = view[offset]
+        if length & DNS_POINTER_MASK == DNS_POINTER_MASK:
+            if end is None:
+                end = offset + DNS_POINTER_LENGTH
+            jumps += 1
+            if jumps > DNS_MAX_POINTER_JUMPS:
+                raise ValueError("DNS name compression loop")
+            offset = ((length & ~DNS_POINTER_MASK) << 8) | view[offset + 1]
+            continue
+
+        offset += 1
+        if length == 0:
+            break
+        if offset + length > len(view):
+            raise ValueError("DNS label past end of packet")
+        labels.append(str(view[offset:offset + length], DEFAULT_ENCODING, ENCODING_ERROR_HANDLING))
+        offset += length
+
+    return DNS_LABEL_SEPARATOR.join(labels), offset if end is None else end
+
+
+def encode_dns_name(name: str) -> bytes:
+    """Encode a dotted name as uncompressed wire-format labels."""
+    labels = [label.encode(DEFAULT_ENCODING) for label in name.split(DNS_LABEL_SEPARATOR) if label]
+    return b"".join(bytes([len(label)]) + label for label in labels) + b"\x00"
+
+
+def skip_dns_name(view: memoryview, offset: int) -> int:
+    """Offset just past the name at offset, without decoding it."""
+    while True:
+        length = view[offset]
+        if length & DNS_POINTER_MASK == DNS_POINTER_MASK:
+            return offset + DNS_POINTER_LENGTH
+        offset += 1 + length
+        if length == 0:
+            return offset
+
+
+def _decode_record(view: memoryview, name: str, record_type: int, ttl: int, start: int, end: int) -> DnsRecord:
+    record = DnsRecord(name=name, record_type=record_type, ttl=ttl)
+    if record_type in (DNS_TYPE_PTR, DNS_TYPE_CNAME):
+        record.value, _ = read_dns_name(view, start)
+    elif record_type == DNS_TYPE_SRV:
+        record.port = struct.unpack_from(DNS_SRV_PORT_FORMAT, view, start + DNS_SRV_PORT_OFFSET)[0]
+        record.value, _ = read_dns_name(view, start + DNS_SRV_TARGET_OFFSET)
+    elif record_type == DNS_TYPE_A and end - start == DNS_IPV4_LENGTH:
+        record.value = socket.inet_ntop(socket.AF_INET, view[start:end])
+    elif record_type == DNS_TYPE_AAAA and end - start == DNS_IPV6_LENGTH:
+        record.value = socket.inet_ntop(socket.AF_INET6, view[start:end])
+    elif record_type == DNS_TYPE_TXT:
+        offset = start
+        while offset < end:
+            length = view[offset]
+            if offset + 1 + length > end:
+                break
+            key, _, value = str(view[offset + 1:offset + 1 + length], DEFAULT_ENCODING, ENCODING_ERROR_HANDLING).partition(TXT_ATTRIBUTE_SEPARATOR)
+            if key:
+                record.attributes.setdefault(key.lower(), value)
+            offset += 1 + length
+    return record
@@ -0,0 +1,115 @@
+"""
+Per-host check scheduling with intervals that adapt to what each check finds.
+"""
+import heapq
+import threading
+
+from app.common.constants import *
+from app.common.objects import SchedulerStats
+
+
+class HostScheduler:
+    """Priority queue of (next_due, ip) entries, one live entry per address.
+
+    Every check result moves the host's interval: a host that changed (appeared,
+    vanished or answered with another MAC) drops to min_interval_s, an unchanged
+    host backs off by SCHEDULER_STABLE_GROWTH up to max_interval_s, and an address
+    that keeps not answering backs off by SCHEDULER_DEAD_BACKOFF up to
+    dead_max_interval_s. pull_forward() makes a host due at once, e.g. when it
+    shows up in the neighbor table. Superseded heap entries are skipped lazily.
+    """
+
+    def __init__(
+        self,
+        ip_addresses: list[str],
+        base_interval_s: float,
+        min_interval_s: float,
+        max_interval_s: float,
+        dead_max_interval_s: float,
+        now: float,
+    ) -> None:
+        self.base_interval_s = base_interval_s
+        self.min_interval_s = min(min_interval_s, base_interval_s)
+        self.max_interval_s = max(max_interval_s, base_interval_s)
+        self.dead_max_interval_s = max(dead_max_interval_s, base_interval_s)
+        self._lock = threading.Lock()
+        self._heap: list[tuple[float, str]] = []
+        self._due: dict[str, float] = {}
+        self._intervals: dict[str, float] = {}
+        self._identities: dict[str, str | None] = {}
+        self._stats = SchedulerStats()
+        self._lateness_s = 0.0
+        self._saved = 0.0
+        for ip_address in ip_addresses:
+            self._schedule(ip_address, now + base_interval_s)
+
+    def next_due(self) -> float | None:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[str]:
+        """Take every host whose check is due, in due order."""
+        due: list[str] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due_at, ip_address = heapq.heappop(self._heap)
+                if self._due.get(ip_address) != due_at:
+                    continue
+                del self._due[ip_address]
+                due.append(ip_address)
+                lateness = now - due_at
+                self._stats.checks += 1
+                self._lateness_s += lateness
+                self._stats.max_lateness_s = max(self._stats.max_lateness_s, lateness)
+        return due
+
+    def record(self, ip_address: str, identity: str | None, now: float) -> None:
+        """Schedule the next check from a check result: the MAC (or "" without one) of a live host, None when it did not answer."""
+        with self._lock:
+            seen_before = ip_address in self._identities
+            previous = self._identities.get(ip_address)
+            interval = self._intervals.get(ip_address, self.base_interval_s)
+            self._identities[ip_address] = identity
+
+            if seen_before and identity != previous:
+                interval = self.min_interval_s
+            elif not seen_before:
+                interval = self.base_interval_s
+            elif identity is None:
+                interval = min(interval * SCHEDULER_DEAD_BACKOFF, self.dead_max_interval_s)
+            else:
+                interval = min(interval * SCHEDULER_STABLE_GROWTH, self.max_interval_s)
+
+            # A fixed sweep would have checked the host interval / base times in the same span
+            self._saved += interval / self.base_interval_s - 1
+            self._schedule(ip_address, now + interval, interval)
+
+    def postpone(self, ip_address: str, now: float) -> None:
+        """Check the host again after min_interval_s when its check failed, learning nothing from it."""
+        with self._lock:
+            self._schedule(ip_address, now + self.min_interval_s)
+
+    def pull_forward(self, ip_address: str, now: float) -> None:
+        """Make a known host due now, keeping its learned interval."""
+        with self._lock:
+            if ip_address in self._identities and self._due.get(ip_address, now) > now:
+                self._stats.pulled_forward += 1
+                self._schedule(ip_address, now)
+
+    def stats(self, now: float) -> SchedulerStats:
+        with self._lock:
+            return SchedulerStats(
+                queue_depth=len(self._due),
+                due=sum(1 for due_at in self._due.values() if due_at <= now),
+                checks=self._stats.checks,
+                mean_lateness_s=self._lateness_s / self._stats.checks if self._stats.checks else 0.0,
+                max_lateness_s=self._stats.max_lateness_s,
+                pulled_forward=self._stats.pulled_forward,
+                probes_saved=max(0, round(self._saved)),
+            )
+
+    def _schedule(self, ip_address: str, due_at: float, interval: float | None = None) -> None:
+        if interval is not None:
+            self._intervals[ip_address] = interval
+        self._due[ip_address] = due_at
+        heapq.heappush(self._heap, (due_at, ip_address))
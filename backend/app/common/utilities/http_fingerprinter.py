@@ -0,0 +1,215 @@
+"""
+Concurrent HTTP/HTTPS fingerprinting of web ports with a freshness-bounded cache.
+"""
+import asyncio
+import contextlib
+import html
+import re
+import ssl
+import threading
+import time
+from typing import AsyncContextManager
+
+from app import config
+from app.common.constants import *
+from app.common.objects import HttpFingerprint
+from app.common.utilities.probe_timeouts import ProbeTimeouts
+from app.common.utilities.resource_budget import ResourcePool
+
+_TITLE_PATTERN = re.compile(HTTP_TITLE_PATTERN, re.IGNORECASE | re.DOTALL)
+
+
+class HttpFingerprinter:
+    """HEAD-then-GET fingerprints of many web ports, probed side by side on asyncio streams.
+
+    Every port is first offered a TLS ClientHello and falls back to plain HTTP when
+    the handshake fails; whichever scheme answered is tried first next time. A HEAD
+    request gives status and Server; HTML pages (and servers that refuse HEAD) get a
+    GET on the same keep-alive connection, read up to http_max_body_bytes, for the
+    page title. At most http_fingerprint_concurrency probes run at once, each
+    holding a socket slot, and fingerprints are reused for
+    http_fingerprint_max_age_s before a port is probed again. The certificate of
+    the TLS handshake is kept with the fingerprint for the TLS inspector.
+    """
+
+    def __init__(self, sockets: ResourcePool | None = None, timeouts: ProbeTimeouts | None = None) -> None:
+        self.sockets = sockets
+        self.timeouts = timeouts or ProbeTimeouts()
+        self._lock = threading.Lock()
+        self._cache: dict[tuple[str, int], tuple[float, HttpFingerprint]] = {}
+        self._plain: set[tuple[str, int]] = set()
+        self._tls_context = self._create_unverified_context()
+
+    def fingerprint(self, ip_address: str, port: int) -> HttpFingerprint | None:
+        return self.fingerprint_many([(ip_address, port)]).get((ip_address, port))
+
+    def fingerprint_many(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], HttpFingerprint | None]:
+        return asyncio.run(self.fingerprint_many_async(targets))
+
+    def certificate(self, ip_address: str, port: int) -> bytes | None:
+        """DER certificate from a fresh fingerprint of the port, None when it has none."""
+        with self._lock:
+            entry = self._cache.get((ip_address, port))
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1].certificate
+
+    async def fingerprint_many_async(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], HttpFingerprint | None]:
+        """Fingerprint (or None when no web server answered) for every (ip, port), fresh ones from the cache."""
+        results: dict[tuple[str, int], HttpFingerprint | None] = {}
+        misses: list[tuple[str, int]] = []
+        now = time.monotonic()
+        with self._lock:
+            self._cache = {target: entry for target, entry in self._cache.items() if entry[0] > now}
+            for target in dict.fromkeys(targets):
+                if target in self._cache:
+                    results[target] = self._cache[target][1]
+                else:
+                    misses.append(target)
+
+        if misses:
+            limit = asyncio.Semaphore(config.http_fingerprint_concurrency)
+
+            async def limited(ip_address: str, port: int) -> HttpFingerprint | None:
+                async with limit:
+                    return await self._probe(ip_address, port)
+
+            fingerprints = await asyncio.gather(*(limited(ip_address, port) for ip_address, port in misses))
+            expires = time.monotonic() + config.http_fingerprint_max_age_s
+            with self._lock:
+                for target, fingerprint in zip(misses, fingerprints):
+                    results[target] = fingerprint
+                    if fingerprint is not None:
+                        self._cache[target] = (expires, fingerprint)
+        return results
+
+    async def _probe(self, ip_address: str, port: int) -> HttpFingerprint | None:
+        wait = self.timeouts.get(ip_address, config.service_detection_timeout_ms / 1000, service=True)
+        target = (ip_address, port)
+        for tls in ((False, True) if target in self._plain else (True, False)):
+            try:
+                fingerprint = await self._fingerprint(ip_address, port, tls, wait.seconds)
+            except asyncio.TimeoutError:
+                wait.expired()
+                continue
+            except OSError:
+                # Includes ssl.SSLError: a plain server answering the ClientHello
+                continue
+
+            if fingerprint is not None:
+                with self._lock:
+                    if tls:
+                        self._plain.discard(target)
+                    else:
+                        self._plain.add(target)
+                return fingerprint
+        return None
+
+    async def _fingerprint(self, ip_address: str, port: int, tls: bool, seconds: float) -> HttpFingerprint | None:
+        async with self._hold_socket():
+            reader, writer = await self._open(ip_address, port, tls, seconds)
+            ssl_object = writer.get_extra_info("ssl_object")
+            certificate = ssl_object.getpeercert(binary_form=True) if ssl_object is not None else None
+            try:
+                head = await self._request(reader, writer, ip_address, HTTP_HEAD_METHOD, HTTP_CONNECTION_KEEP_ALIVE, seconds)
+                if head is None:
+                    return None
+                status, headers = head
+                server = headers.get(SERVER_HEADER.lower())
+                content_type = headers.get(CONTENT_TYPE_HEADER, HTML_CONTENT_TYPE_MARKER)
+                if status not in HTTP_HEAD_UNSUPPORTED_STATUSES and HTML_CONTENT_TYPE_MARKER not in content_type.lower():
+                    return HttpFingerprint(status=status, server=server, tls=tls, certificate=certificate)
+
+                try:
+                    if headers.get(CONNECTION_HEADER, "").lower() == HTTP_CONNECTION_CLOSE or reader.at_eof():
+                        writer.close()
+                        reader, writer = await self._open(ip_address, port, tls, seconds)
+                    page = await self._request(reader, writer, ip_address, HTTP_GET_METHOD, HTTP_CONNECTION_CLOSE, seconds)
+                except (asyncio.TimeoutError, OSError):
+                    page = None
+                if page is None:
+                    # The HEAD answer alone still identifies the server
+                    return HttpFingerprint(status=status, server=server, tls=tls, certificate=certificate)
+
+                status, headers = page
+                title = self._parse_title(await self._read_body(reader, headers, seconds))
+                return HttpFingerprint(status=status, server=headers.get(SERVER_HEADER.lower(), server), title=title, tls=tls, certificate=certificate)
+            finally:
+                writer.close()
+
+    async def _open(self, ip_address: str, port: int, tls: bool, seconds: float) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        return await asyncio.wait_for(
+            asyncio.open_connection(ip_address, port, ssl=self._tls_context if tls else None),
+            seconds,
+        )
+
+    async def _request(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        ip_address: str,
+        method: str,
+        connection: str,
+        seconds: float,
+    ) -> tuple[int, dict[str, str]] | None:
+        """Send one request and read the response head; None when the reply is not HTTP."""
+        request = HTTP_REQUEST_TEMPLATE.format(method=method, ip_address=ip_address, user_agent=USER_AGENT_VALUE, connection=connection)
+        writer.write(request.encode(ASCII_ENCODING))
+        await writer.drain()
+        try:
+            head = await asyncio.wait_for(reader.readuntil(HTTP_HEAD_TERMINATOR), seconds)
+        except asyncio.IncompleteReadError as e:
+            head = e.partial
+        except asyncio.LimitOverrunError:
+            return None
+        return self._parse_head(head.decode(DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING))
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: dict[str, str], seconds: float) -> bytes:
+        """Read the body up to http_max_body_bytes, stopping early once the title is complete."""
+        limit = config.http_max_body_bytes
+        length = headers.get(CONTENT_LENGTH_HEADER, "")
+        if length.isdigit():
+            limit = min(limit, int(length))
+
+        body = b""
+        try:
+            while len(body) < limit and HTTP_TITLE_END not in body.lower():
+                chunk = await asyncio.wait_for(reader.read(limit - len(body)), seconds)
+                if not chunk:
+                    break
+                body += chunk
+        except (asyncio.TimeoutError, OSError):
+            pass
+        return body
+
+    def _parse_head(self, head: str) -> tuple[int, dict[str, str]] | None:
+        """Status code and lower-cased headers of a raw HTTP response head."""
+        lines = head.split(CRLF)
+        status_parts = lines[0].split(maxsplit=2) if lines else []
+        if len(status_parts) < 2 or not status_parts[0].startswith(HTTP_VERSION_PREFIX) or not status_parts[1].isdigit():
+            return None
+
+        headers: dict[str, str] = {}
+        for line in lines[1:]:
+            if not line:
+                break
+            name, _, value = line.partition(HTTP_HEADER_SEPARATOR)
+            headers[name.strip().lower()] = value.strip()
+        return int(status_parts[1]), headers
+
+    def _parse_title(self, body: bytes) -> str | None:
+        match = _TITLE_PATTERN.search(body)
+        if match is None:
+            return None
+        title = html.unescape(match.group(1).decode(DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING))
+        return " ".join(title.split())[:MAX_TITLE_LENGTH] or None
+
+    def _hold_socket(self) -> AsyncContextManager[None]:
+        return self.sockets.hold_async() if self.sockets is not None else contextlib.nullcontext()
+
+    def _create_unverified_context(self) -> ssl.SSLContext:
+        """Create a TLS context that accepts self-signed device certificates."""
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
@@ -0,0 +1,41 @@
+"""
+One-shot multicast query helper for subnet-wide discovery sweeps.
+"""
+import select
+import socket
+import time
+
+from app.common.constants import *
+
+
+def multicast_query(group: str, port: int, payload: bytes, window_s: float) -> list[tuple[str, bytes]]:
+    """Send one query to a multicast group and collect every reply for window_s.
+
+    The query goes out from an ephemeral port, so responders answer by unicast
+    to this socket. Returns (source ip, datagram) pairs in arrival order; an empty
+    list if the query could not be sent.
+    """
+    responses: list[tuple[str, bytes]] = []
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    except OSError:
+        return responses
+
+    with sock:
+        try:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, MULTICAST_TTL)
+            sock.sendto(payload, (group, port))
+        except OSError:
+            return responses
+
+        deadline = time.monotonic() + window_s
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not select.select([sock], [], [], remaining)[0]:
+                break
+            try:
+                data, (source, _) = sock.recvfrom(MULTICAST_RECV_BUFFER_SIZE)
+            except OSError:
+                continue
+            responses.append((source, data))
+
+    return responses
@@ -0,0 +1,74 @@
+"""
+Helpers for reading the kernel neighbor (ARP) cache in bulk.
+"""
+import json
+import subprocess
+from typing import Any
+
+from app.common.constants import *
+from app.common.objects import NeighborEntry
+
+
+def read_neighbor_table() -> list[NeighborEntry]:
+    """Return all resolved neighbor entries, preferring `ip neigh` for state and age."""
+    entries = _read_ip_neigh()
+    if entries is None:
+        entries = _read_proc_arp()
+    return entries
+
+
+def _read_ip_neigh() -> list[NeighborEntry] | None:
+    try:
+        result = subprocess.run(IP_NEIGH_COMMAND, capture_output=True, text=True, timeout=IP_NEIGH_TIMEOUT_S)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    
+    try:
+        records: list[dict[str, Any]] = json.loads(result.stdout or "[]")
+    except json.JSONDecodeError:
+        return None
+    
+    entries: list[NeighborEntry] = []
+    for record in records:
+        ip_address = record.get("dst")
+        mac_address = record.get("lladdr")
+        states = record.get("state") or []
+        if not ip_address or not mac_address or not states:
+            continue
+        
+        age_s = record.get("confirmed")
+        entries.append(NeighborEntry(
+            ip_address=ip_address,
+            mac_address=str(mac_address).lower(),
+            state=str(states[0]),
+            age_s=int(age_s) if isinstance(age_s, (int, float)) else None,
+        ))
+    return entries
+
+
+def _read_proc_arp(path: str = PROC_ARP_PATH) -> list[NeighborEntry]:
+    """Fallback without state or age: only complete entries are returned, reported as STALE."""
+    try:
+        with open(path, encoding=ASCII_ENCODING) as arp_file:
+            lines = arp_file.read().splitlines()[1:]
+    except OSError:
+        return []
+    
+    entries: list[NeighborEntry] = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) < PROC_ARP_MIN_FIELDS:
+            continue
+        try:
+            flags = int(fields[PROC_ARP_FLAGS_FIELD], 16)
+        except ValueError:
+            continue
+        if flags & PROC_ARP_FLAG_COMPLETE:
+            entries.append(NeighborEntry(
+                ip_address=fields[PROC_ARP_IP_FIELD],
+                mac_address=fields[PROC_ARP_MAC_FIELD].lower(),
+                state=NEIGHBOR_STATE_STALE,
+            ))
+    return entries
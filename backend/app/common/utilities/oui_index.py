@@ -0,0 +1,141 @@
+"""
+In-memory IEEE MA-L/MA-M/MA-S prefix index for MAC vendor lookups.
+"""
+import csv
+import os
+import threading
+import time
+from collections.abc import Iterable
+
+from app import config
+from app.common.constants import *
+
+
+class OuiIndex:
+    """Vendor lookups against the IEEE registries, loaded once into integer-keyed dicts.
+
+    Each registry block size (36-bit MA-S, 28-bit MA-M, 24-bit MA-L) gets one dict
+    keyed by the integer prefix, and lookups try the most specific block first.
+    Registry files are either IEEE CSV exports (oui.csv, mam.csv, oui36.csv) or
+    PREFIX:Vendor lines as cached by mac_vendor_lookup. The files are re-checked
+    every oui_reload_check_s and a changed registry is loaded on the side and
+    swapped in whole, so lookups never see a half-built index.
+    """
+
+    def __init__(self, paths: list[str] | None = None) -> None:
+        self._paths = paths
+        self._load_lock = threading.Lock()
+        self._index: list[tuple[int, dict[int, str]]] = []
+        self._signature: tuple[tuple[str, int, int], ...] | None = None
+        self._checked_at: float | None = None
+
+    def lookup(self, mac_address: str) -> str | None:
+        self._refresh()
+        return self._lookup(self._index, mac_address)
+
+    def lookup_many(self, mac_addresses: Iterable[str]) -> dict[str, str | None]:
+        """Vendors of many MAC addresses against one consistent snapshot of the index."""
+        self._refresh()
+        index = self._index
+        return {mac_address: self._lookup(index, mac_address) for mac_address in mac_addresses}
+
+    def size(self) -> int:
+        return sum(len(prefixes) for _, prefixes in self._index)
+
+    def _lookup(self, index: list[tuple[int, dict[int, str]]], mac_address: str) -> str | None:
+        digits = mac_address.translate(MAC_SEPARATOR_TABLE)
+        if len(digits) != MAC_HEX_DIGITS:
+            return None
+        try:
+            value = int(digits, 16)
+        except ValueError:
+            return None
+
+        first_octet = value >> MAC_FIRST_OCTET_SHIFT
+        if first_octet & MAC_MULTICAST_BIT:
+            return None
+        if first_octet & MAC_LOCALLY_ADMINISTERED_BIT:
+            # Randomized and virtual MACs carry no registered prefix
+            return MAC_LOCALLY_ADMINISTERED_VENDOR
+
+        for bits, prefixes in index:
+            vendor = prefixes.get(value >> (MAC_BITS - bits))
+            if vendor is not None:
+                return vendor
+        return None
+
+    def _refresh(self) -> None:
+        """Reload the registry if its files changed since the last check."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < config.oui_reload_check_s:
+            return
+
+        with self._load_lock:
+            if self._checked_at is not None and now - self._checked_at < config.oui_reload_check_s:
+                return
+
+            paths = self._registry_paths()
+            signature = self._file_signature(paths)
+            if signature != self._signature:
+                self._index = self._load(paths)
+                self._signature = signature
+            self._checked_at = time.monotonic()
+
+    def _registry_paths(self) -> list[str]:
+        if self._paths is not None:
+            return self._paths
+        if config.oui_registry_paths:
+            return [path.strip() for path in config.oui_registry_paths.split(OUI_REGISTRY_PATH_SEPARATOR) if path.strip()]
+        return self._default_registry()
+
+    def _default_registry(self) -> list[str]:
+        """The vendor list cached by mac_vendor_lookup, downloaded once if missing."""
+        from mac_vendor_lookup import BaseMacLookup, MacLookup  # type: ignore
+
+        location = BaseMacLookup().find_vendors_list()
+        if location is None:
+            try:
+                os.makedirs(os.path.dirname(BaseMacLookup.cache_path), exist_ok=True)
+                MacLookup().update_vendors()
+            except Exception:
+                return []
+            location = BaseMacLookup.cache_path
+        return [location]
+
+    def _file_signature(self, paths: list[str]) -> tuple[tuple[str, int, int], ...]:
+        signature: list[tuple[str, int, int]] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _load(self, paths: list[str]) -> list[tuple[int, dict[int, str]]]:
+        blocks: dict[int, dict[int, str]] = {bits: {} for bits in OUI_PREFIX_BITS}
+        vendors: dict[str, str] = {}
+        for path in paths:
+            try:
+                with open(path, encoding=DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING, newline="") as registry:
+                    if path.lower().endswith(OUI_CSV_SUFFIX):
+                        rows = ((row[OUI_CSV_ASSIGNMENT_FIELD], row[OUI_CSV_VENDOR_FIELD]) for row in csv.reader(registry) if len(row) > OUI_CSV_VENDOR_FIELD)
+                    else:
+                        rows = (line.partition(OUI_LINE_SEPARATOR)[::2] for line in registry)
+
+                    for prefix, vendor in rows:
+                        prefix = prefix.strip().translate(MAC_SEPARATOR_TABLE)
+                        vendor = vendor.strip()
+                        prefixes = blocks.get(len(prefix) * 4)
+                        if prefixes is None or not vendor:
+                            continue
+                        try:
+                            key = int(prefix, 16)
+                        except ValueError:
+                            continue
+                        # Many prefixes share a vendor; keep one string per name
+                        prefixes[key] = vendors.setdefault(vendor, vendor)
+            except OSError:
+                continue
+
+        return [(bits, blocks[bits]) for bits in OUI_PREFIX_BITS if blocks[bits]]
@@ -0,0 +1,109 @@
+"""
+Dependency-ordered execution of a host's probe stages.
+"""
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+
+from app.common.objects import ProbeStage
+from app.common.utilities.resource_budget import ResourcePool
+
+
+def run_probe_graph(stages: list[ProbeStage], executor: Executor, slots: ResourcePool) -> None:
+    """Run each stage as soon as the stages it waits for have finished.
+
+    The calling thread runs ready stages itself. Other stages that are ready at
+    the same time go to the executor only while a slot of the pool is free,
+    otherwise the caller runs them in turn, so stage threads never outnumber
+    the free probe slots. Independent stages overlap as far as the budget allows,
+    and a host costs its critical path rather than the sum of its probes.
+    Dependencies on stages missing from the graph (left out by the scan options)
+    count as met. The first stage error is raised once the stages already
+    running have finished; stages that were still waiting are skipped.
+    """
+    waiting = _dependencies(stages)
+    by_name = {stage.name: stage for stage in stages}
+    running: dict[Future[None], str] = {}
+    error: BaseException | None = None
+
+    def finish(name: str, exception: BaseException | None) -> None:
+        nonlocal error
+        error = error or exception
+        for after in waiting.values():
+            after.discard(name)
+
+    def run_held(stage: ProbeStage) -> None:
+        try:
+            stage.run()
+        finally:
+            slots.release()
+
+    while True:
+        ready = [name for name, after in waiting.items() if not after] if error is None else []
+        inline: list[str] = []
+        for name in ready:
+            del waiting[name]
+            # The first ready stage always stays on this thread
+            if inline and slots.try_acquire():
+                running[executor.submit(run_held, by_name[name])] = name
+            else:
+                inline.append(name)
+
+        for name in inline:
+            if error is not None:
+                break
+            try:
+                by_name[name].run()
+                finish(name, None)
+            except BaseException as e:
+                finish(name, e)
+
+        if not running:
+            if inline:
+                continue
+            break
+        if inline:
+            done = {future for future in running if future.done()}
+        else:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            finish(running.pop(future), future.exception())
+
+    if error is not None:
+        raise error
+
+
+async def run_probe_graph_async(stages: list[ProbeStage]) -> None:
+    """Run each stage's coroutine as soon as the stages it waits for have finished.
+
+    The asyncio counterpart of run_probe_graph: every stage becomes a task that
+    first awaits its dependencies. On the first error the remaining stages are
+    cancelled and the error is raised.
+    """
+    dependencies = _dependencies(stages)
+    tasks: dict[str, asyncio.Task[None]] = {}
+
+    async def run(stage: ProbeStage) -> None:
+        await asyncio.gather(*(tasks[name] for name in dependencies[stage.name]))
+        await stage.run()
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(run(stage))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+
+def _dependencies(stages: list[ProbeStage]) -> dict[str, set[str]]:
+    """Each stage's dependencies that are part of the graph; stages must follow the stages they wait for."""
+    dependencies: dict[str, set[str]] = {}
+    for stage in stages:
+        if stage.name in dependencies:
+            raise ValueError(f"Duplicate probe stage {stage.name}")
+        later = [name for name in stage.after if name not in dependencies and any(other.name == name for other in stages)]
+        if later:
+            raise ValueError(f"Probe stage {stage.name} is listed before {', '.join(later)}")
+        dependencies[stage.name] = {name for name in stage.after if name in dependencies}
+    return dependencies
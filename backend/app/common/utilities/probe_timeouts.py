@@ -0,0 +1,83 @@
+"""
+Per-host probe timeouts derived from measured round-trip times.
+"""
+import threading
+from dataclasses import dataclass
+
+from app import config
+from app.common.constants import *
+from app.common.objects import TimeoutStats
+
+
+@dataclass
+class ProbeTimeout:
+    """Timeout handed to a single probe; call expired() when the probe ran out of time."""
+    seconds: float
+    ceiling: float
+    owner: "ProbeTimeouts"
+
+    def expired(self) -> None:
+        self.owner.record_expired(self)
+
+
+class ProbeTimeouts:
+    """Smoothed RTT and RTT variance per host, kept the way TCP computes its RTO (RFC 6298).
+
+    A host's timeout is SRTT + rtt_variance_factor * RTTVAR, raised to the configured
+    minimum and capped by the fixed config timeout the caller passes as ceiling.
+    Hosts without a measurement get the ceiling.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._estimates: dict[str, tuple[float, float]] = {}
+        self._stats = TimeoutStats()
+
+    def observe(self, ip_address: str, rtts_ms: list[float]) -> None:
+        """Fold new RTT samples for a host into its estimate."""
+        with self._lock:
+            estimate = self._estimates.get(ip_address)
+            for rtt_ms in rtts_ms:
+                if estimate is None:
+                    estimate = (rtt_ms, rtt_ms / 2)
+                else:
+                    srtt, rttvar = estimate
+                    rttvar = (1 - RTT_VARIANCE_GAIN) * rttvar + RTT_VARIANCE_GAIN * abs(srtt - rtt_ms)
+                    srtt = (1 - RTT_SMOOTHING_GAIN) * srtt + RTT_SMOOTHING_GAIN * rtt_ms
+                    estimate = (srtt, rttvar)
+            if estimate is not None:
+                self._estimates[ip_address] = estimate
+                self._stats.hosts = len(self._estimates)
+
+    def get(self, ip_address: str, ceiling_s: float, service: bool = False) -> ProbeTimeout:
+        """Timeout for one probe to a host.
+
+        Service probes wait for an application reply rather than a handshake, so
+        they use the larger min_service_timeout_ms floor.
+        """
+        with self._lock:
+            estimate = self._estimates.get(ip_address) if config.adaptive_timeouts else None
+            if estimate is None:
+                self._stats.fallback += 1
+                return ProbeTimeout(seconds=ceiling_s, ceiling=ceiling_s, owner=self)
+
+            srtt, rttvar = estimate
+            floor_ms = config.min_service_timeout_ms if service else config.min_probe_timeout_ms
+            timeout_ms = max(srtt + config.rtt_variance_factor * rttvar, floor_ms)
+            self._stats.adaptive += 1
+            return ProbeTimeout(seconds=min(timeout_ms / 1000, ceiling_s), ceiling=ceiling_s, owner=self)
+
+    def record_expired(self, timeout: ProbeTimeout) -> None:
+        """Count an unanswered probe and the wait it avoided compared to the ceiling."""
+        with self._lock:
+            self._stats.expired += 1
+            self._stats.saved_ms += (timeout.ceiling - timeout.seconds) * 1000
+
+    def get_stats(self) -> TimeoutStats:
+        with self._lock:
+            return TimeoutStats(**vars(self._stats))
+
+    def reset_stats(self) -> None:
+        """Start a new stats window; RTT estimates are kept across scans."""
+        with self._lock:
+            self._stats = TimeoutStats(hosts=len(self._estimates))
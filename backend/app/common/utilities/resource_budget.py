@@ -0,0 +1,132 @@
+"""
+Process-wide budget for sockets, subprocesses and in-flight probes.
+"""
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+from app import config
+from app.common.constants import *
+from app.common.objects import ResourceUsage
+
+
+class ResourcePool:
+    """Counting limit that can be waited on from threads and event loops alike."""
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = limit
+        self._in_use = 0
+        self._peak = 0
+        self._waits = 0
+        self._condition = threading.Condition()
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free, without waiting."""
+        with self._condition:
+            return self._take()
+
+    def acquire(self) -> None:
+        """Take a slot, blocking the calling thread until one is free."""
+        with self._condition:
+            if self._take():
+                return
+            self._waits += 1
+            while not self._take():
+                self._condition.wait()
+
+    async def acquire_async(self) -> None:
+        """Take a slot, suspending the calling task until one is free."""
+        loop = asyncio.get_running_loop()
+        waited = False
+        while True:
+            with self._condition:
+                if self._take():
+                    return
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                waiter: asyncio.Future[None] = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+            async_waiters, self._async_waiters = self._async_waiters, []
+
+        # Woken tasks race for the slot and re-queue themselves if they lose
+        for loop, waiter in async_waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def hold_async(self) -> AsyncIterator[None]:
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def usage(self) -> ResourceUsage:
+        with self._condition:
+            return ResourceUsage(name=self.name, limit=self.limit, in_use=self._in_use, peak=self._peak, waits=self._waits)
+
+    def _take(self) -> bool:
+        if self._in_use >= self.limit:
+            return False
+        self._in_use += 1
+        self._peak = max(self._peak, self._in_use)
+        return True
+
+
+class ResourceBudget:
+    """Limits shared by every scan service, so nested pools cannot multiply past them.
+
+    Callers always take a probe slot before any socket or subprocess slot and never
+    wait for a second slot of a pool while holding one, which keeps the pools free
+    of lock-order deadlocks.
+    """
+
+    def __init__(self, max_sockets: int, max_subprocesses: int, max_probes: int) -> None:
+        self.sockets = ResourcePool(RESOURCE_SOCKETS, min(max_sockets, available_descriptors()))
+        self.subprocesses = ResourcePool(RESOURCE_SUBPROCESSES, max_subprocesses)
+        self.probes = ResourcePool(RESOURCE_PROBES, max_probes)
+
+    @classmethod
+    def from_config(cls) -> "ResourceBudget":
+        return cls(
+            max_sockets=config.max_open_sockets,
+            max_subprocesses=config.max_subprocesses,
+            max_probes=config.max_concurrent_probes,
+        )
+
+    def usage(self) -> list[ResourceUsage]:
+        return [pool.usage() for pool in (self.sockets, self.subprocesses, self.probes)]
+
+
+def available_descriptors() -> int:
+    """Soft fd limit minus headroom for the rest of the process (unbounded where unknown)."""
+    try:
+        import resource
+    except ImportError:
+        return 1 << 30
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return 1 << 30
+    return max(1, soft - FD_LIMIT_HEADROOM)
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -1,9 +1,10 @@
 """
 Retry utilities for handling transient network failures.
 """
+import asyncio
 import enum
 import time
-from typing import Callable, TypeVar, Optional
+from typing import Awaitable, Callable, TypeVar, Optional
 
 T = TypeVar('T')
 
@@ -26,3 +27,18 @@ def run_and_retry(func: Callable[[], RetryStatus | T], max_attempts: int, initia
             delay *= backoff_factor
     
     return None
+
+async def run_and_retry_async(func: Callable[[], Awaitable[RetryStatus | T]], max_attempts: int, initial_delay: float, backoff_factor: float) -> Optional[T]:
+    delay = initial_delay
+    
+    for attempt in range(max_attempts):
+        result = await func()
+        
+        if result not in (RetryStatus.FAILURE, RetryStatus.TIMEOUT, RetryStatus.ERROR):
+            return result  # type: ignore[return-value]
+        
+        if attempt < max_attempts - 1:
+            await asyncio.sleep(delay)
+            delay *= backoff_factor
+    
+    return None
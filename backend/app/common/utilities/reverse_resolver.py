@@ -0,0 +1,237 @@
+"""
+Bulk reverse DNS (PTR) lookups with a TTL-bounded answer cache.
+"""
+import ipaddress
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from app import config
+from app.common.constants import *
+from app.common.objects import ResolverStats
+from app.common.utilities.dns_message import encode_dns_name, parse_dns_message
+from app.common.utilities.resource_budget import ResourcePool
+
+
+class ReverseResolver:
+    """PTR lookups sent straight to the DNS server from one UDP socket.
+
+    All addresses of a batch are queried back to back and replies are matched by
+    transaction ID, so a whole range costs one hostname_timeout_ms window, and no
+    process-wide socket default is touched. Names and negative answers (NXDOMAIN
+    or no PTR record) are cached for their TTL, capped by dns_cache_max_ttl_s and
+    dns_negative_ttl_s respectively. Lookups that time out are cached as unknown
+    for dns_timeout_ttl_s, so host scans right after a batch do not wait again.
+    Without a known IPv4 server, the system resolver is asked from a small
+    thread pool under the same hostname_timeout_ms window.
+    """
+
+    def __init__(self, sockets: ResourcePool | None = None) -> None:
+        self.sockets = sockets
+        self._lock = threading.Lock()
+        self._cache: dict[str, tuple[float, str | None]] = {}
+        self._stats = ResolverStats()
+        self._latency_total_ms = 0.0
+        self._next_transaction_id = int.from_bytes(os.urandom(2), "big")
+        self._system_executor: ThreadPoolExecutor | None = None
+
+    def resolve(self, ip_address: str) -> str | None:
+        return self.resolve_many([ip_address]).get(ip_address)
+
+    def resolve_many(self, ip_addresses: list[str]) -> dict[str, str | None]:
+        """Hostname (or None) for every address, from the cache where it is still fresh."""
+        results: dict[str, str | None] = {}
+        misses: list[str] = []
+        now = time.monotonic()
+        with self._lock:
+            self._cache = {ip: entry for ip, entry in self._cache.items() if entry[0] > now}
+            for ip_address in dict.fromkeys(ip_addresses):
+                self._stats.lookups += 1
+                if ip_address in self._cache:
+                    self._stats.cache_hits += 1
+                    results[ip_address] = self._cache[ip_address][1]
+                else:
+                    misses.append(ip_address)
+
+        if misses:
+            server = self._nameserver()
+            answers = self._query(server, misses) if server else self._query_system(misses)
+            results.update({ip_address: answers.get(ip_address) for ip_address in misses})
+        return results
+
+    def get_stats(self) -> ResolverStats:
+        with self._lock:
+            stats = ResolverStats(**vars(self._stats))
+            if stats.answered:
+                stats.mean_latency_ms = self._latency_total_ms / stats.answered
+            return stats
+
+    def _query(self, server: tuple[str, int], ip_addresses: list[str]) -> dict[str, str | None]:
+        answers: dict[str, str | None] = {}
+        if self.sockets is not None:
+            self.sockets.acquire()
+        try:
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            except OSError:
+                return answers
+
+            with sock:
+                pending: dict[int, tuple[str, float]] = {}
+                for ip_address in ip_addresses:
+                    transaction_id = self._transaction_id()
+                    try:
+                        sock.sendto(self._build_ptr_query(transaction_id, ip_address), server)
+                    except OSError:
+                        continue
+                    pending[transaction_id] = (ip_address, time.perf_counter())
+
+                with self._lock:
+                    self._stats.queries += len(pending)
+
+                deadline = time.monotonic() + config.hostname_timeout_ms / 1000
+                while pending and (remaining := deadline - time.monotonic()) > 0:
+                    if not select.select([sock], [], [], remaining)[0]:
+                        break
+                    try:
+                        response, (source, _) = sock.recvfrom(DNS_RECV_BUFFER_SIZE)
+                    except OSError:
+                        continue
+                    if source != server[0] or len(response) < DNS_HEADER_LENGTH:
+                        continue
+
+                    transaction_id, flags = struct.unpack_from(DNS_QUESTION_FORMAT, response)
+                    if not flags & DNS_RESPONSE_FLAG or transaction_id not in pending:
+                        continue
+                    ip_address, sent = pending.pop(transaction_id)
+                    answer = self._read_answer(ip_address, flags, response)
+                    if answer is None:
+                        continue
+
+                    hostname, ttl = answer
+                    answers[ip_address] = hostname
+                    self._store(ip_address, hostname, ttl, (time.perf_counter() - sent) * 1000)
+
+                self._store_timeouts([ip_address for ip_address, _ in pending.values()])
+        finally:
+            if self.sockets is not None:
+                self.sockets.release()
+
+        return answers
+
+    def _query_system(self, ip_addresses: list[str]) -> dict[str, str | None]:
+        """Fall back to the system resolver when no IPv4 DNS server is known.
+
+        Lookups run concurrently on a bounded pool and are given up on after
+        hostname_timeout_ms; a lookup still running then finishes on its thread
+        without being waited for.
+        """
+        executor = self._get_system_executor()
+        futures: dict[Future[tuple[str | None, int, float] | None], str] = {
+            executor.submit(self._lookup_system, ip_address): ip_address for ip_address in ip_addresses
+        }
+        with self._lock:
+            self._stats.queries += len(futures)
+        done, not_done = wait(futures, timeout=config.hostname_timeout_ms / 1000)
+
+        answers: dict[str, str | None] = {}
+        for future in done:
+            result = future.result()
+            if result is None:
+                continue
+            hostname, ttl, latency_ms = result
+            answers[futures[future]] = hostname
+            self._store(futures[future], hostname, ttl, latency_ms)
+
+        for future in not_done:
+            future.cancel()
+        self._store_timeouts([futures[future] for future in not_done])
+        return answers
+
+    def _lookup_system(self, ip_address: str) -> tuple[str | None, int, float] | None:
+        """Hostname, cache TTL and latency from the system resolver; None on a resolver error."""
+        start = time.perf_counter()
+        try:
+            hostname: str | None = socket.gethostbyaddr(ip_address)[0]
+            ttl = config.dns_cache_max_ttl_s
+        except (socket.herror, socket.gaierror):
+            hostname, ttl = None, config.dns_negative_ttl_s
+        except OSError:
+            return None
+        return hostname, ttl, (time.perf_counter() - start) * 1000
+
+    def _get_system_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._system_executor is None:
+                self._system_executor = ThreadPoolExecutor(max_workers=RESOLVER_SYSTEM_WORKERS, thread_name_prefix=RESOLVER_THREAD_PREFIX)
+            return self._system_executor
+
+    def _read_answer(self, ip_address: str, flags: int, response: bytes) -> tuple[str | None, int] | None:
+        """Hostname and cache TTL from a reply; None when the reply must not be cached."""
+        rcode = flags & DNS_RCODE_MASK
+        if rcode == DNS_RCODE_NXDOMAIN:
+            return None, config.dns_negative_ttl_s
+        if rcode != DNS_RCODE_NOERROR:
+            return None
+
+        records = parse_dns_message(response)
+        if records is None:
+            return None
+
+        query_name = self._ptr_name(ip_address)
+        for record in records:
+            if record.record_type == DNS_TYPE_PTR and record.value and record.name.lower() == query_name:
+                return record.value, min(record.ttl, config.dns_cache_max_ttl_s)
+        return None, config.dns_negative_ttl_s
+
+    def _store(self, ip_address: str, hostname: str | None, ttl: int, latency_ms: float) -> None:
+        with self._lock:
+            self._stats.answered += 1
+            self._latency_total_ms += latency_ms
+            if ttl > 0:
+                self._cache[ip_address] = (time.monotonic() + ttl, hostname)
+
+    def _store_timeouts(self, ip_addresses: list[str]) -> None:
+        """Count lookups that got no answer and remember them as unknown for dns_timeout_ttl_s."""
+        with self._lock:
+            self._stats.timeouts += len(ip_addresses)
+            if ip_addresses and config.dns_timeout_ttl_s > 0:
+                expires = time.monotonic() + config.dns_timeout_ttl_s
+                self._cache.update({ip_address: (expires, None) for ip_address in ip_addresses})
+
+    def _transaction_id(self) -> int:
+        with self._lock:
+            self._next_transaction_id = (self._next_transaction_id + 1) & DNS_TRANSACTION_ID_MASK
+            return self._next_transaction_id
+
+    def _build_ptr_query(self, transaction_id: int, ip_address: str) -> bytes:
+        header = struct.pack(DNS_HEADER_FORMAT, transaction_id, DNS_QUERY_FLAGS, 1, 0, 0, 0)
+        return header + encode_dns_name(self._ptr_name(ip_address)) + struct.pack(DNS_QUESTION_FORMAT, DNS_TYPE_PTR, DNS_CLASS_IN)
+
+    def _ptr_name(self, ip_address: str) -> str:
+        return DNS_LABEL_SEPARATOR.join([*reversed(ip_address.split(DNS_LABEL_SEPARATOR)), DNS_REVERSE_SUFFIX])
+
+    def _nameserver(self) -> tuple[str, int] | None:
+        """The configured DNS server, else the first IPv4 nameserver in resolv.conf."""
+        if config.dns_server:
+            return config.dns_server, config.dns_port
+
+        try:
+            with open(RESOLV_CONF_PATH) as resolv_conf:
+                lines = resolv_conf.read().splitlines()
+        except OSError:
+            return None
+
+        for line in lines:
+            fields = line.split()
+            if len(fields) >= 2 and fields[0] == RESOLV_CONF_NAMESERVER:
+                try:
+                    if ipaddress.ip_address(fields[1]).version == 4:
+                        return fields[1], config.dns_port
+                except ValueError:
+                    continue
+        return None
@@ -0,0 +1,53 @@
+"""
+Helpers for reading the kernel IPv4 routing table (Linux /proc/net/route).
+"""
+import socket
+import struct
+
+from app.common.constants import *
+
+
+def read_route_table(path: str = ROUTE_TABLE_PATH) -> str | None:
+    """Return the raw routing table, or None where it is not available (e.g. Windows)."""
+    try:
+        with open(path, encoding=ASCII_ENCODING) as route_file:
+            return route_file.read()
+    except OSError:
+        return None
+
+
+def find_route_interface(route_table: str, ip_address: str) -> str | None:
+    """Return the interface of the most specific active route that covers ip_address."""
+    try:
+        target = struct.unpack('!I', socket.inet_aton(ip_address))[0]
+    except OSError:
+        return None
+    
+    best: tuple[int, int, str] | None = None
+    for line in route_table.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < ROUTE_MIN_FIELDS:
+            continue
+        
+        try:
+            iface = fields[ROUTE_IFACE_FIELD]
+            destination = _decode_route_address(fields[ROUTE_DESTINATION_FIELD])
+            flags = int(fields[ROUTE_FLAGS_FIELD], 16)
+            metric = int(fields[ROUTE_METRIC_FIELD])
+            mask = _decode_route_address(fields[ROUTE_MASK_FIELD])
+        except ValueError:
+            continue
+        
+        if not flags & ROUTE_FLAG_UP or target & mask != destination & mask:
+            continue
+        
+        prefix_length = bin(mask).count('1')
+        if best is None or prefix_length > best[0] or (prefix_length == best[0] and metric < best[1]):
+            best = (prefix_length, metric, iface)
+    
+    return best[2] if best else None
+
+
+def _decode_route_address(value: str) -> int:
+    """Decode a little-endian hex address from the routing table into a host-order integer."""
+    return struct.unpack('!I', struct.pack('<I', int(value, 16)))[0]
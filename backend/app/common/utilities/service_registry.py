@@ -0,0 +1,97 @@
+"""
+Port to service name registry, built once from the port constants and services files.
+"""
+from app import config
+from app.common.constants import *
+
+
+class ServiceRegistry:
+    """Protocol-aware port → service name, open frequency, detection kind and TLS tables.
+
+    Names come from PORT_SERVICE_MAP first, then an optional nmap-services file
+    (which also supplies how often each port is found open), then the system
+    services file. Everything is read once when the registry is built; lookups
+    are plain dict reads and safe from any thread.
+    """
+
+    def __init__(self, nmap_services_path: str | None = None, services_paths: tuple[str, ...] = SERVICES_FILE_PATHS) -> None:
+        self._names: dict[str, dict[int, str]] = {TCP_PROTOCOL: {}, UDP_PROTOCOL: {}}
+        self._frequencies: dict[str, dict[int, float]] = {TCP_PROTOCOL: {}, UDP_PROTOCOL: {}}
+
+        for path in services_paths:
+            self._load_services_file(path, frequencies=False)
+        if nmap_services_path:
+            self._load_services_file(nmap_services_path, frequencies=True)
+        for protocol in self._names:
+            self._names[protocol].update(PORT_SERVICE_MAP)
+
+        self._kinds = {protocol: self._build_kinds(protocol, names) for protocol, names in self._names.items()}
+        self._tls_ports = {port for port, name in self._names[TCP_PROTOCOL].items() if name.lower() in TLS_SERVICE_NAMES} | set(HTTPS_PORTS)
+
+    @classmethod
+    def from_config(cls) -> "ServiceRegistry":
+        return cls(nmap_services_path=config.nmap_services_path or None)
+
+    def name(self, port: int, protocol: str = TCP_PROTOCOL) -> str:
+        return self._names.get(protocol, {}).get(port, UNKNOWN_PORT_NAME)
+
+    def frequency(self, port: int, protocol: str = TCP_PROTOCOL) -> float:
+        """Fraction of scanned hosts with this port open, 0.0 when unknown."""
+        return self._frequencies.get(protocol, {}).get(port, 0.0)
+
+    def kind(self, port: int, protocol: str = TCP_PROTOCOL) -> str | None:
+        """Which service detector applies to the port: HTTP, SSH, banner grab or none."""
+        return self._kinds.get(protocol, {}).get(port)
+
+    def tls_capable(self, port: int, protocol: str = TCP_PROTOCOL) -> bool:
+        """Whether the port is expected to speak TLS from the first byte (https, imaps, ldaps, ...)."""
+        return protocol == TCP_PROTOCOL and port in self._tls_ports
+
+    def by_frequency(self, ports: list[int], protocol: str = TCP_PROTOCOL) -> list[int]:
+        """Ports ordered most-often-open first; ports without data keep their order at the end."""
+        frequencies = self._frequencies.get(protocol, {})
+        return sorted(ports, key=lambda port: -frequencies.get(port, 0.0))
+
+    def _build_kinds(self, protocol: str, names: dict[int, str]) -> dict[int, str]:
+        # Every detector talks TCP
+        if protocol != TCP_PROTOCOL:
+            return {}
+
+        kinds: dict[int, str] = {}
+        for port, name in names.items():
+            name = name.lower()
+            if name in BANNER_SERVICE_NAMES:
+                kinds[port] = SERVICE_KIND_BANNER
+            elif SSH_SERVICE_NAME in name:
+                kinds[port] = SERVICE_KIND_SSH
+            elif HTTP_SERVICE_NAME in name:
+                kinds[port] = SERVICE_KIND_HTTP
+
+        kinds.update({port: SERVICE_KIND_HTTP for port in HTTP_PORTS})
+        kinds[SSH_PORT] = SERVICE_KIND_SSH
+        return kinds
+
+    def _load_services_file(self, path: str, frequencies: bool) -> None:
+        """Read `name port/protocol [frequency|aliases]` lines; later files override earlier names."""
+        try:
+            with open(path, encoding=DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING) as services:
+                lines = services.read().splitlines()
+        except OSError:
+            return
+
+        for line in lines:
+            fields = line.split(SERVICES_COMMENT, 1)[0].split()
+            if len(fields) < 2:
+                continue
+            port_text, _, protocol = fields[1].partition(SERVICES_PORT_SEPARATOR)
+            if protocol not in self._names or not port_text.isdigit():
+                continue
+
+            port = int(port_text)
+            if fields[0] != UNKNOWN_PORT_NAME:
+                self._names[protocol][port] = fields[0]
+            if frequencies and len(fields) > 2:
+                try:
+                    self._frequencies[protocol][port] = float(fields[2])
+                except ValueError:
+                    pass
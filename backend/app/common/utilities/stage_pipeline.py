@@ -0,0 +1,129 @@
+"""
+Stage-major processing: every stage has its own workers and hands items on through bounded queues.
+"""
+import dataclasses
+import queue
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from app.common.constants import *
+from app.common.objects import PipelineStage, StageThroughput
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class StagePipeline:
+    """Items pass through the stages in order, each stage with its own pool of worker threads.
+
+    Stages are joined by queues of at most queue_size items, so a stage starts on
+    the first items as soon as the previous stage lets go of them, and a slow stage
+    (or consumer) holds back the stages before it instead of letting items pile up.
+    The first error of any stage stops the pipeline and is raised to the consumer.
+    """
+
+    def __init__(self, stages: list[PipelineStage], queue_size: int) -> None:
+        self.stages = stages
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._stats = [StageThroughput(name=stage.name, workers=stage.workers) for stage in stages]
+
+    def throughput(self) -> list[StageThroughput]:
+        """Counters of the current (or last) run, one per stage."""
+        with self._lock:
+            return [dataclasses.replace(stats) for stats in self._stats]
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Feed the items into the first stage and yield what leaves the last one, in completion order."""
+        queues: list[queue.Queue[Any]] = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        stopped = threading.Event()
+        errors: list[BaseException] = []
+        remaining = [stage.workers for stage in self.stages]
+        started: list[float | None] = [None] * len(self.stages)
+        with self._lock:
+            self._stats = [StageThroughput(name=stage.name, workers=stage.workers) for stage in self.stages]
+
+        def put(target: "queue.Queue[Any]", item: Any) -> bool:
+            while not stopped.is_set():
+                try:
+                    target.put(item, timeout=PIPELINE_POLL_INTERVAL_S)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(source: "queue.Queue[Any]") -> Any:
+            while not stopped.is_set():
+                try:
+                    return source.get(timeout=PIPELINE_POLL_INTERVAL_S)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def fail(error: BaseException) -> None:
+            with self._lock:
+                errors.append(error)
+            stopped.set()
+
+        def feed() -> None:
+            try:
+                for item in items:
+                    if not put(queues[0], item):
+                        return
+            except BaseException as e:
+                fail(e)
+            finally:
+                put(queues[0], _DONE)
+
+        def work(index: int) -> None:
+            stage, inbox, outbox = self.stages[index], queues[index], queues[index + 1]
+            while (item := get(inbox)) is not _DONE:
+                start = time.monotonic()
+                try:
+                    result = stage.run(item)
+                except BaseException as e:
+                    fail(e)
+                    break
+                end = time.monotonic()
+
+                with self._lock:
+                    stats = self._stats[index]
+                    started[index] = started[index] or start
+                    stats.busy_s += end - start
+                    stats.elapsed_s = end - started[index]
+                    if result is None:
+                        stats.dropped += 1
+                    else:
+                        stats.processed += 1
+                if result is not None and not put(outbox, result):
+                    return
+            else:
+                # Leave the end marker for the stage's other workers
+                put(inbox, _DONE)
+
+            with self._lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last:
+                put(outbox, _DONE)
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads += [
+                threading.Thread(target=work, args=(index,), name=f"{PIPELINE_THREAD_PREFIX}-{stage.name}", daemon=True)
+                for _ in range(stage.workers)
+            ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while (item := get(queues[-1])) is not _DONE:
+                yield item
+        finally:
+            stopped.set()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
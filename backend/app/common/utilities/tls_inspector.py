@@ -0,0 +1,105 @@
+"""
+Concurrent TLS handshakes that harvest server certificates, parsed once per fingerprint.
+"""
+import asyncio
+import contextlib
+import hashlib
+import ssl
+import threading
+from typing import AsyncContextManager
+
+from app import config
+from app.common.constants import *
+from app.common.objects import TlsCertificate
+from app.common.utilities.http_fingerprinter import HttpFingerprinter
+from app.common.utilities.probe_timeouts import ProbeTimeouts
+from app.common.utilities.resource_budget import ResourcePool
+from app.common.utilities.x509_certificate import parse_certificate
+
+
+class TlsInspector:
+    """Certificates of TLS ports, collected with one handshake per port.
+
+    Handshakes of a batch run side by side, at most tls_max_handshakes_per_host at
+    a time against one host, each holding a socket slot. Ports the HTTP
+    fingerprinter already shook hands with reuse the certificate of its fresh
+    fingerprint instead. Every other handshake is still made so replaced
+    certificates are noticed, but a certificate is only decoded the first time its
+    SHA-256 is seen; the most recent TLS_CERTIFICATE_CACHE_SIZE decoded certificates
+    are kept.
+    """
+
+    def __init__(
+        self,
+        sockets: ResourcePool | None = None,
+        timeouts: ProbeTimeouts | None = None,
+        fingerprinter: HttpFingerprinter | None = None,
+    ) -> None:
+        self.sockets = sockets
+        self.timeouts = timeouts or ProbeTimeouts()
+        self.fingerprinter = fingerprinter
+        self._lock = threading.Lock()
+        self._certificates: dict[str, TlsCertificate] = {}
+        self._tls_context = self._create_unverified_context()
+
+    def inspect_many(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], TlsCertificate | None]:
+        return asyncio.run(self.inspect_many_async(targets))
+
+    async def inspect_many_async(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], TlsCertificate | None]:
+        """Certificate (or None when no TLS handshake completed) for every (ip, port)."""
+        targets = list(dict.fromkeys(targets))
+        host_limits = {ip_address: asyncio.Semaphore(config.tls_max_handshakes_per_host) for ip_address, _ in targets}
+
+        async def limited(ip_address: str, port: int) -> TlsCertificate | None:
+            async with host_limits[ip_address]:
+                return await self._inspect(ip_address, port)
+
+        certificates = await asyncio.gather(*(limited(ip_address, port) for ip_address, port in targets))
+        return dict(zip(targets, certificates))
+
+    async def _inspect(self, ip_address: str, port: int) -> TlsCertificate | None:
+        if self.fingerprinter is not None and (der := self.fingerprinter.certificate(ip_address, port)):
+            return self._certificate(der)
+
+        wait = self.timeouts.get(ip_address, config.service_detection_timeout_ms / 1000, service=True)
+        try:
+            async with self._hold_socket():
+                _, writer = await asyncio.wait_for(asyncio.open_connection(ip_address, port, ssl=self._tls_context), wait.seconds)
+                try:
+                    ssl_object = writer.get_extra_info("ssl_object")
+                    der = ssl_object.getpeercert(binary_form=True) if ssl_object is not None else None
+                finally:
+                    writer.close()
+        except asyncio.TimeoutError:
+            wait.expired()
+            return None
+        except OSError:
+            # Includes ssl.SSLError: the port does not speak TLS
+            return None
+
+        return self._certificate(der) if der else None
+
+    def _certificate(self, der: bytes) -> TlsCertificate | None:
+        sha256 = hashlib.sha256(der).hexdigest()
+        with self._lock:
+            certificate = self._certificates.get(sha256)
+        if certificate is not None:
+            return certificate
+
+        certificate = parse_certificate(der)
+        if certificate is not None:
+            with self._lock:
+                self._certificates[sha256] = certificate
+                while len(self._certificates) > TLS_CERTIFICATE_CACHE_SIZE:
+                    del self._certificates[next(iter(self._certificates))]
+        return certificate
+
+    def _hold_socket(self) -> AsyncContextManager[None]:
+        return self.sockets.hold_async() if self.sockets is not None else contextlib.nullcontext()
+
+    def _create_unverified_context(self) -> ssl.SSLContext:
+        """Create a TLS context that accepts self-signed device certificates."""
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
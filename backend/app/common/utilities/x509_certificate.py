@@ -0,0 +1,109 @@
+"""
+Minimal DER decoder for the X.509 certificate fields shown to users.
+"""
+import hashlib
+import ipaddress
+from collections.abc import Iterator
+from datetime import datetime
+
+from app.common.constants import *
+from app.common.objects import TlsCertificate
+
+# (tag, value start, value end) of one DER element
+_Element = tuple[int, int, int]
+
+
+def parse_certificate(der: bytes) -> TlsCertificate | None:
+    """Subject, issuer, subject alternative names and expiry of a DER certificate.
+
+    Only the TBSCertificate fields we display are decoded; None means the bytes
+    are not a well-formed certificate.
+    """
+    view = memoryview(der)
+    try:
+        certificate = _read_element(view, 0, len(view))
+        fields = list(_children(view, next(_children(view, certificate))))
+        index = 1 if fields[0][0] == X509_VERSION_TAG else 0
+        issuer, validity, subject = fields[index + 2], fields[index + 3], fields[index + 4]
+        extensions = next((field for field in fields[index + 6:] if field[0] == X509_EXTENSIONS_TAG), None)
+
+        return TlsCertificate(
+            sha256=hashlib.sha256(der).hexdigest(),
+            subject=_read_name(view, subject),
+            issuer=_read_name(view, issuer),
+            san=_read_san(view, extensions) if extensions else [],
+            not_after=_read_time(view, list(_children(view, validity))[1]),
+        )
+    except (ValueError, IndexError, StopIteration):
+        return None
+
+
+def _read_element(view: memoryview, offset: int, end: int) -> _Element:
+    if offset + 2 > end or view[offset] & DER_HIGH_TAG_NUMBER == DER_HIGH_TAG_NUMBER:
+        raise ValueError("malformed DER element")
+
+    tag, length = view[offset], view[offset + 1]
+    offset += 2
+    if length & DER_LONG_LENGTH_FLAG:
+        length_bytes = length & DER_LENGTH_BYTES_MASK
+        if not 0 < length_bytes <= DER_MAX_LENGTH_BYTES or offset + length_bytes > end:
+            raise ValueError("malformed DER length")
+        length = int.from_bytes(view[offset:offset + length_bytes], "big")
+        offset += length_bytes
+
+    if offset + length > end:
+        raise ValueError("DER element overruns its parent")
+    return tag, offset, offset + length
+
+
+def _children(view: memoryview, element: _Element) -> Iterator[_Element]:
+    _, offset, end = element
+    while offset < end:
+        child = _read_element(view, offset, end)
+        yield child
+        offset = child[2]
+
+
+def _read_name(view: memoryview, name: _Element) -> str | None:
+    """Known attributes of a distinguished name, in certificate order (C=US, O=Acme, CN=host)."""
+    parts: list[str] = []
+    for relative_name in _children(view, name):
+        for attribute in _children(view, relative_name):
+            oid, value = list(_children(view, attribute))[:2]
+            label = X509_NAME_ATTRIBUTES.get(bytes(view[oid[1]:oid[2]]))
+            if label:
+                parts.append(f"{label}={_read_string(view, value)}")
+    return TLS_SUBJECT_SEPARATOR.join(parts) or None
+
+
+def _read_string(view: memoryview, element: _Element) -> str:
+    tag, start, end = element
+    return bytes(view[start:end]).decode(X509_STRING_ENCODINGS.get(tag, DEFAULT_ENCODING), errors=ENCODING_ERROR_HANDLING)
+
+
+def _read_time(view: memoryview, element: _Element) -> datetime | None:
+    """UTCTime or GeneralizedTime as a naive UTC datetime."""
+    tag, start, end = element
+    if tag not in (X509_UTC_TIME_TAG, X509_GENERALIZED_TIME_TAG):
+        return None
+    text = bytes(view[start:end]).decode(ASCII_ENCODING, errors=ENCODING_ERROR_HANDLING)
+    return datetime.strptime(text, X509_UTC_TIME_FORMAT if tag == X509_UTC_TIME_TAG else X509_GENERALIZED_TIME_FORMAT)
+
+
+def _read_san(view: memoryview, extensions: _Element) -> list[str]:
+    """DNS names and IP addresses of the subjectAltName extension."""
+    for extension in _children(view, next(_children(view, extensions))):
+        parts = list(_children(view, extension))
+        oid, value = parts[0], parts[-1]
+        if bytes(view[oid[1]:oid[2]]) != X509_SAN_OID:
+            continue
+
+        names: list[str] = []
+        general_names = _read_element(view, value[1], value[2])
+        for tag, start, end in _children(view, general_names):
+            if tag == X509_SAN_DNS_TAG:
+                names.append(bytes(view[start:end]).decode(ASCII_ENCODING, errors=ENCODING_ERROR_HANDLING))
+            elif tag == X509_SAN_IP_TAG:
+                names.append(str(ipaddress.ip_address(bytes(view[start:end]))))
+        return names
+    return []
@@ -24,13 +24,59 @@ class Config(BaseSettings):
     scan_check_interval_s: int = Field(default=10, ge=5)
     background_scan_interval_s: int = Field(default=60, ge=60)
     background_full_scan_interval_s: int = Field(default=300, ge=60)
+    incremental_full_scans: bool = Field(default=True)
+    deep_scan_every: int = Field(default=12, ge=1)
+    adaptive_scheduling: bool = Field(default=True)
+    host_min_interval_s: int = Field(default=20, ge=1)
+    host_max_interval_s: int = Field(default=600, ge=1)
+    dead_host_max_interval_s: int = Field(default=3600, ge=1)
+    dead_address_suppression: bool = Field(default=True)
+    dead_address_misses: int = Field(default=3, ge=1)
+    dead_address_min_interval_s: int = Field(default=300, ge=1)
+    dead_address_max_interval_s: int = Field(default=21600, ge=1)
+    scan_result_queue_size: int = Field(default=64, ge=1)
+    scan_save_batch_size: int = Field(default=32, ge=1)
     
     # Network configuration
     subnet: str = Field(default='192.168.0', pattern=r'^\d{1,3}\.\d{1,3}\.\d{1,3}$')
     min_scan_ip: int = Field(default=1, ge=1, le=254)
     max_scan_ip: int = Field(default=254, ge=1, le=254)
     max_threads: int = Field(default=254)
+    scan_engine: str = Field(default='threaded', pattern=r'^(threaded|asyncio)$')
+    scan_order: str = Field(default='host', pattern=r'^(host|stage)$')
+    max_concurrent_probes: int = Field(default=512, ge=1)
+    tcp_max_in_flight: int = Field(default=1024, ge=1)
+    tcp_max_in_flight_per_host: int = Field(default=64, ge=1)
+    nmap_services_path: str = Field(default="")
+    max_open_sockets: int = Field(default=1024, ge=1)
+    max_subprocesses: int = Field(default=64, ge=1)
+    
+    # Stage-major pipeline configuration (SCAN_ORDER=stage)
+    pipeline_liveness_workers: int = Field(default=64, ge=1)
+    pipeline_link_workers: int = Field(default=32, ge=1)
+    pipeline_port_workers: int = Field(default=64, ge=1)
+    pipeline_service_workers: int = Field(default=32, ge=1)
+    pipeline_discovery_workers: int = Field(default=16, ge=1)
+    pipeline_queue_size: int = Field(default=64, ge=1)
+    
+    # Discovery sweep configuration
+    discovery_sweeps: bool = Field(default=True)
+    discovery_sweep_max_age_s: int = Field(default=300, ge=0)
+    mdns_listen_window_ms: int = Field(default=1500, ge=1)
+    ssdp_mx_s: int = Field(default=2, ge=1, le=5)
+    upnp_fetch_descriptions: bool = Field(default=True)
+    upnp_fetch_workers: int = Field(default=16, ge=1)
+    netbios_sweep_window_ms: int = Field(default=1500, ge=1)
     ping_count: int = Field(default=3)
+    icmp_sweep: bool = Field(default=True)
+    
+    # MAC resolution configuration
+    interface_cache_ttl_s: int = Field(default=300, ge=1)
+    neighbor_cache: bool = Field(default=True)
+    # Entries without a confirmation age (the /proc/net/arp fallback when `ip neigh` is unavailable) are trusted until the kernel expires them
+    neighbor_cache_max_age_s: int = Field(default=60, ge=0)
+    oui_registry_paths: str = Field(default="")
+    oui_reload_check_s: int = Field(default=60, ge=0)
     
     # Retry configuration
     arp_max_retries: int = Field(default=3, ge=1)
@@ -46,8 +92,30 @@ class Config(BaseSettings):
     hostname_timeout_ms: int = Field(default=1000)
     port_scan_timeout_ms: int = Field(default=1000)
     service_detection_timeout_ms: int = Field(default=2000)
+    banner_grab_window_ms: int = Field(default=500, ge=0)
     discovery_timeout_ms: int = Field(default=3000)
     
+    # Adaptive timeout configuration (config timeouts above act as ceilings)
+    adaptive_timeouts: bool = Field(default=True)
+    rtt_variance_factor: float = Field(default=4.0, ge=0)
+    min_probe_timeout_ms: int = Field(default=100, ge=1)
+    min_service_timeout_ms: int = Field(default=500, ge=1)
+    
+    # Reverse DNS configuration (hostname_timeout_ms bounds each lookup window)
+    dns_server: str | None = Field(default=None)
+    dns_port: int = Field(default=53, ge=1, le=65535)
+    dns_cache_max_ttl_s: int = Field(default=3600, ge=0)
+    dns_negative_ttl_s: int = Field(default=300, ge=0)
+    dns_timeout_ttl_s: int = Field(default=60, ge=0)
+    
+    # HTTP fingerprinting configuration (service_detection_timeout_ms bounds each request)
+    http_fingerprint_concurrency: int = Field(default=64, ge=1)
+    http_max_body_bytes: int = Field(default=16384, ge=0)
+    http_fingerprint_max_age_s: int = Field(default=900, ge=0)
+    
+    # TLS certificate harvesting configuration
+    tls_max_handshakes_per_host: int = Field(default=4, ge=1)
+    
     class Config:
         env_file = '.env'
         env_file_encoding = 'utf-8'
@@ -5,6 +5,8 @@ from typing import Any, Type, TypeVar
 
 from fastapi import Request
 
+from app.common.constants import SCAN_ENGINE_ASYNCIO
+from app.common.utilities import HttpFingerprinter, OuiIndex, ProbeTimeouts, ResourceBudget, ReverseResolver, ServiceRegistry, TlsInspector
 from app.config import Config
 from app.database import Database
 from app.database.interfaces import DatabaseInterface
@@ -49,12 +51,21 @@ def create_services(config: Config, database: DatabaseInterface) -> Container:
     container.set_database(database)
 
     # Create service instances
-    ping_service = PingService()
-    mac_service = MacService(database)
-    port_service = PortService(database)
-    discovery_service = DiscoveryService(database)
-    protocol_service = ProtocolService()
-    scan_service = ScanService(database, ping_service, mac_service, port_service, discovery_service, protocol_service)
+    budget = ResourceBudget(config.max_open_sockets, config.max_subprocesses, config.max_concurrent_probes)
+    timeouts = ProbeTimeouts()
+    resolver = ReverseResolver(budget.sockets)
+    ping_service = PingService(budget, resolver)
+    vendors = OuiIndex()
+    mac_service = MacService(database, budget, timeouts, vendors)
+    services = ServiceRegistry.from_config()
+    port_service = PortService(database, budget, timeouts, services)
+    discovery_service = DiscoveryService(database, budget, timeouts)
+    fingerprinter = HttpFingerprinter(budget.sockets, timeouts)
+    inspector = TlsInspector(budget.sockets, timeouts)
+    protocol_service = ProtocolService(budget, timeouts, fingerprinter, inspector)
+    suppression_service = SuppressionService(database)
+    scan_service_type = AsyncScanService if config.scan_engine == SCAN_ENGINE_ASYNCIO else ScanService
+    scan_service = scan_service_type(database, ping_service, mac_service, port_service, discovery_service, protocol_service, suppression_service, budget, timeouts, services)
     scanning_service = ScanningService(scan_service)
     device_service = DeviceService(database, mac_service)
     owner_service = OwnerService(database)
@@ -64,11 +75,19 @@ def create_services(config: Config, database: DatabaseInterface) -> Container:
     # Register services
     container.register(Config, config)
     container.register(DatabaseInterface, database)
+    container.register(ResourceBudget, budget)
+    container.register(ProbeTimeouts, timeouts)
+    container.register(ReverseResolver, resolver)
+    container.register(OuiIndex, vendors)
+    container.register(ServiceRegistry, services)
+    container.register(HttpFingerprinter, fingerprinter)
+    container.register(TlsInspector, inspector)
     container.register(PingServiceInterface, ping_service)
     container.register(MacServiceInterface, mac_service)
     container.register(PortServiceInterface, port_service)
     container.register(DiscoveryServiceInterface, discovery_service)
     container.register(ProtocolServiceInterface, protocol_service)
+    container.register(SuppressionServiceInterface, suppression_service)
     container.register(ScanServiceInterface, scan_service)
     container.register(ScanningServiceInterface, scanning_service)
     container.register(DeviceServiceInterface, device_service)
@@ -110,6 +129,11 @@ def get_protocol_service(request: Request) -> ProtocolServiceInterface:
     return request.app.state.container.get(ProtocolServiceInterface)
 
 
+def get_suppression_service(request: Request) -> SuppressionServiceInterface:
+    """Get dead-address suppression service from container."""
+    return request.app.state.container.get(SuppressionServiceInterface)
+
+
 def get_scan_service(request: Request) -> ScanServiceInterface:
     """Get scan service from container."""
     return request.app.state.container.get(ScanServiceInterface)
@@ -148,6 +172,7 @@ async def container_lifespan(app: Any):
     # Create config and database
     config = Config()
     database = Database(config.database_url)
+    database.migrate()
     
     # Create services container
     container = create_services(config, database)
@@ -1,8 +1,10 @@
+from .batch import Batch
 from .database import Database
 from .relation import Relation
 from .query import Query
 
 __all__ = [
+    "Batch",
     "Database",
     "Relation",
     "Query",
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Any, TypeVar
+
+from sqlmodel import Session, delete, select
+
+from app.database.interfaces import BatchInterface
+from app.database.models import BaseModel
+
+T = TypeVar("T", bound=BaseModel)
+U = TypeVar("U", bound=Any)
+
+class Batch(BatchInterface):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def select_in(self, model: type[T], column: U, values: list[U]) -> list[T]:
+        if not values:
+            return []
+        statement = select(model).where(column.in_(values)).where(model.deleted == False)
+        return list(self.session.exec(statement))
+
+    def create(self, instance: BaseModel) -> None:
+        instance.created_at = datetime.now()
+        self.session.add(instance)
+
+    def update(self, instance: BaseModel) -> None:
+        instance.updated_at = datetime.now()
+        self.session.add(instance)
+
+    def hard_delete_in(self, model: type[T], column: U, values: list[U]) -> None:
+        if values:
+            self.session.exec(delete(model).where(column.in_(values)))  # type: ignore[call-overload]
+
+    def flush(self) -> None:
+        self.session.flush()
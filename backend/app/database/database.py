@@ -1,11 +1,15 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from typing import TypeVar
 
-from sqlalchemy import Engine
+from sqlalchemy import Engine, inspect
 from sqlmodel import Session, SQLModel, create_engine
 
 import app.database.models  # type: ignore[unused-import]
-from app.database.interfaces import DatabaseInterface
+from app.database.batch import Batch
+from app.database.interfaces import BatchInterface, DatabaseInterface
+from app.database.migrations import run_migrations, stamp_schema
 from app.database.models import BaseModel
 from app.database.query import Query
 
@@ -18,8 +22,16 @@ class Database(DatabaseInterface):
     def __init__(self, db_url: str):
         self.url = db_url
         self.engine = create_engine(self.url, connect_args={"check_same_thread": False})
+        fresh = not inspect(self.engine).get_table_names()
         SQLModel.metadata.create_all(self.engine)
+        if fresh:
+            # A new database already has the current schema
+            stamp_schema(self.engine)
     
+    def migrate(self) -> int:
+        """Bring a database file created by an earlier version up to the current schema; returns the migrations applied."""
+        return run_migrations(self.engine)
+
     def select(self, model: type[T]) -> Query[T]:
         return Query(self.engine, model).where(model.deleted == False)  
 
@@ -49,4 +61,10 @@ class Database(DatabaseInterface):
         with Session(self.engine) as session:
             merged = session.merge(instance)
             session.delete(merged)
-            session.commit()
\ No newline at end of file
+            session.commit()
+            
+    @contextmanager
+    def batch(self) -> Iterator[BatchInterface]:
+        with Session(self.engine) as session:
+            yield Batch(session)
+            session.commit()
@@ -1,7 +1,9 @@
 from .query_interface import QueryInterface
+from .batch_interface import BatchInterface
 from .database_interface import DatabaseInterface
 
 __all__ = [
     "QueryInterface",
+    "BatchInterface",
     "DatabaseInterface",
     ]
\ No newline at end of file
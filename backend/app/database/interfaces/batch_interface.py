@@ -0,0 +1,29 @@
+from typing import Any, Protocol, TypeVar
+
+from app.database.models import BaseModel
+
+T = TypeVar("T", bound=BaseModel)
+U = TypeVar("U", bound=Any)
+
+class BatchInterface(Protocol):
+    """Interface for grouping many writes into a single transaction."""
+
+    def select_in(self, model: type[T], column: U, values: list[U]) -> list[T]:
+        """Load the non-deleted records whose column matches any of the values."""
+        ...
+
+    def create(self, instance: BaseModel) -> None:
+        """Insert a new record as part of the batch."""
+        ...
+
+    def update(self, instance: BaseModel) -> None:
+        """Update a record loaded through this batch."""
+        ...
+
+    def hard_delete_in(self, model: type[T], column: U, values: list[U]) -> None:
+        """Permanently delete every record whose column matches any of the values."""
+        ...
+
+    def flush(self) -> None:
+        """Send pending writes so generated ids become available."""
+        ...
@@ -1,6 +1,7 @@
+from contextlib import AbstractContextManager
 from typing import Protocol, TypeVar
 
-from app.database.interfaces import QueryInterface
+from app.database.interfaces import BatchInterface, QueryInterface
 from app.database.models import BaseModel
 
 T = TypeVar("T", bound=BaseModel)
@@ -26,4 +27,8 @@ class DatabaseInterface(Protocol):
 
     def hard_delete(self, instance: BaseModel) -> None:
         """Permanently delete a record from the database."""
-        ...
\ No newline at end of file
+        ...
+
+    def batch(self) -> AbstractContextManager[BatchInterface]:
+        """Group writes into one transaction that is committed when the block exits."""
+        ...
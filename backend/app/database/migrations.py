@@ -0,0 +1,50 @@
+"""
+Schema migrations for database files created by earlier versions.
+
+create_all() only adds missing tables, so columns added to existing tables need
+an explicit step. Migrations run once each, in order, and the schema version is
+kept in SQLite's user_version.
+"""
+from sqlalchemy import Connection, Engine, text
+
+# Migration N brings the schema from version N - 1 to N
+MIGRATIONS: list[tuple[str, ...]] = [
+    # 1: TLS certificate fields of open ports
+    (
+        "ALTER TABLE port ADD COLUMN tls_subject VARCHAR",
+        "ALTER TABLE port ADD COLUMN tls_issuer VARCHAR",
+        "ALTER TABLE port ADD COLUMN tls_san VARCHAR",
+        "ALTER TABLE port ADD COLUMN tls_not_after DATETIME",
+        "ALTER TABLE port ADD COLUMN tls_sha256 VARCHAR(64)",
+    ),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def run_migrations(engine: Engine) -> int:
+    """Apply the pending migrations, each in its own transaction; returns how many ran."""
+    with engine.connect() as connection:
+        version = _schema_version(connection)
+
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+            _set_schema_version(connection, number)
+    return max(0, SCHEMA_VERSION - version)
+
+
+def stamp_schema(engine: Engine) -> None:
+    """Mark a database created from the current models as up to date."""
+    with engine.begin() as connection:
+        _set_schema_version(connection, SCHEMA_VERSION)
+
+
+def _schema_version(connection: Connection) -> int:
+    return int(connection.execute(text("PRAGMA user_version")).scalar() or 0)
+
+
+def _set_schema_version(connection: Connection, version: int) -> None:
+    # PRAGMA takes no bound parameters; the version is always an int
+    connection.execute(text(f"PRAGMA user_version = {int(version)}"))
@@ -6,6 +6,7 @@ from .location import Location
 from .mac import Mac
 from .owner import Owner
 from .port import Port
+from .unresponsive_address import UnresponsiveAddress
 
 __all__ = [
     "BaseModel",
@@ -16,4 +17,5 @@ __all__ = [
     "Mac",
     "Owner",
     "Port",
+    "UnresponsiveAddress",
 ]
\ No newline at end of file
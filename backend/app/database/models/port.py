@@ -4,6 +4,7 @@ Port model.
 Represents an open network port on a MAC address.
 """
 
+from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
 from sqlmodel import Field
@@ -21,6 +22,11 @@ class Port(BaseModel, table=True):
     service: str | None = Field(default=None, max_length=100)
     banner: str | None = Field(default=None)
     state: str = Field(default="open", nullable=False, max_length=20)
+    tls_subject: str | None = Field(default=None)
+    tls_issuer: str | None = Field(default=None)
+    tls_san: str | None = Field(default=None)
+    tls_not_after: datetime | None = Field(default=None)
+    tls_sha256: str | None = Field(default=None, max_length=64)
 
     mac_id: int = Field(foreign_key="mac.id")
     mac: Optional["Mac"] = Relation().backward("Port", "Mac")
@@ -0,0 +1,18 @@
+"""
+Unresponsive address model.
+
+Tracks consecutive missed liveness checks of an address and when it is probed next.
+"""
+
+from datetime import datetime
+
+from sqlmodel import Field
+
+from app.database.models import BaseModel
+
+
+class UnresponsiveAddress(BaseModel, table=True):
+    """Address that stopped answering liveness checks."""
+    ip_address: str = Field(nullable=False, unique=True, max_length=45)
+    misses: int = Field(default=0, nullable=False)
+    next_probe_at: datetime | None = Field(default=None)
@@ -1,3 +1,4 @@
+from .async_scan_service import AsyncScanService
 from .category_service import CategoryService
 from .device_service import DeviceService
 from .discovery_service import DiscoveryService
@@ -9,8 +10,10 @@ from .port_service import PortService
 from .protocol_service import ProtocolService
 from .scan_service import ScanService
 from .scanning_service import ScanningService
+from .suppression_service import SuppressionService
 
 __all__ = [
+    "AsyncScanService",
     "CategoryService",
     "DeviceService",
     "DiscoveryService",
@@ -22,4 +25,5 @@ __all__ = [
     "ProtocolService",
     "ScanService",
     "ScanningService",
+    "SuppressionService",
 ]
\ No newline at end of file
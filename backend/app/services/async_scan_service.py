@@ -0,0 +1,229 @@
+import asyncio
+import queue
+import threading
+from collections.abc import Iterator
+from functools import partial
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app import config
+from app.common.constants import *
+from app.common.objects import AddressData, DiscoveryInfo, PingReply, ProbeStage, ScanOptions
+from app.common.utilities import run_probe_graph_async
+from app.services.scan_service import ScanService
+
+T = TypeVar('T')
+
+
+class AsyncScanService(ScanService):
+    """Scan service that runs every probe on a single asyncio event loop.
+
+    Instead of one thread per address (plus per-host port pools), all probes share
+    one event loop and the probe pool of the shared resource budget, so thread count and memory stay
+    flat as the scanned range grows. Blocking library calls (scapy ARP, vendor
+    lookup) are pushed to the loop's bounded default executor.
+    """
+
+    def _stream_addresses(self, ip_range: list[str], scan_options: ScanOptions) -> Iterator[AddressData]:
+        """Scan every address in the range on one event loop, yielding hosts as they complete.
+        
+        The loop runs on a helper thread and hands results over through a bounded
+        queue, so a slow consumer holds back further hosts instead of buffering them.
+        A consumer that stops early cancels the loop, and the thread is joined either way.
+        """
+        results: queue.Queue[AddressData | BaseException | None] = queue.Queue(maxsize=config.scan_result_queue_size)
+        stopped = threading.Event()
+        cancels: list[Callable[[], None]] = []
+
+        async def produce() -> None:
+            task = asyncio.current_task()
+            assert task is not None
+            cancels.append(partial(asyncio.get_running_loop().call_soon_threadsafe, task.cancel))
+            if not stopped.is_set():
+                await self._produce_addresses_async(ip_range, scan_options, results)
+
+        def run_loop() -> None:
+            try:
+                asyncio.run(produce())
+            except BaseException as e:
+                results.put(e)
+            finally:
+                results.put(None)
+
+        producer = threading.Thread(target=run_loop, name=ASYNC_PRODUCER_THREAD_NAME, daemon=True)
+        producer.start()
+        finished = False
+        try:
+            while (item := results.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+            finished = True
+        finally:
+            if not finished:
+                stopped.set()
+                for cancel in cancels:
+                    try:
+                        cancel()
+                    except RuntimeError:
+                        pass # The loop already finished and closed
+                # Unblock a pending put until the thread signs off
+                while results.get() is not None:
+                    pass
+            producer.join()
+
+    def scan_ip(self, ip_address: str, scan_options: ScanOptions) -> AddressData | None:
+        """Scan a specific IP address."""
+        return asyncio.run(self._scan_ip_async(ip_address, scan_options))
+
+    async def _produce_addresses_async(
+        self,
+        ip_addresses: list[str],
+        scan_options: ScanOptions,
+        results: "queue.Queue[AddressData | BaseException | None]",
+    ) -> None:
+        """Scan the addresses concurrently and put each live host on the results queue."""
+        ping_results = await self._run_blocking(self._sweep_ping, ip_addresses)
+        await self._run_blocking(self._refresh_neighbors, scan_options)
+        live_addresses = ip_addresses if ping_results is None else list(ping_results)
+        await self._run_blocking(self._sweep_netbios, live_addresses, scan_options)
+        await self._run_blocking(self._resolve_hostnames, live_addresses, scan_options)
+
+        work: asyncio.Queue[tuple[str, tuple[int, str | PingReply] | None]] = asyncio.Queue()
+        for ip, result in (dict.fromkeys(ip_addresses) if ping_results is None else ping_results).items():
+            work.put_nowait((ip, result))
+
+        async def worker() -> None:
+            while not work.empty():
+                ip, result = work.get_nowait()
+                device = await self._scan_ip_async(ip, scan_options, result)
+                if device is not None:
+                    await self._run_blocking(results.put, device)
+
+        # One worker per probe slot, so tasks stay bounded however large the range is
+        await asyncio.gather(*(worker() for _ in range(min(self.budget.probes.limit, work.qsize()))))
+
+    async def _scan_ip_async(
+        self,
+        ip_address: str,
+        scan_options: ScanOptions,
+        ping_result: tuple[int, str | PingReply] | None = None,
+    ) -> AddressData | None:
+        """Scan a specific IP address, holding a probe slot of the shared budget for every probe.
+
+        After the liveness check the probes run as the same dependency graph as the
+        threaded engine, each stage a task on the event loop.
+        """
+        # Ping the IP, unless a sweep already proved it is alive
+        if ping_result is None:
+            self._print_status(f"{ip_address} Scanning started")
+            ping_result = await self._limited(self.ping_service.ping_async(ip_address, once=self.suppression_service.is_suppressed(ip_address)))
+        host = self._start_host(ip_address, ping_result)
+        if host is None:
+            return None # IP is unreachable, skip further steps
+
+        scan_result, ping_out = host
+        await run_probe_graph_async(self._probe_stages_async(ip_address, scan_options, scan_result, ping_out))
+        self._remember_host(scan_options, scan_result)
+        return scan_result
+
+    def _probe_stages_async(self, ip_address: str, scan_options: ScanOptions, scan_result: AddressData, ping_out: str | PingReply) -> list[ProbeStage]:
+        discoveries: dict[str, DiscoveryInfo | None] = {}
+
+        async def discover(protocol: str) -> None:
+            discoveries[protocol] = await self._discover_async(ip_address, protocol)
+
+        async def add_discoveries() -> None:
+            self._add_discoveries(scan_result, discoveries)
+
+        probes: dict[str, Callable[[], Awaitable[None]]] = {
+            PROBE_STAGE_MAC: lambda: self._resolve_mac_async(ip_address, scan_result),
+            PROBE_STAGE_TTL: lambda: self._run_inline(self._read_ttl, ip_address, scan_result, ping_out),
+            PROBE_STAGE_HOSTNAME: lambda: self._lookup_hostname_async(ip_address, scan_result),
+            PROBE_STAGE_VENDOR: lambda: self._run_blocking(self._lookup_vendor, ip_address, scan_result),
+            PROBE_STAGE_OS: lambda: self._run_inline(self._guess_os, ip_address, scan_result),
+            PROBE_STAGE_PORTS: lambda: self._scan_ports_async(ip_address, scan_result),
+            PROBE_STAGE_HTTP: lambda: self._detect_http_async(ip_address, scan_result),
+            PROBE_STAGE_TLS: lambda: self._collect_certificates_async(ip_address, scan_result),
+            PROBE_STAGE_BANNERS: lambda: self._detect_banners_async(ip_address, scan_options, scan_result),
+            NETBIOS_PROTOCOL_NAME: partial(discover, NETBIOS_PROTOCOL_NAME),
+            UPNP_PROTOCOL_NAME: partial(discover, UPNP_PROTOCOL_NAME),
+            MDNS_PROTOCOL_NAME: partial(discover, MDNS_PROTOCOL_NAME),
+            PROBE_STAGE_DISCOVERIES: add_discoveries,
+            PROBE_STAGE_VERIFY: lambda: self._limited(self._run_blocking(self._verify_host, ip_address, scan_options, scan_result)),
+        }
+
+        async def skipped() -> None:
+            pass
+
+        def unless_verified(run: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+            return lambda: skipped() if self._is_verified(ip_address) else run()
+
+        return [
+            ProbeStage(name, probes[name] if name in PROBE_STAGES_LINK or name == PROBE_STAGE_VERIFY else unless_verified(probes[name]), after)
+            for name, after in self._probe_plan(ip_address, scan_options, ping_out)
+        ]
+
+    async def _limited(self, probe: Awaitable[T]) -> T:
+        async with self.budget.probes.hold_async():
+            return await probe
+
+    async def _run_inline(self, func: Callable[..., None], *args: Any) -> None:
+        """Run a cheap stage that does no I/O directly on the event loop."""
+        func(*args)
+
+    async def _resolve_mac_async(self, ip_address: str, scan_result: AddressData) -> None:
+        self._print_status(f"{ip_address} MAC resolution started")
+        arp_result = await self._limited(self._run_blocking(self.mac_service.resolve_mac_address, ip_address))
+        if arp_result:
+            scan_result.mac_address, scan_result.arp_time_ms = arp_result
+
+    async def _lookup_hostname_async(self, ip_address: str, scan_result: AddressData) -> None:
+        self._print_status(f"{ip_address} Resolving hostname")
+        scan_result.hostname = await self._limited(self.ping_service.get_hostname_async(ip_address))
+
+    async def _scan_ports_async(self, ip_address: str, scan_result: AddressData) -> None:
+        # The port service takes a probe slot per port itself
+        self._print_status(f"{ip_address} Port scanning started")
+        scan_result.open_ports = await self.port_service.scan_ports_async(ip_address, TCP_COMMON_PORTS, UDP_COMMON_PORTS)
+
+    async def _detect_http_async(self, ip_address: str, scan_result: AddressData) -> None:
+        web_ports = self._web_ports(scan_result)
+        if web_ports:
+            self._print_status(f"{ip_address} Checking HTTP services on {len(web_ports)} ports")
+            http_services = await self._limited(self.protocol_service.detect_http_many_async([(ip_address, port) for port in web_ports]))
+            for (_, port), result in http_services.items():
+                scan_result.services_info[port] = result
+
+    async def _collect_certificates_async(self, ip_address: str, scan_result: AddressData) -> None:
+        tls_ports = self._tls_ports(scan_result)
+        if tls_ports:
+            self._print_status(f"{ip_address} Collecting TLS certificates on {len(tls_ports)} ports")
+            certificates = await self._limited(self.protocol_service.inspect_tls_many_async([(ip_address, port) for port in tls_ports]))
+            for (_, port), certificate in certificates.items():
+                tls_ports[port].certificate = certificate
+
+    async def _detect_banners_async(self, ip_address: str, scan_options: ScanOptions, scan_result: AddressData) -> None:
+        for port_info in scan_result.open_ports:
+            service_name = self.services.name(port_info.number, port_info.protocol)
+            service_kind = self.services.kind(port_info.number, port_info.protocol)
+
+            if scan_options.detect_ssh and service_kind == SERVICE_KIND_SSH:
+                self._print_status(f"{ip_address}:{port_info.number} Checking SSH service")
+                result = await self._limited(self.protocol_service.detect_ssh_async(ip_address, port_info.number, port_info.banner))
+                if result:
+                    scan_result.services_info[port_info.number] = result
+
+            if scan_options.detect_banners and service_kind == SERVICE_KIND_BANNER:
+                self._print_status(f"{ip_address}:{port_info.number} Checking banner")
+                result = await self._limited(self.protocol_service.detect_banner_async(ip_address, port_info.number, service_name, port_info.banner))
+                if result:
+                    scan_result.services_info[port_info.number] = result
+
+    async def _discover_async(self, ip_address: str, protocol: str) -> DiscoveryInfo | None:
+        self._print_status(f"{ip_address} Discovering {protocol} devices")
+        discover: Callable[[str], Awaitable[DiscoveryInfo | None]] = getattr(self.discovery_service, f"discover_{protocol}_async")
+        return await self._limited(discover(ip_address))
+
+    async def _run_blocking(self, func: Any, *args: Any) -> Any:
+        """Run a blocking library call on the event loop's bounded default executor."""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
@@ -1,10 +1,20 @@
+import select
 import socket
 import struct
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ElementTree
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 
 from app import config
 from app.common.constants import *
-from app.common.objects import DiscoveryInfo
-from app.database.interfaces import DatabaseInterface
+from app.common.objects import DeviceDescription, DiscoveryInfo, DnsRecord, NetbiosName, NetbiosNameTable, SsdpResponse
+from app.common.utilities import ProbeTimeouts, ResourceBudget, multicast_query, parse_dns_message, udp_request
+from app.database.interfaces import BatchInterface, DatabaseInterface
 from app.database.models import Discovery, Mac
 from app.services.interfaces import DiscoveryServiceInterface
 
@@ -12,8 +22,16 @@ from app.services.interfaces import DiscoveryServiceInterface
 class DiscoveryService(DiscoveryServiceInterface):
     """Service for managing network discovery operations."""
 
-    def __init__(self, database: DatabaseInterface) -> None:
+    def __init__(self, database: DatabaseInterface, budget: ResourceBudget | None = None, timeouts: ProbeTimeouts | None = None) -> None:
         self.database = database
+        self.budget = budget or ResourceBudget.from_config()
+        self.timeouts = timeouts or ProbeTimeouts()
+        
+        self._sweep_lock = threading.Lock()
+        self._sweeps: dict[str, tuple[float, dict[str, DiscoveryInfo]]] = {}
+        
+        self._description_lock = threading.Lock()
+        self._descriptions: dict[str, tuple[str | None, DeviceDescription]] = {}
 
     def save_discoveries(self, mac: Mac, discoveries: list[DiscoveryInfo]) -> None:
         """Save discovery data for a MAC address."""
@@ -27,161 +45,519 @@ class DiscoveryService(DiscoveryServiceInterface):
 
         # Add new discovery data
         for discovery_info in discoveries:
-            discovery = Discovery(
-                mac_id=mac.id,
-                protocol=discovery_info.protocol,
-                device_name=discovery_info.device_name,
-                device_type=discovery_info.device_type,
-                manufacturer=discovery_info.manufacturer,
-                model=discovery_info.model,
-            )
-            self.database.create(discovery)
+            self.database.create(self._new_discovery(mac.id, discovery_info))
+
+    def save_all_discoveries(self, batch: BatchInterface, discoveries_by_mac: dict[int, list[DiscoveryInfo]]) -> None:
+        """Replace discovery data for many MAC records inside one batch."""
+        batch.hard_delete_in(Discovery, Discovery.mac_id, list(discoveries_by_mac))
+        
+        for mac_id, discoveries in discoveries_by_mac.items():
+            for discovery_info in discoveries:
+                batch.create(self._new_discovery(mac_id, discovery_info))
+
+    def sweep_mdns(self) -> dict[str, DiscoveryInfo]:
+        """Discover mDNS responders on the whole subnet with one multicast query.
+        
+        Replies are collected for mdns_listen_window_ms and attributed to their
+        source address; discover_mdns answers from this table while it is fresh.
+        """
+        window = config.mdns_listen_window_ms / 1000
+        with self.budget.sockets.hold():
+            responses = multicast_query(MDNS_MULTICAST_GROUP, MDNS_PORT, self._build_mdns_query(), window)
+        
+        results: dict[str, DiscoveryInfo] = {}
+        for source, response in responses:
+            if source not in results:
+                info = self._mdns_info(response, source)
+                if info:
+                    results[source] = info
+        
+        self._store_sweep(MDNS_PROTOCOL_NAME, results)
+        return results
+
+    def sweep_upnp(self) -> dict[str, SsdpResponse]:
+        """Discover UPnP devices on the whole subnet with one multicast M-SEARCH.
+        
+        Replies are collected during the MX window and indexed by source address.
+        With upnp_fetch_descriptions on, the LOCATION device descriptions are then
+        fetched concurrently (cached by URL and revalidated by ETag) to fill in
+        names and models; discover_upnp answers from the result while it is fresh.
+        """
+        mx = config.ssdp_mx_s
+        with self.budget.sockets.hold():
+            responses = multicast_query(SSDP_MULTICAST_GROUP, UPNP_PORT, self._build_ssdp_request(mx), mx + SSDP_RESPONSE_SLACK_S)
+        
+        index: dict[str, SsdpResponse] = {}
+        for source, response in responses:
+            if source not in index:
+                ssdp_response = self._parse_ssdp_response(source, response)
+                if ssdp_response:
+                    index[source] = ssdp_response
+        
+        descriptions = self._fetch_descriptions(index.values()) if config.upnp_fetch_descriptions else {}
+        results = {ip: self._ssdp_info(ssdp_response, descriptions.get(ip)) for ip, ssdp_response in index.items()}
+        
+        self._store_sweep(UPNP_PROTOCOL_NAME, results)
+        return index
 
     def discover_mdns(self, ip_address: str) -> DiscoveryInfo | None:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(config.discovery_timeout_ms / 1000)
-            
-            query_packet = struct.pack(STRUCT_PACK_FORMAT, 
-                MDNS_TRANSACTION_ID, 
-                MDNS_FLAGS, 
-                MDNS_QUESTIONS_COUNT,     
-                MDNS_ANSWERS_COUNT,      
-                MDNS_AUTHORITY_COUNT,      
-                MDNS_ADDITIONAL_COUNT      
-            )
-            
-            service_query = MDNS_SERVICE_QUERY
-            query_packet += service_query
+        swept, info = self._swept_result(MDNS_PROTOCOL_NAME, ip_address)
+        if swept:
+            return info
+        
+        wait = self.timeouts.get(ip_address, config.discovery_timeout_ms / 1000, service=True)
+        with self.budget.sockets.hold():
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.settimeout(wait.seconds)
             
-            sock.sendto(query_packet, (ip_address, MDNS_PORT))
+                sock.sendto(self._build_mdns_query(), (ip_address, MDNS_PORT))
             
-            try:
-                response, _ = sock.recvfrom(SOCKET_BUFFER_SIZE)
-                device_name = self._parse_mdns_response(response, ip_address)
-                
-                if device_name:
-                    return DiscoveryInfo(
-                        protocol=MDNS_PROTOCOL_NAME,
-                        device_name=device_name,
-                        device_type=MDNS_DEVICE_TYPE
-                    )
+                try:
+                    response, _ = sock.recvfrom(SOCKET_BUFFER_SIZE)
+                    return self._mdns_info(response, ip_address)
             
-            except socket.timeout:
-                pass
-            finally:
-                sock.close()
+                except socket.timeout:
+                    wait.expired()
+                finally:
+                    sock.close()
         
-        except (socket.error, struct.error):
-            pass
+            except (socket.error, struct.error):
+                pass
         
         return None
 
-    def discover_netbios(self, ip_address: str) -> DiscoveryInfo | None:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(config.discovery_timeout_ms / 1000)
-            
-            query_packet = struct.pack(
-                STRUCT_PACK_FORMAT, 
-                NETBIOS_TRANSACTION_ID, 
-                NETBIOS_QUERY_FLAGS,        
-                NETBIOS_QUESTIONS_COUNT,             
-                NETBIOS_ANSWERS_COUNT,            
-                NETBIOS_AUTHORITY_COUNT,            
-                NETBIOS_ADDITIONAL_COUNT        
-            )
+    def sweep_netbios(self, ip_addresses: list[str]) -> dict[str, NetbiosNameTable]:
+        """Query the node status of many hosts from a single UDP socket.
+        
+        Every host gets its own transaction ID so replies can be matched back to
+        it, and all replies are collected in one netbios_sweep_window_ms window
+        instead of one timeout per host. discover_netbios answers from the result
+        while it is fresh.
+        """
+        tables: dict[str, NetbiosNameTable] = {}
+        with self.budget.sockets.hold():
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            except OSError:
+                return tables
             
-            name_query = NETBIOS_NAME_LENGTH + NETBIOS_WILDCARD + NETBIOS_QUERY_SUFFIX
-            query_packet += name_query
+            with sock:
+                pending: dict[int, str] = {}
+                for index, ip_address in enumerate(ip_addresses):
+                    transaction_id = (index + 1) & NETBIOS_TRANSACTION_ID_MASK
+                    try:
+                        sock.sendto(self._build_netbios_query(transaction_id), (ip_address, NETBIOS_PORT))
+                    except OSError:
+                        continue
+                    pending[transaction_id] = ip_address
+                
+                deadline = time.monotonic() + config.netbios_sweep_window_ms / 1000
+                while pending and (remaining := deadline - time.monotonic()) > 0:
+                    if not select.select([sock], [], [], remaining)[0]:
+                        break
+                    try:
+                        response, (source, _) = sock.recvfrom(SOCKET_BUFFER_SIZE)
+                    except OSError:
+                        continue
+                    
+                    transaction_id = int.from_bytes(response[:2], "big")
+                    if pending.get(transaction_id) != source:
+                        continue
+                    table = self._parse_nbstat_response(source, response)
+                    if table:
+                        tables[source] = table
+                        del pending[transaction_id]
+        
+        results = {ip: info for ip, table in tables.items() if (info := self._name_table_info(table))}
+        self._store_sweep(NETBIOS_PROTOCOL_NAME, results)
+        return tables
+
+    def discover_netbios(self, ip_address: str) -> DiscoveryInfo | None:
+        swept, info = self._swept_result(NETBIOS_PROTOCOL_NAME, ip_address)
+        if swept:
+            return info
+        
+        wait = self.timeouts.get(ip_address, config.discovery_timeout_ms / 1000, service=True)
+        with self.budget.sockets.hold():
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.settimeout(wait.seconds)
             
-            sock.sendto(query_packet, (ip_address, NETBIOS_PORT))
+                sock.sendto(self._build_netbios_query(), (ip_address, NETBIOS_PORT))
             
-            try:
-                response, _ = sock.recvfrom(SOCKET_BUFFER_SIZE)  
-                device_name = self._parse_netbios_response(response)
-                
-                if device_name:
-                    return DiscoveryInfo(
-                        protocol=NETBIOS_PROTOCOL_NAME,
-                        device_name=device_name,
-                        device_type=WINDOWS_DEVICE_TYPE
-                    )
+                try:
+                    response, _ = sock.recvfrom(SOCKET_BUFFER_SIZE)  
+                    return self._netbios_info(ip_address, response)
             
-            except socket.timeout:
-                pass
-            finally:
-                sock.close()
+                except socket.timeout:
+                    wait.expired()
+                finally:
+                    sock.close()
         
-        except (socket.error, struct.error):
-            pass
+            except (socket.error, struct.error):
+                pass
         
         return None
     
     def discover_upnp(self, ip_address: str) -> DiscoveryInfo | None:
-        try:
-            timeout = config.discovery_timeout_ms / 1000    
-                        
-            ssdp_request = (
-                SSDP_REQUEST_LINE +
-                SSDP_HOST_HEADER +
-                SSDP_MAN_HEADER +
-                SSDP_ST_HEADER +
-                f"{SSDP_MX_PREFIX}{int(timeout)}{CRLF}" +
-                CRLF
-            ).encode(DEFAULT_ENCODING)
-            
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(timeout)
+        swept, info = self._swept_result(UPNP_PROTOCOL_NAME, ip_address)
+        if swept:
+            return info
+        
+        timeout = config.discovery_timeout_ms / 1000
+        wait = self.timeouts.get(ip_address, timeout, service=True)
+        with self.budget.sockets.hold():
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.settimeout(wait.seconds)
             
-            sock.sendto(ssdp_request, (ip_address, UPNP_PORT))
+                sock.sendto(self._build_ssdp_request(timeout), (ip_address, UPNP_PORT))
             
-            try:
-                response, _ = sock.recvfrom(SOCKET_BUFFER_SIZE)
-                device_name, device_type = self._parse_upnp_response(response)
-                
-                if device_name or device_type:
-                    return DiscoveryInfo(
-                        protocol=UPNP_PROTOCOL_NAME,
-                        device_name=device_name,
-                        device_type= device_type or UPNP_DEVICE_TYPE
-                    )
+                try:
+                    response, _ = sock.recvfrom(SOCKET_BUFFER_SIZE)
+                    return self._upnp_info(response)
             
-            except socket.timeout:
-                pass
-            finally:
-                sock.close()
+                except socket.timeout:
+                    wait.expired()
+                finally:
+                    sock.close()
         
-        except (socket.error, UnicodeDecodeError):
-            pass
+            except (socket.error, UnicodeDecodeError):
+                pass
         
         return None
     
-    def _parse_mdns_response(self, response: bytes, ip_address: str) -> str | None:
-        """Parse mDNS response to extract device information."""
+    async def discover_mdns_async(self, ip_address: str) -> DiscoveryInfo | None:
+        swept, info = self._swept_result(MDNS_PROTOCOL_NAME, ip_address)
+        if swept:
+            return info
+        
+        response = await self._request_async(ip_address, MDNS_PORT, self._build_mdns_query())
+        return self._mdns_info(response, ip_address) if response else None
+
+    async def discover_netbios_async(self, ip_address: str) -> DiscoveryInfo | None:
+        swept, info = self._swept_result(NETBIOS_PROTOCOL_NAME, ip_address)
+        if swept:
+            return info
+        
+        response = await self._request_async(ip_address, NETBIOS_PORT, self._build_netbios_query())
+        return self._netbios_info(ip_address, response) if response else None
+
+    async def discover_upnp_async(self, ip_address: str) -> DiscoveryInfo | None:
+        swept, info = self._swept_result(UPNP_PROTOCOL_NAME, ip_address)
+        if swept:
+            return info
+        
+        timeout = config.discovery_timeout_ms / 1000
+        response = await self._request_async(ip_address, UPNP_PORT, self._build_ssdp_request(timeout))
+        return self._upnp_info(response) if response else None
+
+    async def _request_async(self, ip_address: str, port: int, payload: bytes) -> bytes | None:
+        """Send a discovery query and wait for the first reply without blocking the event loop."""
+        wait = self.timeouts.get(ip_address, config.discovery_timeout_ms / 1000, service=True)
         try:
-            if len(response) > MDNS_HEADER_LENGTH:
-                if HTTP_SERVICE_TYPE in response or DEVICE_INFO_SERVICE_TYPE in response:
-                    return f"{MDNS_DEVICE_NAME_PREFIX}{ip_address.split(IP_SEPARATOR)[LAST_OCTET_INDEX]}"
-        except (UnicodeDecodeError, IndexError):
-            pass
+            async with self.budget.sockets.hold_async():
+                response = await udp_request(ip_address, port, payload, wait.seconds)
+        except OSError:
+            return None
+        
+        if response is None:
+            wait.expired()
+        return response
+
+    def _store_sweep(self, protocol: str, results: dict[str, DiscoveryInfo]) -> None:
+        with self._sweep_lock:
+            self._sweeps[protocol] = (time.monotonic(), results)
+
+    def _swept_result(self, protocol: str, ip_address: str) -> tuple[bool, DiscoveryInfo | None]:
+        """Look a host up in the latest sweep; the flag is False when no fresh sweep exists."""
+        with self._sweep_lock:
+            sweep = self._sweeps.get(protocol)
+        
+        if sweep is None or time.monotonic() - sweep[0] > config.discovery_sweep_max_age_s:
+            return False, None
+        return True, sweep[1].get(ip_address)
+
+    def _fetch_descriptions(self, ssdp_responses: Iterable[SsdpResponse]) -> dict[str, DeviceDescription]:
+        """Fetch the device descriptions of many SSDP responders concurrently, keyed by IP."""
+        targets = {
+            ssdp_response.ip_address: ssdp_response.location
+            for ssdp_response in ssdp_responses
+            if ssdp_response.location and self._is_device_location(ssdp_response.ip_address, ssdp_response.location)
+        }
+        if not targets:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=config.upnp_fetch_workers) as executor:
+            futures = {ip: executor.submit(self._fetch_description, ip, url) for ip, url in targets.items()}
+            descriptions = {ip: future.result() for ip, future in futures.items()}
+        
+        return {ip: description for ip, description in descriptions.items() if description}
+
+    def _fetch_description(self, ip_address: str, url: str) -> DeviceDescription | None:
+        """Fetch one device description, revalidating a cached copy with If-None-Match."""
+        with self._description_lock:
+            cached = self._descriptions.get(url)
         
+        request = urllib.request.Request(url)
+        request.add_header(USER_AGENT_HEADER, USER_AGENT_VALUE)
+        if cached and cached[0]:
+            request.add_header(IF_NONE_MATCH_HEADER, cached[0])
+        
+        wait = self.timeouts.get(ip_address, config.service_detection_timeout_ms / 1000, service=True)
+        try:
+            with self.budget.sockets.hold(), urllib.request.urlopen(request, timeout=wait.seconds) as response:
+                body = response.read(UPNP_DESCRIPTION_MAX_BYTES)
+                etag = response.headers.get(ETAG_HEADER)
+        except urllib.error.HTTPError as e:
+            if e.code == HTTP_NOT_MODIFIED and cached:
+                return cached[1]
+            return None
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+        
+        description = self._parse_device_description(body)
+        if description:
+            with self._description_lock:
+                self._descriptions[url] = (etag, description)
+        return description
+
+    def _is_device_location(self, ip_address: str, location: str) -> bool:
+        """Only follow plain HTTP LOCATION URLs that point back at the responding device."""
+        try:
+            url = urllib.parse.urlsplit(location)
+            return url.scheme == HTTP_SCHEME and url.hostname == ip_address
+        except ValueError:
+            return False
+
+    def _build_mdns_query(self) -> bytes:
+        """Build the DNS-SD service enumeration query."""
+        query_packet = struct.pack(STRUCT_PACK_FORMAT, 
+            MDNS_TRANSACTION_ID, 
+            MDNS_FLAGS, 
+            MDNS_QUESTIONS_COUNT,     
+            MDNS_ANSWERS_COUNT,      
+            MDNS_AUTHORITY_COUNT,      
+            MDNS_ADDITIONAL_COUNT      
+        )
+        return query_packet + MDNS_SERVICE_QUERY
+
+    def _build_netbios_query(self, transaction_id: int = NETBIOS_TRANSACTION_ID) -> bytes:
+        """Build the NetBIOS node status (NBSTAT) query for the wildcard name."""
+        query_packet = struct.pack(
+            STRUCT_PACK_FORMAT, 
+            transaction_id, 
+            NETBIOS_QUERY_FLAGS,        
+            NETBIOS_QUESTIONS_COUNT,             
+            NETBIOS_ANSWERS_COUNT,            
+            NETBIOS_AUTHORITY_COUNT,            
+            NETBIOS_ADDITIONAL_COUNT        
+        )
+        return query_packet + NETBIOS_WILDCARD_NAME + NETBIOS_NBSTAT_QUESTION
+
+    def _build_ssdp_request(self, timeout: float) -> bytes:
+        """Build the SSDP M-SEARCH request."""
+        return (
+            SSDP_REQUEST_LINE +
+            SSDP_HOST_HEADER +
+            SSDP_MAN_HEADER +
+            SSDP_ST_HEADER +
+            f"{SSDP_MX_PREFIX}{int(timeout)}{CRLF}" +
+            CRLF
+        ).encode(DEFAULT_ENCODING)
+
+    def _new_discovery(self, mac_id: int, discovery_info: DiscoveryInfo) -> Discovery:
+        return Discovery(
+            mac_id=mac_id,
+            protocol=discovery_info.protocol,
+            device_name=discovery_info.device_name,
+            device_type=discovery_info.device_type,
+            manufacturer=discovery_info.manufacturer,
+            model=discovery_info.model,
+        )
+
+    def _mdns_info(self, response: bytes, ip_address: str) -> DiscoveryInfo | None:
+        records = parse_dns_message(response)
+        return self._mdns_records_info(records, ip_address) if records else None
+
+    def _instance_label(self, instance: str, service_type: str) -> str:
+        """The instance part of a DNS-SD service instance name, which may itself contain dots."""
+        suffix = DNS_LABEL_SEPARATOR + service_type
+        if instance.lower().endswith(suffix.lower()):
+            return instance[:-len(suffix)]
+        return instance.split(DNS_LABEL_SEPARATOR, 1)[0]
+
+    def _mdns_records_info(self, records: list[DnsRecord], ip_address: str) -> DiscoveryInfo | None:
+        """Collect services, names and model from the PTR/SRV/TXT/A records of one responder.
+        
+        Service instance names are preferred over host names; a responder that
+        only lists its service types is named after its address.
+        """
+        services: list[str] = []
+        instance_name = host_name = model = manufacturer = None
+        for record in records:
+            if record.record_type == DNS_TYPE_PTR and record.value:
+                if record.name == MDNS_SERVICE_ENUMERATION_NAME:
+                    service_type = record.value
+                else:
+                    service_type = record.name
+                    label = self._instance_label(record.value, service_type)
+                    if not label.startswith(MDNS_SERVICE_LABEL_PREFIX):
+                        instance_name = instance_name or label
+                service_type = service_type.removesuffix(MDNS_LOCAL_SUFFIX)
+                if service_type not in services:
+                    services.append(service_type)
+            elif record.record_type == DNS_TYPE_SRV and record.value:
+                host_name = host_name or record.value.removesuffix(MDNS_LOCAL_SUFFIX)
+            elif record.record_type == DNS_TYPE_A and record.value == ip_address:
+                host_name = host_name or record.name.removesuffix(MDNS_LOCAL_SUFFIX)
+            elif record.record_type == DNS_TYPE_TXT:
+                model = model or next((record.attributes[key] for key in MDNS_MODEL_TXT_KEYS if record.attributes.get(key)), None)
+                manufacturer = manufacturer or next((record.attributes[key] for key in MDNS_MANUFACTURER_TXT_KEYS if record.attributes.get(key)), None)
+        
+        device_name = instance_name or host_name
+        if not device_name and services:
+            device_name = f"{MDNS_DEVICE_NAME_PREFIX}{ip_address.split(IP_SEPARATOR)[LAST_OCTET_INDEX]}"
+        if not device_name:
+            return None
+        
+        return DiscoveryInfo(
+            protocol=MDNS_PROTOCOL_NAME,
+            device_name=device_name,
+            device_type=MDNS_DEVICE_TYPE,
+            manufacturer=manufacturer,
+            model=model,
+            services=services,
+        )
+
+    def _netbios_info(self, ip_address: str, response: bytes) -> DiscoveryInfo | None:
+        table = self._parse_nbstat_response(ip_address, response)
+        return self._name_table_info(table) if table else None
+
+    def _name_table_info(self, table: NetbiosNameTable) -> DiscoveryInfo | None:
+        """Name the host after its unique workstation name, or its first unique name."""
+        unique_names = [entry for entry in table.names if not entry.group and entry.name]
+        workstation = next((entry for entry in unique_names if entry.suffix == NETBIOS_WORKSTATION_SUFFIX), None)
+        device_name = workstation or next(iter(unique_names), None)
+        if device_name:
+            return DiscoveryInfo(
+                protocol=NETBIOS_PROTOCOL_NAME,
+                device_name=device_name.name,
+                device_type=WINDOWS_DEVICE_TYPE
+            )
+        return None
+
+    def _upnp_info(self, response: bytes) -> DiscoveryInfo | None:
+        device_name, device_type = self._parse_upnp_response(response)
+        if device_name or device_type:
+            return DiscoveryInfo(
+                protocol=UPNP_PROTOCOL_NAME,
+                device_name=device_name,
+                device_type= device_type or UPNP_DEVICE_TYPE
+            )
         return None
     
-    def _parse_netbios_response(self, response: bytes) -> str | None:
-        """Parse NetBIOS response to extract device name."""
+    def _ssdp_info(self, ssdp_response: SsdpResponse, description: DeviceDescription | None) -> DiscoveryInfo:
+        description = description or DeviceDescription()
+        return DiscoveryInfo(
+            protocol=UPNP_PROTOCOL_NAME,
+            device_name=description.friendly_name or ssdp_response.server,
+            device_type=description.device_type or ssdp_response.st or UPNP_DEVICE_TYPE,
+            manufacturer=description.manufacturer,
+            model=description.model_name,
+        )
+
+    def _parse_ssdp_response(self, ip_address: str, response: bytes) -> SsdpResponse | None:
+        """Parse the status line and headers of an SSDP M-SEARCH reply."""
+        lines = response.decode(DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING).split(CRLF)
+        status_parts = lines[0].split()
+        if len(status_parts) < 2 or not status_parts[0].startswith(HTTP_VERSION_PREFIX) or status_parts[1] != str(HTTP_OK_STATUS):
+            return None
+        
+        headers: dict[str, str] = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(UPNP_HEADER_SEPARATOR)
+            if separator:
+                headers[name.strip().lower()] = value.strip()
+        
+        return SsdpResponse(
+            ip_address=ip_address,
+            server=headers.get(SSDP_SERVER_HEADER),
+            st=headers.get(SSDP_ST_HEADER_NAME),
+            usn=headers.get(SSDP_USN_HEADER),
+            location=headers.get(SSDP_LOCATION_HEADER),
+        )
+
+    def _parse_device_description(self, body: bytes) -> DeviceDescription | None:
+        """Read the root device fields from a UPnP device description document."""
         try:
-            if len(response) > NETBIOS_HEADER_LENGTH:
-                if len(response) > NETBIOS_MIN_RESPONSE_LENGTH:
-                    decoded = response[NETBIOS_HEADER_LENGTH:].decode(ASCII_ENCODING, errors=ENCODING_ERROR_HANDLING)
-                    words = decoded.split()
-                    for word in words:
-                        if len(word) > NETBIOS_MIN_WORD_LENGTH and word.isalnum():
-                            return word[:NETBIOS_MAX_NAME_LENGTH]
-        except (UnicodeDecodeError, IndexError):
-            pass
+            root = ElementTree.fromstring(body)
+        except ElementTree.ParseError:
+            return None
         
-        return None
+        device = root.find(f".//{UPNP_DEVICE_NAMESPACE}{UPNP_DEVICE_ELEMENT}")
+        if device is None:
+            return None
+        
+        def field(name: str) -> str | None:
+            value = device.findtext(f"{UPNP_DEVICE_NAMESPACE}{name}")
+            return value.strip() if value and value.strip() else None
+        
+        return DeviceDescription(
+            friendly_name=field(UPNP_FRIENDLY_NAME_ELEMENT),
+            device_type=field(UPNP_DEVICE_TYPE_ELEMENT),
+            manufacturer=field(UPNP_MANUFACTURER_ELEMENT),
+            model_name=field(UPNP_MODEL_NAME_ELEMENT),
+        )
+
+    def _parse_nbstat_response(self, ip_address: str, response: bytes) -> NetbiosNameTable | None:
+        """Decode the name table and adapter MAC of a NetBIOS node status reply."""
+        try:
+            answers = struct.unpack_from(STRUCT_PACK_FORMAT, response)[3]
+            if not answers:
+                return None
+            
+            offset = self._skip_netbios_name(response, NETBIOS_HEADER_LENGTH)
+            record_type, _, _, data_length = struct.unpack_from(NETBIOS_RESOURCE_FORMAT, response, offset)
+            if record_type != NETBIOS_NBSTAT_TYPE:
+                return None
+            
+            offset += struct.calcsize(NETBIOS_RESOURCE_FORMAT)
+            data = memoryview(response)[offset:offset + data_length]
+            name_count = data[0]
+            names_end = 1 + name_count * NETBIOS_NAME_ENTRY_LENGTH
+            if len(data) < names_end:
+                return None
+        except (struct.error, IndexError):
+            return None
+        
+        names: list[NetbiosName] = []
+        for start in range(1, names_end, NETBIOS_NAME_ENTRY_LENGTH):
+            entry = data[start:start + NETBIOS_NAME_ENTRY_LENGTH]
+            name = bytes(entry[:NETBIOS_NAME_FIELD_LENGTH]).decode(ASCII_ENCODING, errors=ENCODING_ERROR_HANDLING)
+            flags = int.from_bytes(entry[NETBIOS_NAME_FIELD_LENGTH + 1:], "big")
+            names.append(NetbiosName(
+                name=name.rstrip(NETBIOS_NAME_PADDING),
+                suffix=entry[NETBIOS_NAME_FIELD_LENGTH],
+                group=bool(flags & NETBIOS_GROUP_NAME_FLAG),
+            ))
+        
+        # Samba answers with an all-zero unit ID, which is no MAC at all
+        unit_id = bytes(data[names_end:names_end + NETBIOS_MAC_LENGTH])
+        mac_address = unit_id.hex(":") if len(unit_id) == NETBIOS_MAC_LENGTH and any(unit_id) else None
+        
+        return NetbiosNameTable(ip_address=ip_address, names=names, mac_address=mac_address)
+
+    def _skip_netbios_name(self, response: bytes, offset: int) -> int:
+        """Offset just past the (possibly compressed) encoded name starting at offset."""
+        while True:
+            length = response[offset]
+            if length & NETBIOS_NAME_POINTER_MASK == NETBIOS_NAME_POINTER_MASK:
+                return offset + NETBIOS_NAME_POINTER_LENGTH
+            offset += 1 + length
+            if length == 0:
+                return offset
     
     def _parse_upnp_response(self, response: bytes) -> tuple[str | None, str | None]:
         """Parse UPnP response to extract device information."""
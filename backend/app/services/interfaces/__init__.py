@@ -9,6 +9,7 @@ from .port_service_interface import PortServiceInterface
 from .protocol_service_interface import ProtocolServiceInterface
 from .scan_service_interface import ScanServiceInterface
 from .scanning_service_interface import ScanningServiceInterface
+from .suppression_service_interface import SuppressionServiceInterface
 
 __all__ = [
     "CategoryServiceInterface",
@@ -22,4 +23,5 @@ __all__ = [
     "ProtocolServiceInterface",
     "ScanServiceInterface",
     "ScanningServiceInterface",
+    "SuppressionServiceInterface",
 ]
\ No newline at end of file
@@ -1,7 +1,8 @@
 from typing import Protocol
 
+from app.database.interfaces import BatchInterface
 from app.database.models import Mac
-from app.common.objects import DiscoveryInfo
+from app.common.objects import DiscoveryInfo, NetbiosNameTable, SsdpResponse
 
 
 class DiscoveryServiceInterface(Protocol):
@@ -11,14 +12,42 @@ class DiscoveryServiceInterface(Protocol):
         """Save discovery information to the database."""
         ...
 
+    def save_all_discoveries(self, batch: BatchInterface, discoveries_by_mac: dict[int, list[DiscoveryInfo]]) -> None:
+        """Replace discovery information for many MAC records in one batch."""
+        ...
+
+    def sweep_mdns(self) -> dict[str, DiscoveryInfo]:
+        """Discover mDNS responders subnet-wide with one multicast query, keyed by source IP."""
+        ...
+
+    def sweep_upnp(self) -> dict[str, SsdpResponse]:
+        """Discover UPnP devices subnet-wide with one multicast M-SEARCH, indexed by source IP."""
+        ...
+
+    def sweep_netbios(self, ip_addresses: list[str]) -> dict[str, NetbiosNameTable]:
+        """Query the NetBIOS node status of many hosts from one socket in a single window, keyed by IP."""
+        ...
+
     def discover_mdns(self, ip_address: str) -> DiscoveryInfo | None:
-        """Discover device information using mDNS/Bonjour."""
+        """Discover device information using mDNS/Bonjour, answering from a fresh sweep when available."""
         ...
         
     def discover_netbios(self, ip_address: str) -> DiscoveryInfo | None:
-        """Discover device information using NetBIOS name service."""
+        """Discover device information using NetBIOS name service, answering from a fresh sweep when available."""
         ...
 
     def discover_upnp(self, ip_address: str) -> DiscoveryInfo | None:
-        """Discover device information using UPnP/SSDP."""
+        """Discover device information using UPnP/SSDP, answering from a fresh sweep when available."""
+        ...
+
+    async def discover_mdns_async(self, ip_address: str) -> DiscoveryInfo | None:
+        """Discover device information using mDNS without blocking the event loop."""
+        ...
+
+    async def discover_netbios_async(self, ip_address: str) -> DiscoveryInfo | None:
+        """Discover device information using NetBIOS without blocking the event loop."""
+        ...
+
+    async def discover_upnp_async(self, ip_address: str) -> DiscoveryInfo | None:
+        """Discover device information using UPnP/SSDP without blocking the event loop."""
         ...
@@ -1,7 +1,8 @@
 from typing import Protocol
 
+from app.database.interfaces import BatchInterface
 from app.database.models import Mac
-from app.common.objects import AddressData
+from app.common.objects import AddressData, NeighborStats
 
 
 class MacServiceInterface(Protocol):
@@ -11,17 +12,41 @@ class MacServiceInterface(Protocol):
         """Save or update MAC address data."""
         ...
         
+    def save_macs(self, batch: BatchInterface, address_data_list: list[AddressData], preserve: bool = False) -> dict[str, Mac]:
+        """Upsert MAC data for many addresses in one batch, keyed by MAC address."""
+        ...
+        
     def get_mac_by_address(self, mac_address: str) -> Mac | None:
         """Get MAC address by address string."""
         ...
         
-    def resolve_mac_address(self, ip_address: str) -> tuple[str, int] | None:
-        """Resolve MAC address for IP."""   
+    def refresh_neighbor_table(self) -> None:
+        """Reload the kernel neighbor cache used to answer lookups without probing."""
+        ...
+        
+    def get_neighbor_stats(self) -> NeighborStats:
+        """Return neighbor cache hits and misses since the last refresh."""
+        ...
+        
+    def get_neighbor_addresses(self) -> list[str]:
+        """Return the IPs with a usable entry in the loaded neighbor cache."""
+        ...
+        
+    def resolve_mac_address(self, ip_address: str) -> tuple[str, int | None] | None:
+        """Resolve MAC address for IP, with the ARP time or None when answered from the neighbor cache."""   
+        ...
+        
+    def sweep_arp(self, ip_addresses: list[str]) -> dict[str, tuple[str, int | None]] | None:
+        """Resolve MAC addresses for many IPs in one ARP batch (ARP time None for neighbor cache hits); None if the batch fails."""
         ...
         
     def get_vendor_from_mac(self, mac_address: str) -> str | None:
         """Get vendor name from MAC address using OUI lookup."""
         ...
+
+    def get_vendors_from_macs(self, mac_addresses: list[str]) -> dict[str, str | None]:
+        """Get vendor names of many MAC addresses at once, keyed by MAC address."""
+        ...
         
     def get_unassigned(self) -> list[Mac]:
         """Return a list of MAC addresses that are not assigned to any device."""
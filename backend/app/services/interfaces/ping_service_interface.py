@@ -1,19 +1,45 @@
 from typing import Protocol
 
+from app.common.objects import PingReply, ResolverStats
+
 
 class PingServiceInterface(Protocol):
     """Interface for ping related operations."""
 
-    def ping(self, ip_address: str) -> tuple[int, str] | None:
-        """Ping an IP address and return (success, rtt_ms, stdout_if_success_else_None)."""
+    def ping(self, ip_address: str, once: bool = False) -> tuple[int, str] | None:
+        """Ping an IP address and return (success, rtt_ms, stdout_if_success_else_None); once sends one echo request without retries."""
+        ...
+
+    async def ping_async(self, ip_address: str, once: bool = False) -> tuple[int, str] | None:
+        """Ping an IP address without blocking the event loop."""
+        ...
+
+    def sweep(self, ip_addresses: list[str], once: set[str] | None = None) -> dict[str, PingReply] | None:
+        """Ping many addresses from one ICMP socket, the ones in once without retries; None when no ICMP socket is available."""
         ...
 
     def get_hostname(self, ip_address: str) -> str | None:
-        """Resolve hostname for an IP or return None."""
+        """Resolve hostname for an IP or return None, answering from the reverse DNS cache when fresh."""
+        ...
+
+    async def get_hostname_async(self, ip_address: str) -> str | None:
+        """Resolve hostname for an IP without blocking the event loop."""
+        ...
+
+    def resolve_hostnames(self, ip_addresses: list[str]) -> dict[str, str | None]:
+        """Resolve the hostnames of many IPs with concurrent PTR queries, keyed by IP."""
+        ...
+
+    def get_resolver_stats(self) -> ResolverStats:
+        """Reverse DNS cache hit rate and query latency."""
+        ...
+
+    def get_ttl_from_ping(self, ping_result: str | PingReply) -> int | None:
+        """Extract TTL from a ping output string or a parsed echo reply."""
         ...
 
-    def get_ttl_from_ping(self, ping_result: str) -> int | None:
-        """Extract TTL from a ping output string."""
+    def get_rtts_from_ping(self, ping_result: str | PingReply) -> list[float]:
+        """Extract the per-reply round-trip times (ms) from a ping output string or a parsed echo reply."""
         ...
 
     def get_os_from_ttl(self, ttl: int) -> str:
@@ -1,5 +1,6 @@
 from typing import Protocol
 
+from app.database.interfaces import BatchInterface
 from app.database.models import Mac
 from app.common.objects import PortInfo, ServiceInfo
 
@@ -11,6 +12,18 @@ class PortServiceInterface(Protocol):
         """Scan specified ports on an IP address and return open PortInfo entries."""
         ...
 
+    def scan_tcp_hosts(self, targets: dict[str, list[int]]) -> dict[str, list[PortInfo]]:
+        """Connect-scan TCP ports on many hosts at once, reporting open/closed/filtered per port."""
+        ...
+
+    async def scan_ports_async(self, ip_address: str, ports: list[int], udp_ports: list[int]) -> list[PortInfo]:
+        """Scan specified ports without blocking the event loop, bounded by the shared resource budget."""
+        ...
+
     def save_port(self, mac_record: Mac, open_ports: list[PortInfo], services_info: dict[int, ServiceInfo] | None) -> None:
         """Persist open port information for a MAC address."""
         ...
+
+    def save_ports(self, batch: BatchInterface, ports_by_mac: dict[int, tuple[list[PortInfo], dict[int, ServiceInfo] | None]]) -> None:
+        """Replace open port information for many MAC records in one batch."""
+        ...
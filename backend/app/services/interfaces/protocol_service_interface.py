@@ -1,6 +1,7 @@
 from typing import Protocol
 
 from app.common.objects.service_info import ServiceInfo
+from app.common.objects.tls_certificate import TlsCertificate
 
 
 class ProtocolServiceInterface(Protocol):
@@ -10,10 +11,38 @@ class ProtocolServiceInterface(Protocol):
         """Detect HTTP service information (server header, status)."""
         ...
 
-    def detect_ssh(self, ip: str, port: int) -> ServiceInfo | None:
-        """Detect SSH service (banner/version)."""
+    def detect_http_many(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], ServiceInfo]:
+        """Detect HTTP service information of many (ip, port) targets concurrently."""
         ...
 
-    def detect_banner(self, ip: str, port: int, service_name: str) -> ServiceInfo | None:
-        """Generic banner detection for text-based services."""
+    def inspect_tls_many(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], TlsCertificate]:
+        """Certificates of many (ip, port) TLS targets, handshaking concurrently."""
+        ...
+
+    def detect_ssh(self, ip: str, port: int, banner: str | None = None) -> ServiceInfo | None:
+        """Detect SSH service (banner/version), from the given banner when the port scan grabbed one."""
+        ...
+
+    def detect_banner(self, ip: str, port: int, service_name: str, banner: str | None = None) -> ServiceInfo | None:
+        """Generic banner detection for text-based services, from the given banner when the port scan grabbed one."""
+        ...
+
+    async def detect_http_async(self, ip: str, port: int) -> ServiceInfo | None:
+        """Detect HTTP service information without blocking the event loop."""
+        ...
+
+    async def detect_http_many_async(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], ServiceInfo]:
+        """Detect HTTP service information of many targets without blocking the event loop."""
+        ...
+
+    async def inspect_tls_many_async(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], TlsCertificate]:
+        """Certificates of many TLS targets without blocking the event loop."""
+        ...
+
+    async def detect_ssh_async(self, ip: str, port: int, banner: str | None = None) -> ServiceInfo | None:
+        """Detect SSH service without blocking the event loop."""
+        ...
+
+    async def detect_banner_async(self, ip: str, port: int, service_name: str, banner: str | None = None) -> ServiceInfo | None:
+        """Generic banner detection without blocking the event loop."""
         ...
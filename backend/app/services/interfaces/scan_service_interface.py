@@ -1,7 +1,8 @@
+from collections.abc import Iterator
 from datetime import datetime
 from typing import Protocol
 
-from app.common.objects import AddressData, ScanOptions
+from app.common.objects import AddressData, ResourceUsage, ScanOptions, StageThroughput, TimeoutStats
 
 
 class ScanServiceInterface(Protocol):
@@ -11,9 +12,29 @@ class ScanServiceInterface(Protocol):
         """Return the last_seen of the most recently observed MAC."""
         ...
 
+    def get_resource_usage(self) -> list[ResourceUsage]:
+        """Return current and peak usage of the shared resource budget."""
+        ...
+
+    def get_timeout_stats(self) -> TimeoutStats:
+        """Return how many probes used RTT-derived timeouts and the wait time that saved."""
+        ...
+
+    def get_stage_throughput(self) -> list[StageThroughput]:
+        """Return per-stage counters of the last stage-major scan (empty for host-by-host scans)."""
+        ...
+
     def scan_network(self, scan_options: ScanOptions) -> list[AddressData]:
         ...
 
+    def get_scan_range(self) -> list[str]:
+        """Return the addresses of the configured network range."""
+        ...
+
+    def scan_network_stream(self, scan_options: ScanOptions, ip_addresses: list[str] | None = None) -> Iterator[AddressData]:
+        """Scan the configured range (or only ip_addresses), yielding each host as soon as its scan completes."""
+        ...
+
     def scan_ip(self, ip_address: str, scan_options: ScanOptions) -> AddressData | None:
         ...
 
@@ -22,3 +43,7 @@ class ScanServiceInterface(Protocol):
 
     def save_full_scan(self, address_data: AddressData) -> None:
         ...
+
+    def save_scan_results(self, devices: list[AddressData], full_scan: bool) -> None:
+        """Persist a group of scanned devices in a single transaction."""
+        ...
@@ -1,6 +1,8 @@
 from datetime import datetime
 from typing import Protocol
 
+from app.common.objects import SchedulerStats
+
 
 class ScanningServiceInterface(Protocol):
 	"""Interface for the background scanning manager."""
@@ -15,4 +17,8 @@ class ScanningServiceInterface(Protocol):
     
 	def get_last_scan_time(self) -> datetime | None:
 		"""Return the datetime of the last completed scan, or None."""
-		...
\ No newline at end of file
+		...
+
+	def get_scheduler_stats(self) -> SchedulerStats | None:
+		"""Return queue depth, lateness and probes saved of the per-host scheduler, or None before it started."""
+		...
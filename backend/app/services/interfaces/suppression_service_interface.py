@@ -0,0 +1,29 @@
+from typing import Protocol
+
+
+class SuppressionServiceInterface(Protocol):
+    """Interface for tracking addresses that stopped answering liveness checks."""
+
+    def filter_due(self, ip_addresses: list[str]) -> list[str]:
+        """Drop the suppressed addresses whose next probe is not due yet."""
+        ...
+
+    def is_suppressed(self, ip_address: str) -> bool:
+        """Whether the address is probed with a single echo request instead of a full ping."""
+        ...
+
+    def record(self, ip_address: str, alive: bool) -> None:
+        """Record the outcome of a liveness check of the address."""
+        ...
+
+    def revive(self, ip_addresses: list[str]) -> None:
+        """Clear addresses that showed passive signs of life, such as an ARP reply or a neighbor table entry."""
+        ...
+
+    def get_suppressed_count(self) -> int:
+        """Number of addresses currently suppressed."""
+        ...
+
+    def save(self) -> None:
+        """Persist the changes since the last save."""
+        ...
@@ -1,16 +1,16 @@
 import socket
 import threading
+import time
 from datetime import datetime
 
-from mac_vendor_lookup import MacLookup  # type: ignore
 from scapy.all import ARP, Ether, get_if_addr, get_if_list, srp  # type: ignore
 from scapy.packet import Packet
 
 from app import config
 from app.common.constants import *
-from app.common.objects import AddressData
-from app.common.utilities import Time, time_operation, RetryStatus, run_and_retry
-from app.database.interfaces import DatabaseInterface
+from app.common.objects import AddressData, NeighborStats
+from app.common.utilities import Time, time_operation, RetryStatus, OuiIndex, ProbeTimeouts, ResourceBudget, run_and_retry, find_route_interface, read_neighbor_table, read_route_table
+from app.database.interfaces import BatchInterface, DatabaseInterface
 from app.database.models import Mac
 from app.services.interfaces import MacServiceInterface
 
@@ -18,13 +18,31 @@ from app.services.interfaces import MacServiceInterface
 class MacService(MacServiceInterface):
     """Service for handling MAC address related operations."""
     
-    def __init__(self, database: DatabaseInterface) -> None:
+    def __init__(
+        self,
+        database: DatabaseInterface,
+        budget: ResourceBudget | None = None,
+        timeouts: ProbeTimeouts | None = None,
+        vendors: OuiIndex | None = None,
+    ) -> None:
         self.database = database
+        self.budget = budget or ResourceBudget.from_config()
+        self.timeouts = timeouts or ProbeTimeouts()
+        self.vendors = vendors or OuiIndex()
         self.arp_semaphore = threading.Semaphore(10) 
         
         self._arp_max_retries = config.arp_max_retries
         self._arp_retry_delay_ms = config.arp_retry_delay_ms
         self._arp_retry_backoff = config.arp_retry_backoff
+        
+        self._interface_lock = threading.Lock()
+        self._interface: str | None = None
+        self._interface_route_table: str | None = None
+        self._interface_resolved_at: float | None = None
+        
+        self._neighbor_lock = threading.Lock()
+        self._neighbors: dict[str, str] = {}
+        self._neighbor_stats = NeighborStats()
 
     def save_mac(self, address_data: AddressData, preserve: bool = False) -> Mac:
         if address_data.mac_address is None:
@@ -33,60 +51,91 @@ class MacService(MacServiceInterface):
         mac = self.get_mac_by_address(address_data.mac_address)
         
         if mac:
-            mac.ping_time_ms = address_data.ping_time_ms
-            mac.arp_time_ms = address_data.arp_time_ms
-            mac.last_ip = address_data.ip_address
-            mac.last_seen = datetime.now()
-            
-            if preserve:
-                mac.hostname = address_data.hostname or mac.hostname
-                mac.vendor = address_data.mac_vendor or mac.vendor
-                mac.os_guess = address_data.os_guess or mac.os_guess
-                mac.ttl = address_data.ttl or mac.ttl
-            else:
-                mac.hostname = address_data.hostname
-                mac.vendor = address_data.mac_vendor
-                mac.os_guess = address_data.os_guess
-                mac.ttl = address_data.ttl
-                
+            self._apply_address_data(mac, address_data, preserve)
             self.database.update(mac)
-            
         else:
-            mac = Mac(
-                address=address_data.mac_address,
-                ping_time_ms=address_data.ping_time_ms,
-                arp_time_ms=address_data.arp_time_ms,
-                last_ip=address_data.ip_address,
-                hostname=address_data.hostname,
-                vendor=address_data.mac_vendor,
-                os_guess=address_data.os_guess,
-                ttl=address_data.ttl,
-                last_seen=datetime.now()
-            )
-
+            mac = self._new_mac(address_data)
             self.database.create(mac)
 
         return mac
     
+    def save_macs(self, batch: BatchInterface, address_data_list: list[AddressData], preserve: bool = False) -> dict[str, Mac]:
+        """Upsert MAC data for a whole scan inside one batch, keyed by MAC address.
+        
+        Existing records are prefetched with a single query; ids of new records are
+        available in the returned mapping once this returns.
+        """
+        addresses = list({data.mac_address for data in address_data_list if data.mac_address})
+        macs = {mac.address: mac for mac in batch.select_in(Mac, Mac.address, addresses)}
+        
+        for address_data in address_data_list:
+            if not address_data.mac_address:
+                continue
+            
+            mac = macs.get(address_data.mac_address)
+            if mac:
+                self._apply_address_data(mac, address_data, preserve)
+                batch.update(mac)
+            else:
+                mac = self._new_mac(address_data)
+                macs[mac.address] = mac
+                batch.create(mac)
+        
+        batch.flush()
+        return macs
+    
     def get_mac_by_address(self, mac_address: str) -> Mac | None:
         return self.database.select(Mac).where(Mac.address == mac_address).first()
 
-    def resolve_mac_address(self, ip_address: str) -> tuple[str, int] | None:
+    def refresh_neighbor_table(self) -> None:
+        """Load the kernel neighbor cache in bulk and reset the hit/miss counters.
+        
+        Only REACHABLE and STALE entries confirmed within neighbor_cache_max_age_s
+        are kept; anything else is left to active ARP probing. Entries without an
+        age (the /proc/net/arp fallback) are kept as well, since the kernel drops
+        complete entries itself once they sit unconfirmed past gc_stale_time.
+        """
+        neighbors: dict[str, str] = {}
+        if config.neighbor_cache:
+            for entry in read_neighbor_table():
+                if entry.state not in NEIGHBOR_USABLE_STATES:
+                    continue
+                if entry.age_s is not None and entry.age_s > config.neighbor_cache_max_age_s:
+                    continue
+                neighbors[entry.ip_address] = entry.mac_address
+        
+        with self._neighbor_lock:
+            self._neighbors = neighbors
+            self._neighbor_stats = NeighborStats(entries=len(neighbors))
+
+    def get_neighbor_stats(self) -> NeighborStats:
+        with self._neighbor_lock:
+            return NeighborStats(**vars(self._neighbor_stats))
+
+    def get_neighbor_addresses(self) -> list[str]:
+        with self._neighbor_lock:
+            return list(self._neighbors)
+
+    def resolve_mac_address(self, ip_address: str) -> tuple[str, int | None] | None:
+        cached_mac = self._lookup_neighbor(ip_address)
+        if cached_mac:
+            # No ARP was sent, so there is no time to report
+            return (cached_mac, None)
         
         def attempt_arp() -> tuple[str, int] | RetryStatus:
             arp: Packet = ARP(pdst=ip_address)  # type: ignore
             ether: Packet = Ether(dst=BROADCAST_MAC_ADDRESS)  # type: ignore
             packet: Packet = ether / arp  # type: ignore
             
-            iface = self._find_interface(self._get_local_ip())
+            iface = self._get_interface()
             
-            timeout = config.arp_timeout_ms / 1000
+            wait = self.timeouts.get(ip_address, config.arp_timeout_ms / 1000)
 
             arp_time = Time()
-            with self.arp_semaphore:
+            with self.arp_semaphore, self.budget.sockets.hold():
                 with time_operation(arp_time):
                     try:
-                        results = srp(packet, iface=iface, timeout=timeout, verbose=0)[0]  # type: ignore
+                        results = srp(packet, iface=iface, timeout=wait.seconds, verbose=0)[0]  # type: ignore
                     except Exception as e:
                         print(f"WARN arp lookup error for {ip_address}: {e}")
                         return RetryStatus.ERROR
@@ -96,6 +145,8 @@ class MacService(MacServiceInterface):
                     mac_address = getattr(received_pkt, MAC_ADDRESS_ATTR, None)
                     if mac_address and isinstance(mac_address, str):
                         return (mac_address.lower(), int(arp_time.value))
+                else:
+                    wait.expired()
                 
                 return RetryStatus.FAILURE
         
@@ -109,25 +160,146 @@ class MacService(MacServiceInterface):
         if result and not isinstance(result, RetryStatus):
             return result     
 
+    def sweep_arp(self, ip_addresses: list[str]) -> dict[str, tuple[str, int | None]] | None:
+        """Resolve MAC addresses for a whole range with a single batched ARP exchange.
+        
+        All requests go out through one srp call and replies are collected within a
+        single arp_timeout_ms window, without per-host retries. Returns None when the
+        batch cannot be sent so callers can fall back to per-host resolution.
+        """
+        results: dict[str, tuple[str, int | None]] = {}
+        misses: list[str] = []
+        for ip_address in ip_addresses:
+            cached_mac = self._lookup_neighbor(ip_address)
+            if cached_mac:
+                results[ip_address] = (cached_mac, None)
+            else:
+                misses.append(ip_address)
+        
+        if not misses:
+            return results
+        
+        packet: Packet = Ether(dst=BROADCAST_MAC_ADDRESS) / ARP(pdst=misses)  # type: ignore
+        iface = self._get_interface()
+        timeout = config.arp_timeout_ms / 1000
+        
+        try:
+            with self.budget.sockets.hold():
+                answered = srp(packet, iface=iface, timeout=timeout, verbose=0)[0]  # type: ignore
+        except Exception as e:
+            print(f"WARN arp sweep error: {e}")
+            return None
+        
+        targets = set(misses)
+        for sent, received in answered:  # type: ignore
+            ip_address = getattr(received, ARP_SOURCE_IP_ATTR, None)
+            mac_address = getattr(received, MAC_ADDRESS_ATTR, None)
+            if ip_address in targets and isinstance(mac_address, str) and ip_address not in results:
+                arp_time_ms = max(0.0, (received.time - sent.sent_time) * 1000)  # type: ignore
+                results[ip_address] = (mac_address.lower(), int(arp_time_ms))
+        
+        return results
+
     def get_vendor_from_mac(self, mac_address: str) -> str | None:
         if not mac_address or len(mac_address) < MAC_OUI_LENGTH:
             return None
         
-        try:
-            return str(MacLookup().lookup(mac_address))  # type: ignore
-            
-        except Exception:
-            return None
+        return self.vendors.lookup(mac_address)
+    
+    def get_vendors_from_macs(self, mac_addresses: list[str]) -> dict[str, str | None]:
+        """Look up the vendors of many MAC addresses against one registry snapshot."""
+        return self.vendors.lookup_many(mac_addresses)
         
     def get_unassigned(self) -> list[Mac]:
         return self.database.select(Mac).where(Mac.device_id == None).all()
 
-    def _get_local_ip(self) -> str:
-        """Returns the local IP address used to reach the internet."""
+    def _apply_address_data(self, mac: Mac, address_data: AddressData, preserve: bool) -> None:
+        """Copy scan results onto an existing MAC record."""
+        # Neighbor cache hits send no ARP; keep the last measured time
+        if address_data.arp_time_ms is not None:
+            mac.arp_time_ms = address_data.arp_time_ms
+        mac.last_ip = address_data.ip_address
+        mac.last_seen = datetime.now()
+        
+        if preserve:
+            mac.ping_time_ms = address_data.ping_time_ms or mac.ping_time_ms
+            mac.hostname = address_data.hostname or mac.hostname
+            mac.vendor = address_data.mac_vendor or mac.vendor
+            mac.os_guess = address_data.os_guess or mac.os_guess
+            mac.ttl = address_data.ttl or mac.ttl
+        else:
+            mac.ping_time_ms = address_data.ping_time_ms
+            mac.hostname = address_data.hostname
+            mac.vendor = address_data.mac_vendor
+            mac.os_guess = address_data.os_guess
+            mac.ttl = address_data.ttl
+
+    def _new_mac(self, address_data: AddressData) -> Mac:
+        """Build a new MAC record from scan results."""
+        return Mac(
+            address=address_data.mac_address,
+            ping_time_ms=address_data.ping_time_ms,
+            arp_time_ms=address_data.arp_time_ms,
+            last_ip=address_data.ip_address,
+            hostname=address_data.hostname,
+            vendor=address_data.mac_vendor,
+            os_guess=address_data.os_guess,
+            ttl=address_data.ttl,
+            last_seen=datetime.now()
+        )
+
+    def _lookup_neighbor(self, ip_address: str) -> str | None:
+        """Answer a MAC lookup from the neighbor table loaded for this scan, counting hits and misses."""
+        with self._neighbor_lock:
+            mac_address = self._neighbors.get(ip_address)
+            if mac_address:
+                self._neighbor_stats.hits += 1
+            else:
+                self._neighbor_stats.misses += 1
+            return mac_address
+
+    def _get_interface(self) -> str | None:
+        """Returns the interface used to reach the scanned subnet.
+        
+        The result is cached and only resolved again when the routing table changes
+        or interface_cache_ttl_s elapses (which also covers address changes that
+        leave the routes untouched).
+        """
+        route_table = read_route_table()
+        
+        with self._interface_lock:
+            now = time.monotonic()
+            if (
+                self._interface_resolved_at is None
+                or route_table != self._interface_route_table
+                or now - self._interface_resolved_at >= config.interface_cache_ttl_s
+            ):
+                self._interface = self._resolve_interface(route_table)
+                self._interface_route_table = route_table
+                self._interface_resolved_at = now
+            
+            return self._interface
+
+    def _resolve_interface(self, route_table: str | None) -> str | None:
+        """Looks up the interface for the scanned subnet, preferring the kernel routing table."""
+        target_ip = f"{config.subnet}.{config.min_scan_ip}"
+        
+        if route_table:
+            iface = find_route_interface(route_table, target_ip)
+            if iface:
+                return iface
+        
+        local_ip = self._get_local_ip(target_ip)
+        return self._find_interface(local_ip) if local_ip else None
+
+    def _get_local_ip(self, target_ip: str) -> str | None:
+        """Returns the local IP address used to reach the target (no packets are sent)."""
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         try:
-            s.connect(("8.8.8.8", 80))
+            s.connect((target_ip, UDP_PROBE_PORT))
             return s.getsockname()[0]
+        except OSError:
+            return None
         finally:
             s.close()
 
@@ -1,19 +1,27 @@
+import asyncio
+import os
 import platform
 import re
+import select
 import socket
+import struct
 import subprocess
+import time
 
 from app import config
 from app.common.constants import *
-from app.common.objects import PingCommand
-from app.common.utilities import Time, time_operation, RetryStatus, run_and_retry
+from app.common.objects import PingCommand, PingReply, ResolverStats
+from app.common.utilities import Time, time_operation, RetryStatus, ResourceBudget, ReverseResolver, run_and_retry, run_and_retry_async
 from app.services.interfaces import PingServiceInterface
 
 
 class PingService(PingServiceInterface):
     """Service responsible for ping operations."""
 
-    def __init__(self) -> None:
+    def __init__(self, budget: ResourceBudget | None = None, resolver: ReverseResolver | None = None) -> None:
+        self.budget = budget or ResourceBudget.from_config()
+        self.resolver = resolver or ReverseResolver(self.budget.sockets)
+        
         PING_COMMANDS = {
             PLATFORM_WINDOWS: PingCommand("ping", "-n", "-w"),
             PLATFORM_LINUX: PingCommand("ping", "-c", "-W"),
@@ -32,27 +40,16 @@ class PingService(PingServiceInterface):
         self._ping_retry_delay_ms = config.ping_retry_delay_ms
         self._ping_retry_backoff = config.ping_retry_backoff
     
-    def ping(self, ip_address: str) -> tuple[int, str] | None:
+    def ping(self, ip_address: str, once: bool = False) -> tuple[int, str] | None:
 
         def attempt_ping() -> tuple[int, str] | RetryStatus:
             ping_time = Time()
-            ping_count = config.ping_count if config else 3
             ping_timeout_ms = config.ping_timeout_ms if config else 2000
             
-            if platform.system() == PLATFORM_WINDOWS:
-                timeout_value = ping_timeout_ms
-            else:
-                timeout_value = ping_timeout_ms // 1000
-            
             try:
-                with time_operation(ping_time):
+                with self.budget.subprocesses.hold(), time_operation(ping_time):
                     result = subprocess.run(
-                        [
-                            self._ping_instruction,
-                            self._ping_count_flag, str(ping_count),
-                            self._ping_timeout_flag, str(timeout_value),
-                            ip_address
-                        ],
+                        self._build_ping_args(ip_address, once),
                         capture_output=True,
                         text=True,
                         timeout=(ping_timeout_ms // 1000) + 1
@@ -72,7 +69,48 @@ class PingService(PingServiceInterface):
         
         result = run_and_retry(
             attempt_ping, 
-            max_attempts=self._ping_max_retries, 
+            max_attempts=1 if once else self._ping_max_retries, 
+            initial_delay=self._ping_retry_delay_ms / 1000, 
+            backoff_factor=self._ping_retry_backoff
+        )
+        
+        if result and not isinstance(result, RetryStatus):
+            return result      
+        return None
+
+    async def ping_async(self, ip_address: str, once: bool = False) -> tuple[int, str] | None:
+
+        async def attempt_ping() -> tuple[int, str] | RetryStatus:
+            ping_time = Time()
+            ping_timeout_ms = config.ping_timeout_ms if config else 2000
+            
+            try:
+                async with self.budget.subprocesses.hold_async():
+                    with time_operation(ping_time):
+                        process = await asyncio.create_subprocess_exec(
+                            *self._build_ping_args(ip_address, once),
+                            stdout=asyncio.subprocess.PIPE,
+                            stderr=asyncio.subprocess.DEVNULL,
+                        )
+                        try:
+                            stdout, _ = await asyncio.wait_for(process.communicate(), (ping_timeout_ms // 1000) + 1)
+                        except asyncio.TimeoutError:
+                            process.kill()
+                            await process.wait()
+                            return RetryStatus.TIMEOUT
+                
+                if process.returncode == SUCCESSFUL_PING_EXIT_CODE:
+                    return (int(ping_time.value), stdout.decode(DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING))
+                else:
+                    return RetryStatus.FAILURE
+            
+            except OSError as e:
+                print(f"WARN ping error for {ip_address}: {e}")
+                return RetryStatus.ERROR
+        
+        result = await run_and_retry_async(
+            attempt_ping, 
+            max_attempts=1 if once else self._ping_max_retries, 
             initial_delay=self._ping_retry_delay_ms / 1000, 
             backoff_factor=self._ping_retry_backoff
         )
@@ -81,18 +119,64 @@ class PingService(PingServiceInterface):
             return result      
         return None
 
+    def sweep(self, ip_addresses: list[str], once: set[str] | None = None) -> dict[str, PingReply] | None:
+        """Ping a whole range from a single ICMP socket.
+        
+        Echo requests for every address are sent back to back and replies are matched
+        by identifier and sequence number, so a dead host costs one shared timeout
+        window per round instead of a process spawn. Addresses in once only get the
+        first round. Returns None when no ICMP socket can be opened, in which case
+        callers should fall back to ping().
+        """
+        once = once or set()
+        with self.budget.sockets.hold():
+            try:
+                sock, raw = self._open_icmp_socket()
+            except OSError:
+                return None
+        
+            replies: dict[str, PingReply] = {}
+            pending: dict[int, tuple[str, float]] = {}
+            identifier = os.getpid() & 0xFFFF
+            timeout = config.ping_timeout_ms / 1000
+            sequence = 0
+        
+            with sock:
+                for attempt in range(self._ping_max_retries):
+                    targets = [ip for ip in ip_addresses if ip not in replies and (attempt == 0 or ip not in once)]
+                    if not targets:
+                        break
+                
+                    for ip_address in targets:
+                        sequence = (sequence + 1) & 0xFFFF
+                        pending[sequence] = (ip_address, time.perf_counter())
+                        try:
+                            sock.sendto(self._build_echo_request(identifier, sequence), (ip_address, 0))
+                        except OSError:
+                            pass
+                
+                    self._collect_replies(sock, raw, identifier, pending, replies, set(targets), time.perf_counter() + timeout)
+        
+        return replies
+
     def get_hostname(self, ip_address: str) -> str | None:
-        try:
-            timeout = (config.hostname_timeout_ms if config else 1000) / 1000
-            socket.setdefaulttimeout(timeout)
-            hostname, _, _ = socket.gethostbyaddr(ip_address)
-            return hostname
-        except (socket.herror, socket.gaierror, socket.timeout):
-            return None
-        finally:
-            socket.setdefaulttimeout(None)
+        return self.resolver.resolve(ip_address)
+
+    async def get_hostname_async(self, ip_address: str) -> str | None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.resolver.resolve, ip_address)
+
+    def resolve_hostnames(self, ip_addresses: list[str]) -> dict[str, str | None]:
+        """Look up the hostnames of many addresses at once, filling the resolver cache."""
+        return self.resolver.resolve_many(ip_addresses)
+
+    def get_resolver_stats(self) -> ResolverStats:
+        return self.resolver.get_stats()
 
-    def get_ttl_from_ping(self, ping_result: str) -> int | None:
+    def get_ttl_from_ping(self, ping_result: str | PingReply) -> int | None:
+        if isinstance(ping_result, PingReply):
+            return ping_result.ttl
+        
         try:
             ttl_match = re.search(TTL_REGEX, ping_result)
             if ttl_match:
@@ -101,6 +185,12 @@ class PingService(PingServiceInterface):
             pass
         return None
 
+    def get_rtts_from_ping(self, ping_result: str | PingReply) -> list[float]:
+        if isinstance(ping_result, PingReply):
+            return [ping_result.rtt_ms]
+        
+        return [float(rtt) for rtt in re.findall(RTT_REGEX, ping_result or "")]
+
     def get_os_from_ttl(self, ttl: int) -> str:
         if ttl in TTL_OS_MAPPING:
             return TTL_OS_MAPPING[ttl]
@@ -110,4 +200,114 @@ class PingService(PingServiceInterface):
             if expected_ttl - 10 <= ttl <= expected_ttl:
                 return ROUTER_TTL_TEMPLATE.format(os_name=os_name)
         
-        return UNKNOWN_OS_TEMPLATE.format(ttl=ttl)
\ No newline at end of file
+        return UNKNOWN_OS_TEMPLATE.format(ttl=ttl)
+
+    def _build_ping_args(self, ip_address: str, once: bool = False) -> list[str]:
+        """Build the platform specific ping command line, sending a single echo request when once is set."""
+        ping_count = 1 if once or not config else config.ping_count
+        ping_timeout_ms = config.ping_timeout_ms if config else 2000
+        
+        if platform.system() == PLATFORM_WINDOWS:
+            timeout_value = ping_timeout_ms
+        else:
+            timeout_value = ping_timeout_ms // 1000
+        
+        return [
+            self._ping_instruction,
+            self._ping_count_flag, str(ping_count),
+            self._ping_timeout_flag, str(timeout_value),
+            ip_address
+        ]
+
+    def _open_icmp_socket(self) -> tuple[socket.socket, bool]:
+        """Open a raw ICMP socket, falling back to an unprivileged datagram socket."""
+        try:
+            return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP), True
+        except PermissionError:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            sock.setsockopt(socket.IPPROTO_IP, IP_RECVTTL_OPTION, 1)
+            return sock, False
+
+    def _collect_replies(
+        self,
+        sock: socket.socket,
+        raw: bool,
+        identifier: int,
+        pending: dict[int, tuple[str, float]],
+        replies: dict[str, PingReply],
+        outstanding: set[str],
+        deadline: float,
+    ) -> None:
+        """Read echo replies until every outstanding address answered or the deadline passes."""
+        while outstanding:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not select.select([sock], [], [], remaining)[0]:
+                return
+            
+            try:
+                if raw:
+                    packet, (source, _) = sock.recvfrom(ICMP_RECV_BUFFER_SIZE)
+                    reply = self._parse_echo_reply(packet, source, ip_header=True)
+                else:
+                    packet, ancillary, _, (source, _) = sock.recvmsg(ICMP_RECV_BUFFER_SIZE, socket.CMSG_SPACE(4))
+                    reply = self._parse_echo_reply(packet, source, ip_header=False)
+                    if reply:
+                        reply.ttl = self._ttl_from_ancillary(ancillary)
+            except OSError:
+                continue
+            
+            received_at = time.perf_counter()
+            
+            # The kernel already filters datagram ICMP sockets by identifier
+            if not reply or (raw and reply.identifier != identifier) or reply.sequence not in pending:
+                continue
+            
+            ip_address, sent_at = pending[reply.sequence]
+            if ip_address != reply.ip_address or ip_address in replies:
+                continue
+            
+            reply.rtt_ms = round((received_at - sent_at) * 1000, 1)
+            replies[ip_address] = reply
+            outstanding.discard(ip_address)
+
+    def _build_echo_request(self, identifier: int, sequence: int) -> bytes:
+        """Build an ICMP echo request with a valid checksum."""
+        header = struct.pack(ICMP_HEADER_FORMAT, ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+        checksum = self._icmp_checksum(header + ICMP_PAYLOAD)
+        header = struct.pack(ICMP_HEADER_FORMAT, ICMP_ECHO_REQUEST, 0, checksum, identifier, sequence)
+        return header + ICMP_PAYLOAD
+
+    def _parse_echo_reply(self, packet: bytes, source: str, ip_header: bool) -> PingReply | None:
+        """Parse an echo reply, reading the TTL from the IP header when it is present."""
+        ttl = None
+        offset = 0
+        if ip_header:
+            if len(packet) < IP_HEADER_TTL_OFFSET + 1:
+                return None
+            offset = (packet[0] & 0x0F) * 4
+            ttl = packet[IP_HEADER_TTL_OFFSET]
+        
+        if len(packet) < offset + ICMP_HEADER_LENGTH:
+            return None
+        
+        icmp_type, _, _, identifier, sequence = struct.unpack_from(ICMP_HEADER_FORMAT, packet, offset)
+        if icmp_type != ICMP_ECHO_REPLY:
+            return None
+        
+        return PingReply(ip_address=source, rtt_ms=0.0, ttl=ttl, identifier=identifier, sequence=sequence)
+
+    def _ttl_from_ancillary(self, ancillary: list[tuple[int, int, bytes]]) -> int | None:
+        """Extract the IP_TTL control message delivered with a datagram ICMP reply."""
+        for level, cmsg_type, data in ancillary:
+            if level == socket.IPPROTO_IP and cmsg_type == IP_TTL_CMSG_TYPE and len(data) >= 4:
+                return struct.unpack('=i', data[:4])[0]
+        return None
+
+    def _icmp_checksum(self, data: bytes) -> int:
+        """RFC 1071 internet checksum."""
+        if len(data) % 2:
+            data += b'\x00'
+        total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+        total = (total >> 16) + (total & 0xFFFF)
+        total += total >> 16
+        return ~total & 0xFFFF
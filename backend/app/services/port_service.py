@@ -1,11 +1,15 @@
+import asyncio
+import select
 import socket
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from typing import Any, Coroutine
 
 from app import config
 from app.common.constants import *
 from app.common.objects import PortInfo, ServiceInfo
-from app.database.interfaces import DatabaseInterface
+from app.common.utilities import ProbeTimeout, ProbeTimeouts, ResourceBudget, ServiceRegistry, connect_scan, udp_request
+from app.database.interfaces import BatchInterface, DatabaseInterface
 from app.database.models import Mac, Port
 from app.services.interfaces import PortServiceInterface
 
@@ -13,8 +17,17 @@ from app.services.interfaces import PortServiceInterface
 class PortService(PortServiceInterface):
     """Service for handling port-related operations."""
 
-    def __init__(self, database: DatabaseInterface) -> None:
+    def __init__(
+        self,
+        database: DatabaseInterface,
+        budget: ResourceBudget | None = None,
+        timeouts: ProbeTimeouts | None = None,
+        services: ServiceRegistry | None = None,
+    ) -> None:
         self.database = database
+        self.budget = budget or ResourceBudget.from_config()
+        self.timeouts = timeouts or ProbeTimeouts()
+        self.services = services or ServiceRegistry.from_config()
         self.lock = threading.Lock()
 
     def save_port(self, mac_record: Mac, open_ports: list[PortInfo], services_info: dict[int, ServiceInfo] | None) -> None:
@@ -28,106 +41,218 @@ class PortService(PortServiceInterface):
             self.database.hard_delete(port)
 
         for port_info in open_ports:
-            service_name = port_info.service
-            banner = port_info.banner
-
-            # Override with service detection data if available
-            if services_info and port_info.number in services_info:
-                service_info = services_info[port_info.number]
-                if service_info.service_name:
-                    service_name = service_info.service_name
-                    if service_info.version:
-                        service_name += f" {service_info.version}"
-
-            port = Port(
-                mac_id=mac_record.id,
-                number=port_info.number,
-                protocol=port_info.protocol,
-                service=service_name,
-                banner=banner,
-            )
-
-            self.database.create(port)
+            self.database.create(self._new_port(mac_record.id, port_info, services_info))
+    
+    def save_ports(self, batch: BatchInterface, ports_by_mac: dict[int, tuple[list[PortInfo], dict[int, ServiceInfo] | None]]) -> None:
+        """Replace port data for many MAC records inside one batch."""
+        batch.hard_delete_in(Port, Port.mac_id, list(ports_by_mac))
+        
+        for mac_id, (open_ports, services_info) in ports_by_mac.items():
+            for port_info in open_ports:
+                batch.create(self._new_port(mac_id, port_info, services_info))
         
     def scan_ports(self, ip_address: str, ports: list[int], udp_ports: list[int]) -> list[PortInfo]:
         """Scan TCP and optionally UDP ports on target IP."""
-        open_ports: list[PortInfo] = []
         timeout = config.port_scan_timeout_ms / 1000
+        tcp_ports = self.scan_tcp_hosts({ip_address: ports})[ip_address]
+        open_ports = [port_info for port_info in tcp_ports if port_info.state == PORT_STATE_OPEN]
         
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(self._scan_tcp_port, ip_address, port, timeout)
-                for port in ports
-            ]
-            
-            for future in as_completed(futures):
-                port_info = future.result()
-                if port_info:
-                    open_ports.append(port_info)
-        
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = [
-                executor.submit(self._scan_udp_port, ip_address, port, timeout)
-                for port in udp_ports
-            ]
-            
-            for future in as_completed(futures):
-                port_info = future.result()
-                if port_info:
-                    open_ports.append(port_info)
-        
+        open_ports += self._scan_udp_ports(ip_address, udp_ports, timeout)
         return open_ports
     
-    def _scan_tcp_port(self, ip_address: str, port: int, timeout: float) -> PortInfo | None:
-        """Scan a single TCP port on the target IP."""
+    def scan_tcp_hosts(self, targets: dict[str, list[int]]) -> dict[str, list[PortInfo]]:
+        """Connect-scan TCP ports on many hosts at once from a single selector loop.
+        
+        Each host's ports are probed most-often-open first; every probed port is
+        reported with its open, closed or filtered state. Open ports of services
+        that greet first (SSH, FTP, SMTP, ...) keep their connection for
+        banner_grab_window_ms and carry whatever greeting arrived as their banner.
+        """
+        timeout = config.port_scan_timeout_ms / 1000
+        probe_timeouts: dict[tuple[str, int], ProbeTimeout] = {}
+        banners: dict[tuple[str, int], str | None] = {}
+        
+        def timeout_for(ip_address: str, port: int) -> float:
+            probe_timeouts[(ip_address, port)] = self.timeouts.get(ip_address, self._tcp_timeout(port, timeout))
+            return probe_timeouts[(ip_address, port)].seconds
+        
+        def on_banner(ip_address: str, port: int, data: bytes) -> None:
+            banners[(ip_address, port)] = self._decode_banner(data)
+        
+        states = connect_scan(
+            {ip_address: self.services.by_frequency(ports, TCP_PROTOCOL) for ip_address, ports in targets.items()},
+            timeout_for,
+            max_in_flight=config.tcp_max_in_flight,
+            max_in_flight_per_host=config.tcp_max_in_flight_per_host,
+            sockets=self.budget.sockets,
+            on_expired=lambda ip_address, port: probe_timeouts[(ip_address, port)].expired(),
+            grab_window_for=lambda ip_address, port: self._banner_window(port),
+            on_banner=on_banner,
+        )
+        
+        return {
+            ip_address: [
+                PortInfo(
+                    number=port,
+                    protocol=TCP_PROTOCOL,
+                    service=self.services.name(port, TCP_PROTOCOL),
+                    banner=banners.get((ip_address, port)),
+                    state=state
+                )
+                for port, state in sorted(port_states.items())
+            ]
+            for ip_address, port_states in states.items()
+        }
+    
+    async def scan_ports_async(self, ip_address: str, ports: list[int], udp_ports: list[int]) -> list[PortInfo]:
+        """Scan TCP and UDP ports on target IP without blocking the event loop.
+        
+        Every port probe holds a probe slot and a socket slot of the shared budget.
+        """
+        timeout = config.port_scan_timeout_ms / 1000
+
+        async def limited(probe: Coroutine[Any, Any, PortInfo | None]) -> PortInfo | None:
+            async with self.budget.probes.hold_async(), self.budget.sockets.hold_async():
+                return await probe
+
+        results = await asyncio.gather(
+            *(limited(self._scan_tcp_port_async(ip_address, port, timeout)) for port in self.services.by_frequency(ports, TCP_PROTOCOL)),
+            *(limited(self._scan_udp_port_async(ip_address, port, timeout)) for port in udp_ports),
+        )
+        return [port_info for port_info in results if port_info]
+
+    def _scan_udp_ports(self, ip_address: str, ports: list[int], timeout: float) -> list[PortInfo]:
+        """Probe the host's UDP ports from one socket in a single select loop.
+        
+        An empty datagram goes to every port back to back and replies are matched
+        by source port until the timeout, so a host costs one socket slot and one
+        timeout window instead of a thread and a socket per port. Ports that stay
+        silent are reported open|filtered when they are common UDP services.
+        """
+        if not ports:
+            return []
+        
+        wait = self.timeouts.get(ip_address, timeout)
+        targets = set(ports)
+        answered: set[int] = set()
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                adaptive_timeout = timeout if port < 1024 else timeout * 1.5
-                sock.settimeout(adaptive_timeout)
-                result = sock.connect_ex((ip_address, port))
+            with self.budget.sockets.hold(), socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.setblocking(False)
+                for port in ports:
+                    try:
+                        sock.sendto(b'', (ip_address, port))
+                    except OSError:
+                        pass
                 
-                if result == OPEN_PORT_RESULT:
-                    return PortInfo(
-                        number=port,
-                        protocol=TCP_PROTOCOL,
-                        service=self._get_service_name(port, protocol=TCP_PROTOCOL)
-                    )
-        except (socket.error, OSError):
-            pass
+                deadline = time.monotonic() + wait.seconds
+                while len(answered) < len(targets):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not select.select([sock], [], [], remaining)[0]:
+                        break
+                    try:
+                        data, (source, port) = sock.recvfrom(SOCKET_BUFFER_SIZE)
+                    except OSError:
+                        continue
+                    if data and source == ip_address and port in targets:
+                        answered.add(port)
+        except OSError:
+            return []
         
-        return None
+        if len(answered) < len(targets):
+            wait.expired()
+        return [
+            PortInfo(number=port, protocol=UDP_PROTOCOL, service=self.services.name(port, UDP_PROTOCOL))
+            for port in ports
+            if port in answered or port in UDP_COMMON_PORTS
+        ]
     
-    def _scan_udp_port(self, ip_address: str, port: int, timeout: float) -> PortInfo | None:
-        """Scan a single UDP port on the target IP."""
+    async def _scan_tcp_port_async(self, ip_address: str, port: int, timeout: float) -> PortInfo | None:
+        """Scan a single TCP port on the target IP using a non-blocking connect."""
+        wait = self.timeouts.get(ip_address, self._tcp_timeout(port, timeout))
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-                sock.settimeout(timeout)
-                
-                sock.sendto(b'', (ip_address, port))
-                
-                try:
-                    data, _ = sock.recvfrom(1024)
-                    if data:
-                        return PortInfo(
-                            number=port,
-                            protocol=UDP_PROTOCOL,
-                            service=self._get_service_name(port, protocol=UDP_PROTOCOL)
-                        )
-                except socket.timeout:
-                    if port in UDP_COMMON_PORTS:
-                        return PortInfo(
-                            number=port,
-                            protocol=UDP_PROTOCOL,
-                            service= self._get_service_name(port, protocol=UDP_PROTOCOL)
-                        )
-        except (socket.error, OSError):
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(ip_address, port), wait.seconds)
+        except asyncio.TimeoutError:
+            wait.expired()
+            return None
+        except OSError:
+            return None
+        
+        banner = None
+        window = self._banner_window(port)
+        if window > 0:
+            # Read the greeting on this connection instead of opening another one later
+            try:
+                data = await asyncio.wait_for(reader.read(SOCKET_BUFFER_SIZE), window)
+                banner = self._decode_banner(data)
+            except (asyncio.TimeoutError, OSError):
+                pass
+        
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
             pass
         
-        return None
+        return PortInfo(
+            number=port,
+            protocol=TCP_PROTOCOL,
+            service=self.services.name(port, TCP_PROTOCOL),
+            banner=banner
+        )
     
-    def _get_service_name(self, port: int, protocol: str) -> str:
-        """Get the service name for a port number."""
+    async def _scan_udp_port_async(self, ip_address: str, port: int, timeout: float) -> PortInfo | None:
+        """Scan a single UDP port on the target IP using a non-blocking datagram endpoint."""
+        wait = self.timeouts.get(ip_address, timeout)
         try:
-            return socket.getservbyport(port, protocol)
+            data = await udp_request(ip_address, port, b'', wait.seconds)
         except OSError:
-            return UNKNOWN_PORT_NAME
+            return None
+        
+        if data is None:
+            wait.expired()
+        
+        if data or port in UDP_COMMON_PORTS:
+            return PortInfo(
+                number=port,
+                protocol=UDP_PROTOCOL,
+                service=self.services.name(port, UDP_PROTOCOL)
+            )
+        return None
+    
+    def _tcp_timeout(self, port: int, timeout: float) -> float:
+        """Give unprivileged ports, which are often slower services, a longer connect timeout ceiling."""
+        return timeout if port < 1024 else timeout * 1.5
+    
+    def _banner_window(self, port: int) -> float:
+        """How long to wait for the greeting of a service that speaks first, 0 for all others."""
+        if self.services.kind(port, TCP_PROTOCOL) not in SPEAK_FIRST_SERVICE_KINDS:
+            return 0.0
+        return config.banner_grab_window_ms / 1000
+    
+    def _decode_banner(self, data: bytes) -> str | None:
+        return data.decode(DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING).strip() or None
+    
+    def _new_port(self, mac_id: int, port_info: PortInfo, services_info: dict[int, ServiceInfo] | None) -> Port:
+        """Build a port record, preferring service detection data when available."""
+        service_name = port_info.service
+
+        if services_info and port_info.number in services_info:
+            service_info = services_info[port_info.number]
+            if service_info.service_name:
+                service_name = service_info.service_name
+                if service_info.version:
+                    service_name += f" {service_info.version}"
+
+        certificate = port_info.certificate
+        return Port(
+            mac_id=mac_id,
+            number=port_info.number,
+            protocol=port_info.protocol,
+            service=service_name,
+            banner=port_info.banner,
+            tls_subject=certificate.subject if certificate else None,
+            tls_issuer=certificate.issuer if certificate else None,
+            tls_san=TLS_SAN_SEPARATOR.join(certificate.san) if certificate and certificate.san else None,
+            tls_not_after=certificate.not_after if certificate else None,
+            tls_sha256=certificate.sha256 if certificate else None,
+        )
@@ -1,83 +1,139 @@
+import asyncio
 import socket
-import urllib.error
-import urllib.request
 
 from app import config
 from app.common.constants import *
-from app.common.objects import ServiceInfo
+from app.common.objects import HttpFingerprint, ServiceInfo, TlsCertificate
+from app.common.utilities import HttpFingerprinter, ProbeTimeouts, ResourceBudget, TlsInspector
 from app.services.interfaces import ProtocolServiceInterface
 
 
 class ProtocolService(ProtocolServiceInterface):
     """Detector for HTTP services."""
     
+    def __init__(
+        self,
+        budget: ResourceBudget | None = None,
+        timeouts: ProbeTimeouts | None = None,
+        fingerprinter: HttpFingerprinter | None = None,
+        inspector: TlsInspector | None = None,
+    ) -> None:
+        self.budget = budget or ResourceBudget.from_config()
+        self.timeouts = timeouts or ProbeTimeouts()
+        self.fingerprinter = fingerprinter or HttpFingerprinter(self.budget.sockets, self.timeouts)
+        self.inspector = inspector or TlsInspector(self.budget.sockets, self.timeouts, self.fingerprinter)
+    
     def detect_http(self, ip: str, port: int) -> ServiceInfo | None:
-        """Detect HTTP service and get server information."""        
-        try:
-            protocol_scheme = HTTPS_SCHEME if port == HTTPS_PORT else HTTP_SCHEME
-            url = HTTP_URL_TEMPLATE.format(protocol_scheme=protocol_scheme, ip_address=ip, port=port)
-            
-            req = urllib.request.Request(url)
-            req.add_header(USER_AGENT_HEADER, USER_AGENT_VALUE)
-            
-            timeout = config.service_detection_timeout_ms / 1000
-            
-            with urllib.request.urlopen(req, timeout=timeout) as response:
-                headers = response.headers
-                server = headers.get(SERVER_HEADER, HTTP_DEFAULT_SERVER)
-                
-                return ServiceInfo(
-                    service_name=HTTP_SERVICE_NAME,
-                    product=server,
-                    extra_info=HTTP_INFO_TEMPLATE.format(status=response.status)
-                )
-        
-        except (urllib.error.URLError, socket.timeout, Exception):
-            return ServiceInfo(service_name=HTTP_SERVICE_NAME, product=HTTP_DEFAULT_SERVER)
+        """Detect HTTP service and get server information."""
+        return self.detect_http_many([(ip, port)]).get((ip, port))
 
-    def detect_ssh(self, ip: str, port: int) -> ServiceInfo | None:
-        """Detect SSH service and get version banner."""
-        try:
+    def detect_http_many(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], ServiceInfo]:
+        """Fingerprint many web ports concurrently; ports where no web server answered are left out."""
+        return self._http_services(self.fingerprinter.fingerprint_many(targets))
 
-            timeout = config.service_detection_timeout_ms / 1000
-            
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(timeout)
-                sock.connect((ip, port))
-                
-                banner = sock.recv(SOCKET_BUFFER_SIZE).decode(DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING).strip()
-                
-                if banner.startswith(SSH_BANNER_PREFIX):
-                    parts = banner.split()
-                    version = parts[0] if parts else DEFAULT_VERSION
-                    
-                    return ServiceInfo(
-                        service_name=SSH_SERVICE_NAME,
-                        version=version,
-                        extra_info=banner
-                    )
-        
-        except (socket.error, UnicodeDecodeError):
-            pass
-        
-        return ServiceInfo(service_name=SSH_SERVICE_NAME, product=SSH_DEFAULT_PRODUCT)
+    def inspect_tls_many(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], TlsCertificate]:
+        """Handshake with many TLS ports concurrently; ports that did not complete a handshake are left out."""
+        return {target: certificate for target, certificate in self.inspector.inspect_many(targets).items() if certificate}
+
+    def detect_ssh(self, ip: str, port: int, banner: str | None = None) -> ServiceInfo | None:
+        """Detect SSH service and get version banner, connecting only when no banner was grabbed yet."""
+        if banner is None:
+            banner = self._read_banner(ip, port)
+        info = self._parse_ssh_banner(banner) if banner else None
+        return info or ServiceInfo(service_name=SSH_SERVICE_NAME, product=SSH_DEFAULT_PRODUCT)
     
-    def detect_banner(self, ip: str, port: int, service_name: str) -> ServiceInfo | None:
-        """Generic banner grabbing for text-based services."""        
+    def detect_banner(self, ip: str, port: int, service_name: str, banner: str | None = None) -> ServiceInfo | None:
+        """Generic banner grabbing for text-based services, connecting only when no banner was grabbed yet."""
+        if banner is None:
+            banner = self._read_banner(ip, port)
+        if banner:
+            return ServiceInfo(service_name=service_name, extra_info=banner[:MAX_BANNER_LENGTH])
+        return None
+
+    async def detect_http_async(self, ip: str, port: int) -> ServiceInfo | None:
+        """Detect HTTP service and get server information without blocking the event loop."""
+        return (await self.detect_http_many_async([(ip, port)])).get((ip, port))
+
+    async def detect_http_many_async(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], ServiceInfo]:
+        """Fingerprint many web ports concurrently without blocking the event loop."""
+        return self._http_services(await self.fingerprinter.fingerprint_many_async(targets))
+
+    async def inspect_tls_many_async(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], TlsCertificate]:
+        """Handshake with many TLS ports concurrently without blocking the event loop."""
+        return {target: certificate for target, certificate in (await self.inspector.inspect_many_async(targets)).items() if certificate}
+
+    async def detect_ssh_async(self, ip: str, port: int, banner: str | None = None) -> ServiceInfo | None:
+        """Detect SSH service and get version banner without blocking the event loop."""
+        if banner is None:
+            banner = await self._read_banner_async(ip, port)
+        info = self._parse_ssh_banner(banner) if banner else None
+        return info or ServiceInfo(service_name=SSH_SERVICE_NAME, product=SSH_DEFAULT_PRODUCT)
+
+    async def detect_banner_async(self, ip: str, port: int, service_name: str, banner: str | None = None) -> ServiceInfo | None:
+        """Generic banner grabbing for text-based services without blocking the event loop."""
+        if banner is None:
+            banner = await self._read_banner_async(ip, port)
+        if banner:
+            return ServiceInfo(service_name=service_name, extra_info=banner[:MAX_BANNER_LENGTH])
+        return None
+
+    def _read_banner(self, ip: str, port: int) -> str | None:
+        """Connect to a port and read the greeting the server sends first."""
+        wait = self.timeouts.get(ip, config.service_detection_timeout_ms / 1000, service=True)
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(config.service_detection_timeout_ms / 1000)
+            with self.budget.sockets.hold(), socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.settimeout(wait.seconds)
                 sock.connect((ip, port))
-                
-                banner = sock.recv(SOCKET_BUFFER_SIZE).decode(DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING).strip()
-                
-                if banner:
-                    return ServiceInfo(
-                        service_name=service_name,
-                        extra_info=banner[:MAX_BANNER_LENGTH]
-                    )                
-                        
-        except (socket.error, UnicodeDecodeError):
-            pass
-        
-        return None
\ No newline at end of file
+                data = sock.recv(SOCKET_BUFFER_SIZE)
+            return data.decode(DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING).strip()
+        except socket.timeout:
+            wait.expired()
+            return None
+        except OSError:
+            return None
+
+    async def _read_banner_async(self, ip: str, port: int) -> str | None:
+        """Connect to a port and read the greeting the server sends first."""
+        wait = self.timeouts.get(ip, config.service_detection_timeout_ms / 1000, service=True)
+        try:
+            async with self.budget.sockets.hold_async():
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), wait.seconds)
+                try:
+                    data = await asyncio.wait_for(reader.read(SOCKET_BUFFER_SIZE), wait.seconds)
+                finally:
+                    writer.close()
+            return data.decode(DEFAULT_ENCODING, errors=ENCODING_ERROR_HANDLING).strip()
+        except asyncio.TimeoutError:
+            wait.expired()
+            return None
+        except OSError:
+            return None
+
+    def _parse_ssh_banner(self, banner: str) -> ServiceInfo | None:
+        """Build SSH service information from a server identification string."""
+        if banner.startswith(SSH_BANNER_PREFIX):
+            parts = banner.split()
+            version = parts[0] if parts else DEFAULT_VERSION
+            
+            return ServiceInfo(
+                service_name=SSH_SERVICE_NAME,
+                version=version,
+                extra_info=banner
+            )
+        return None
+
+    def _http_services(self, fingerprints: dict[tuple[str, int], HttpFingerprint | None]) -> dict[tuple[str, int], ServiceInfo]:
+        services: dict[tuple[str, int], ServiceInfo] = {}
+        for target, fingerprint in fingerprints.items():
+            if fingerprint is None:
+                continue
+            if fingerprint.title:
+                extra_info = HTTP_TITLE_INFO_TEMPLATE.format(status=fingerprint.status, title=fingerprint.title)
+            else:
+                extra_info = HTTP_INFO_TEMPLATE.format(status=fingerprint.status)
+            services[target] = ServiceInfo(
+                service_name=HTTPS_SERVICE_NAME if fingerprint.tls else HTTP_SERVICE_NAME,
+                product=fingerprint.server or HTTP_DEFAULT_SERVER,
+                extra_info=extra_info
+            )
+        return services
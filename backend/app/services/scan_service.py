@@ -1,12 +1,17 @@
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
+from functools import partial
+from typing import Any, Callable
 
 from sqlalchemy import text
 
 from app import config
 from app.common.constants import *
-from app.common.objects import AddressData, ScanOptions
+from app.common.objects import (AddressData, DiscoveryInfo, HostFingerprint, PingReply, PipelineStage, PortInfo, ProbeStage, ResourceUsage,
+                                ScanOptions, StageThroughput, TimeoutStats)
+from app.common.utilities import ProbeTimeouts, ResourceBudget, ServiceRegistry, StagePipeline, run_probe_graph
 from app.database.interfaces import DatabaseInterface
 from app.database.models import Mac
 from app.services.interfaces import *
@@ -23,14 +28,30 @@ class ScanService(ScanServiceInterface):
         port_service: PortServiceInterface,
         discovery_service: DiscoveryServiceInterface,
         protocol_service: ProtocolServiceInterface,
+        suppression_service: SuppressionServiceInterface,
+        budget: ResourceBudget | None = None,
+        timeouts: ProbeTimeouts | None = None,
+        services: ServiceRegistry | None = None,
     ) -> None:
         self.database = database
+        self.budget = budget or ResourceBudget.from_config()
+        self.timeouts = timeouts or ProbeTimeouts()
+        self.services = services or ServiceRegistry.from_config()
         self.ping_service = ping_service
         self.mac_service = mac_service
         self.port_service = port_service
         self.discovery_service = discovery_service
         self.protocol_service = protocol_service
+        self.suppression_service = suppression_service
         self.print_lock = threading.Lock()
+        self.stage_lock = threading.Lock()
+        self.stage_executor: ThreadPoolExecutor | None = None
+        self.pipeline: StagePipeline | None = None
+        self.fingerprint_lock = threading.Lock()
+        self.fingerprints: dict[str, HostFingerprint] = {}
+        self.verified: set[str] = set()
+        self.hosts_verified = 0
+        self.hosts_deep_scanned = 0
 
     def save_mac_scan(self, address_data: AddressData) -> None:
         """Save or update device data for mac only scan."""
@@ -47,6 +68,40 @@ class ScanService(ScanServiceInterface):
         if saved_mac and address_data.discovered_info:
             self.discovery_service.save_discoveries(saved_mac, address_data.discovered_info)
             
+    def save_scan_results(self, devices: list[AddressData], full_scan: bool) -> None:
+        """Save a whole scan cycle in a single transaction."""
+        devices = [device for device in devices if device.mac_address]
+        if not devices:
+            return
+        
+        with self.database.batch() as batch:
+            macs = self.mac_service.save_macs(batch, devices, preserve=not full_scan)
+            if not full_scan:
+                return
+            
+            ports_by_mac = {
+                macs[device.mac_address].id: (device.open_ports, device.services_info)
+                for device in devices if device.mac_address and device.open_ports
+            }
+            discoveries_by_mac = {
+                macs[device.mac_address].id: device.discovered_info
+                for device in devices if device.mac_address and device.discovered_info
+            }
+            
+            self.port_service.save_ports(batch, ports_by_mac)
+            self.discovery_service.save_all_discoveries(batch, discoveries_by_mac)
+            
+    def get_resource_usage(self) -> list[ResourceUsage]:
+        """Current and peak usage of the shared socket, subprocess and probe budget."""
+        return self.budget.usage()
+    
+    def get_timeout_stats(self) -> TimeoutStats:
+        """Adaptive timeout usage since the current scan started."""
+        return self.timeouts.get_stats()
+    
+    def get_stage_throughput(self) -> list[StageThroughput]:
+        return self.pipeline.throughput() if self.pipeline is not None else []
+    
     def get_latest_scan_date(self) -> datetime | None:
         """Get the date of the latest scan."""
         latest_scan = self.database.select(Mac).order_by(text("last_seen DESC")).first()
@@ -56,116 +111,525 @@ class ScanService(ScanServiceInterface):
 
     def scan_network(self, scan_options: ScanOptions) -> list[AddressData]:
         """Scan the configured network range."""        
-        subnet = config.subnet
-        min_ip = config.min_scan_ip
-        max_ip = config.max_scan_ip
-        max_threads = config.max_threads
+        return list(self.scan_network_stream(scan_options))
+    
+    def get_scan_range(self) -> list[str]:
+        """Addresses of the configured network range."""
+        return [f"{config.subnet}.{i}" for i in range(config.min_scan_ip, config.max_scan_ip + 1)]
+    
+    def scan_network_stream(self, scan_options: ScanOptions, ip_addresses: list[str] | None = None) -> Iterator[AddressData]:
+        """Scan the configured network range (or just the given addresses), yielding each host as soon as it completes."""
+        ip_range = ip_addresses if ip_addresses is not None else self.get_scan_range()
+        self.timeouts.reset_stats()
+        self.hosts_verified = self.hosts_deep_scanned = 0
+        # Only a stage-major run of this cycle has throughput to report
+        self.pipeline = None
+        self._sweep_discovery(scan_options)
+        devices = self._sweep_arp(ip_range, scan_options)
+        if devices is not None:
+            yield from devices
+        else:
+            yield from self._stream_addresses(self._skip_suppressed(ip_range), scan_options)
+        self.suppression_service.save()
+        
+        if scan_options.mac_resolution:
+            stats = self.mac_service.get_neighbor_stats()
+            self._print_status(f"Scanning completed, neighbor cache {stats.hits} hits / {stats.misses} misses")
+        else:
+            self._print_status("Scanning completed")
+        
+        usage = ", ".join(f"{pool.name} {pool.peak}/{pool.limit} (waits {pool.waits})" for pool in self.get_resource_usage())
+        self._print_status(f"Resource budget peak usage: {usage}")
+        
+        if scan_options.hostname_resolution:
+            resolver = self.ping_service.get_resolver_stats()
+            hit_rate = resolver.cache_hits / resolver.lookups * 100 if resolver.lookups else 0.0
+            self._print_status(
+                f"Reverse DNS: {resolver.lookups} lookups, {hit_rate:.0f}% cache hits, "
+                f"{resolver.timeouts} timeouts, {resolver.mean_latency_ms:.1f}ms mean latency"
+            )
+        
+        throughput = ", ".join(
+            f"{stage.name} {stage.processed / stage.elapsed_s if stage.elapsed_s else 0.0:.1f}/s "
+            f"({stage.processed} passed, {stage.dropped} dropped, {stage.workers} workers)"
+            for stage in self.get_stage_throughput()
+        )
+        if throughput:
+            self._print_status(f"Stage throughput: {throughput}")
+        
+        if self.hosts_verified:
+            self._print_status(f"Incremental scan: {self.hosts_verified} hosts verified unchanged, {self.hosts_deep_scanned} deep scanned")
+        
+        suppressed = self.suppression_service.get_suppressed_count()
+        if suppressed:
+            self._print_status(f"Dead-address suppression: {suppressed} unresponsive addresses backed off")
+        
+        stats = self.get_timeout_stats()
+        if stats.adaptive:
+            self._print_status(
+                f"Adaptive timeouts: {stats.adaptive} probes on {stats.hosts} hosts, "
+                f"{stats.expired} expired, {stats.saved_ms / 1000:.1f}s of waiting saved"
+            )
+    
+    def _sweep_discovery(self, scan_options: ScanOptions) -> None:
+        """Run the subnet-wide discovery sweeps once per cycle; host scans read their results."""
+        if not config.discovery_sweeps:
+            return
+        
+        sweeps: dict[str, Callable[[], dict[str, Any]]] = {}
+        if scan_options.discover_mdns:
+            sweeps[MDNS_PROTOCOL_NAME] = self.discovery_service.sweep_mdns
+        if scan_options.discover_upnp:
+            sweeps[UPNP_PROTOCOL_NAME] = self.discovery_service.sweep_upnp
+        if not sweeps:
+            return
+        
+        # Each sweep mostly waits out its listen window, so they run side by side
+        with ThreadPoolExecutor(max_workers=len(sweeps)) as executor:
+            futures = {protocol: executor.submit(sweep) for protocol, sweep in sweeps.items()}
+            for protocol, future in futures.items():
+                self._print_status(f"{protocol} sweep found {len(future.result())} responders")
+    
+    def _sweep_netbios(self, ip_addresses: list[str], scan_options: ScanOptions) -> None:
+        """Query NetBIOS node status of the live hosts in one window; host scans read the result."""
+        if not config.discovery_sweeps or not scan_options.discover_netbios or not ip_addresses:
+            return
+        
+        self._print_status(f"NetBIOS sweeping {len(ip_addresses)} addresses")
+        tables = self.discovery_service.sweep_netbios(ip_addresses)
+        self._print_status(f"{NETBIOS_PROTOCOL_NAME} sweep found {len(tables)} responders")
+    
+    def _resolve_hostnames(self, ip_addresses: list[str], scan_options: ScanOptions) -> None:
+        """Resolve the hostnames of the live hosts in one window; host scans read the resolver cache."""
+        if not scan_options.hostname_resolution or not ip_addresses:
+            return
+        
+        self._print_status(f"Resolving hostnames of {len(ip_addresses)} addresses")
+        hostnames = self.ping_service.resolve_hostnames(ip_addresses)
+        self._print_status(f"Resolved {sum(1 for hostname in hostnames.values() if hostname)} hostnames")
+    
+    def _stream_addresses(self, ip_range: list[str], scan_options: ScanOptions) -> Iterator[AddressData]:
+        """Scan every address in the range on the thread pool.
         
-        devices: list[AddressData] = []
-        ip_range: list[str] = [f"{subnet}.{i}" for i in range(min_ip, max_ip + 1)]
+        At most max_threads scans are in flight, each holding a probe slot of the
+        shared budget; new ones are only submitted as the consumer takes results, so
+        a slow consumer throttles the scan instead of letting finished results pile up.
+        """
+        ping_results = self._sweep_ping(ip_range)
+        self._refresh_neighbors(scan_options)
+        live_addresses = ip_range if ping_results is None else list(ping_results)
+        self._sweep_netbios(live_addresses, scan_options)
+        self._resolve_hostnames(live_addresses, scan_options)
+        if config.scan_order == SCAN_ORDER_STAGE:
+            yield from self._stream_stages(ip_range, ping_results, scan_options)
+            return
+        
+        if ping_results is None:
+            jobs = iter([(self.scan_ip, (ip, scan_options)) for ip in ip_range])
+        else:
+            jobs = iter([(self._scan_ip, (ip, scan_options, result)) for ip, result in ping_results.items()])
 
-        with ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = [executor.submit(self.scan_ip, ip, scan_options) for ip in ip_range]
-            for future in as_completed(futures):
-                device: AddressData | None = future.result()
-                if device is not None:
-                    devices.append(device)
+        with ThreadPoolExecutor(max_workers=config.max_threads) as executor:
+            pending: set[Future[AddressData | None]] = set()
+            for func, args in jobs:
+                pending.add(executor.submit(self._hold_probe, func, *args))
+                if len(pending) >= config.max_threads:
+                    break
+            
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    device: AddressData | None = future.result()
+                    if device is not None:
+                        yield device
                     
-        self._print_status("Scanning completed")
-        return devices
+                    next_job = next(jobs, None)
+                    if next_job:
+                        pending.add(executor.submit(self._hold_probe, next_job[0], *next_job[1]))
+    
+    def _hold_probe(self, func: Callable[..., AddressData | None], *args: Any) -> AddressData | None:
+        with self.budget.probes.hold():
+            return func(*args)
     
     def scan_ip(self, ip_address: str, scan_options: ScanOptions) -> AddressData | None:
         """Scan a specific IP address."""
-        scan_result = AddressData(ip_address=ip_address)
-        
         # Step 1: Ping the IP
         self._print_status(f"{ip_address} Scanning started")
-        ping_result = self.ping_service.ping(ip_address)
-        if ping_result:
-            scan_result.ping_time_ms, ping_out = ping_result
-        else:
+        return self._scan_ip(ip_address, scan_options, self.ping_service.ping(ip_address, once=self.suppression_service.is_suppressed(ip_address)))
+    
+    def _scan_ip(self, ip_address: str, scan_options: ScanOptions, ping_result: tuple[int, str | PingReply] | None) -> AddressData | None:
+        """Scan a specific IP address given the outcome of its liveness check.
+        
+        The remaining probes run as a dependency graph, so independent probes of the
+        host overlap and the host costs its slowest chain of probes.
+        """
+        host = self._start_host(ip_address, ping_result)
+        if host is None:
             return None # IP is unreachable, skip further steps
-                
-        # Step 2: MAC resolution
-        if scan_options.mac_resolution:
-            self._print_status(f"{ip_address} MAC resolution started")
-            arp_result = self.mac_service.resolve_mac_address(ip_address)
-            if arp_result:
-                scan_result.mac_address, scan_result.arp_time_ms = arp_result
         
-        # Step 3: Extract TTL from ping output
-        if scan_options.ttl_resolution and ping_out:
-            self._print_status(f"{ip_address} Extracting TTL from ping output")
-            scan_result.ttl = self.ping_service.get_ttl_from_ping(ping_out)
+        scan_result, ping_out = host
+        run_probe_graph(self._probe_stages(ip_address, scan_options, scan_result, ping_out), self._get_stage_executor(), self.budget.probes)
+        self._remember_host(scan_options, scan_result)
+        return scan_result
+    
+    def _start_host(self, ip_address: str, ping_result: tuple[int, str | PingReply] | None) -> tuple[AddressData, str | PingReply] | None:
+        """Result of a host that passed its liveness check, with its RTTs fed to the adaptive timeouts."""
+        self.suppression_service.record(ip_address, alive=bool(ping_result))
+        if not ping_result:
+            return None
         
-        # Step 4: Resolve hostname
+        with self.fingerprint_lock:
+            self.verified.discard(ip_address)
+        scan_result = AddressData(ip_address=ip_address)
+        scan_result.ping_time_ms, ping_out = ping_result
+        self.timeouts.observe(ip_address, self.ping_service.get_rtts_from_ping(ping_out))
+        return scan_result, ping_out
+    
+    def _stream_stages(
+        self,
+        ip_range: list[str],
+        ping_results: dict[str, tuple[int, str | PingReply]] | None,
+        scan_options: ScanOptions,
+    ) -> Iterator[AddressData]:
+        """Scan the range stage by stage instead of host by host.
+        
+        Liveness runs for every address, then the link layer for the live hosts, then
+        their ports, services and discoveries. Each stage has its own worker pool and
+        the stages are chained by bounded queues, so a host moves on as soon as a stage
+        is done with it. Workers hold a probe slot of the shared budget while busy.
+        """
+        if ping_results is None:
+            # No sweep: the liveness stage pings every address itself
+            hosts = [(ip, None) for ip in ip_range]
+        else:
+            hosts = list(ping_results.items())
+        
+        self.pipeline = StagePipeline(self._pipeline_stages(scan_options), config.pipeline_queue_size)
+        for scan_result, _ in self.pipeline.run(hosts):
+            self._remember_host(scan_options, scan_result)
+            yield scan_result
+    
+    def _pipeline_stages(self, scan_options: ScanOptions) -> list[PipelineStage]:
+        probe_groups = (
+            (PIPELINE_STAGE_LINK, config.pipeline_link_workers, PROBE_STAGES_LINK),
+            (PIPELINE_STAGE_PORTS, config.pipeline_port_workers, (PROBE_STAGE_VERIFY, PROBE_STAGE_PORTS)),
+            (PIPELINE_STAGE_SERVICES, config.pipeline_service_workers, (PROBE_STAGE_HTTP, PROBE_STAGE_TLS, PROBE_STAGE_BANNERS)),
+            (PIPELINE_STAGE_DISCOVERY, config.pipeline_discovery_workers, (NETBIOS_PROTOCOL_NAME, UPNP_PROTOCOL_NAME, MDNS_PROTOCOL_NAME, PROBE_STAGE_DISCOVERIES)),
+        )
+        stages = [PipelineStage(PIPELINE_STAGE_LIVENESS, config.pipeline_liveness_workers, partial(self._hold_stage, self._check_liveness))]
+        stages += [
+            PipelineStage(name, workers, partial(self._hold_stage, partial(self._run_probes, scan_options=scan_options, probes=probes)))
+            for name, workers, probes in probe_groups
+        ]
+        return stages
+    
+    def _hold_stage(self, run: Callable[[Any], Any], host: Any) -> Any:
+        with self.budget.probes.hold():
+            return run(host)
+    
+    def _check_liveness(self, host: tuple[str, tuple[int, str | PingReply] | None]) -> tuple[AddressData, str | PingReply] | None:
+        ip_address, ping_result = host
+        if ping_result is None:
+            self._print_status(f"{ip_address} Scanning started")
+            ping_result = self.ping_service.ping(ip_address, once=self.suppression_service.is_suppressed(ip_address))
+        return self._start_host(ip_address, ping_result)
+    
+    def _run_probes(
+        self,
+        host: tuple[AddressData, str | PingReply],
+        scan_options: ScanOptions,
+        probes: tuple[str, ...],
+    ) -> tuple[AddressData, str | PingReply]:
+        """Run the host's enabled probe stages that belong to one pipeline stage, in dependency order."""
+        scan_result, ping_out = host
+        for stage in self._probe_stages(scan_result.ip_address, scan_options, scan_result, ping_out):
+            if stage.name in probes:
+                stage.run()
+        return host
+    
+    def _probe_plan(self, ip_address: str, scan_options: ScanOptions, ping_out: str | PingReply) -> list[tuple[str, tuple[str, ...]]]:
+        """Names of the probe stages enabled by the scan options, each listed after the stages whose results it reads."""
+        plan: list[tuple[str, tuple[str, ...]]] = []
+        if scan_options.mac_resolution:
+            plan.append((PROBE_STAGE_MAC, ()))
+        if scan_options.ttl_resolution and ping_out:
+            plan.append((PROBE_STAGE_TTL, ()))
         if scan_options.hostname_resolution:
-            self._print_status(f"{ip_address} Resolving hostname")
-            scan_result.hostname = self.ping_service.get_hostname(ip_address)
+            plan.append((PROBE_STAGE_HOSTNAME, ()))
+        if scan_options.mac_vendor_lookup:
+            plan.append((PROBE_STAGE_VENDOR, (PROBE_STAGE_MAC,)))
+        if scan_options.os_detection:
+            plan.append((PROBE_STAGE_OS, (PROBE_STAGE_TTL,)))
+        
+        deep_after: tuple[str, ...] = ()
+        if self._has_fingerprint(ip_address, scan_options):
+            # Deep probes wait for the link-layer details that decide whether they run at all
+            plan.append((PROBE_STAGE_VERIFY, (PROBE_STAGE_MAC, PROBE_STAGE_TTL, PROBE_STAGE_HOSTNAME)))
+            deep_after = (PROBE_STAGE_VERIFY,)
+        if scan_options.port_scan:
+            plan.append((PROBE_STAGE_PORTS, deep_after))
+            if scan_options.detect_http:
+                plan.append((PROBE_STAGE_HTTP, (PROBE_STAGE_PORTS,)))
+            if scan_options.detect_tls:
+                # HTTPS ports reuse the certificate of the HTTP stage's handshake
+                plan.append((PROBE_STAGE_TLS, (PROBE_STAGE_PORTS, PROBE_STAGE_HTTP) if scan_options.detect_http else (PROBE_STAGE_PORTS,)))
+            if scan_options.detect_ssh or scan_options.detect_banners:
+                plan.append((PROBE_STAGE_BANNERS, (PROBE_STAGE_PORTS,)))
         
-        # Step 5: MAC vendor lookup
-        if scan_options.mac_vendor_lookup and scan_result.mac_address:
+        protocols = tuple(protocol for protocol, enabled in (
+            (NETBIOS_PROTOCOL_NAME, scan_options.discover_netbios),
+            (UPNP_PROTOCOL_NAME, scan_options.discover_upnp),
+            (MDNS_PROTOCOL_NAME, scan_options.discover_mdns),
+        ) if enabled)
+        plan.extend((protocol, deep_after) for protocol in protocols)
+        if protocols:
+            plan.append((PROBE_STAGE_DISCOVERIES, protocols))
+        return plan
+    
+    def _probe_stages(self, ip_address: str, scan_options: ScanOptions, scan_result: AddressData, ping_out: str | PingReply) -> list[ProbeStage]:
+        discoveries: dict[str, DiscoveryInfo | None] = {}
+        
+        def discover(protocol: str) -> None:
+            discoveries[protocol] = self._discover(ip_address, protocol)
+        
+        probes: dict[str, Callable[[], None]] = {
+            PROBE_STAGE_MAC: lambda: self._resolve_mac(ip_address, scan_result),
+            PROBE_STAGE_TTL: lambda: self._read_ttl(ip_address, scan_result, ping_out),
+            PROBE_STAGE_HOSTNAME: lambda: self._lookup_hostname(ip_address, scan_result),
+            PROBE_STAGE_VENDOR: lambda: self._lookup_vendor(ip_address, scan_result),
+            PROBE_STAGE_OS: lambda: self._guess_os(ip_address, scan_result),
+            PROBE_STAGE_PORTS: lambda: self._scan_ports(ip_address, scan_result),
+            PROBE_STAGE_HTTP: lambda: self._detect_http(ip_address, scan_result),
+            PROBE_STAGE_TLS: lambda: self._collect_certificates(ip_address, scan_result),
+            PROBE_STAGE_BANNERS: lambda: self._detect_banners(ip_address, scan_options, scan_result),
+            NETBIOS_PROTOCOL_NAME: partial(discover, NETBIOS_PROTOCOL_NAME),
+            UPNP_PROTOCOL_NAME: partial(discover, UPNP_PROTOCOL_NAME),
+            MDNS_PROTOCOL_NAME: partial(discover, MDNS_PROTOCOL_NAME),
+            PROBE_STAGE_DISCOVERIES: lambda: self._add_discoveries(scan_result, discoveries),
+            PROBE_STAGE_VERIFY: lambda: self._verify_host(ip_address, scan_options, scan_result),
+        }
+        
+        def unless_verified(run: Callable[[], None]) -> Callable[[], None]:
+            return lambda: None if self._is_verified(ip_address) else run()
+        
+        return [
+            ProbeStage(name, probes[name] if name in PROBE_STAGES_LINK or name == PROBE_STAGE_VERIFY else unless_verified(probes[name]), after)
+            for name, after in self._probe_plan(ip_address, scan_options, ping_out)
+        ]
+    
+    def _get_stage_executor(self) -> ThreadPoolExecutor:
+        """Thread pool shared by the probe stages of all hosts, created on first use.
+        
+        Every task on it holds a probe slot, so the probe budget also bounds its threads.
+        """
+        with self.stage_lock:
+            if self.stage_executor is None:
+                self.stage_executor = ThreadPoolExecutor(max_workers=self.budget.probes.limit, thread_name_prefix=PROBE_STAGE_THREAD_PREFIX)
+            return self.stage_executor
+    
+    def _resolve_mac(self, ip_address: str, scan_result: AddressData) -> None:
+        self._print_status(f"{ip_address} MAC resolution started")
+        arp_result = self.mac_service.resolve_mac_address(ip_address)
+        if arp_result:
+            scan_result.mac_address, scan_result.arp_time_ms = arp_result
+    
+    def _read_ttl(self, ip_address: str, scan_result: AddressData, ping_out: str | PingReply) -> None:
+        self._print_status(f"{ip_address} Extracting TTL from ping output")
+        scan_result.ttl = self.ping_service.get_ttl_from_ping(ping_out)
+    
+    def _lookup_hostname(self, ip_address: str, scan_result: AddressData) -> None:
+        self._print_status(f"{ip_address} Resolving hostname")
+        scan_result.hostname = self.ping_service.get_hostname(ip_address)
+    
+    def _lookup_vendor(self, ip_address: str, scan_result: AddressData) -> None:
+        if scan_result.mac_address:
             self._print_status(f"{ip_address} Looking up MAC vendor")
             scan_result.mac_vendor = self.mac_service.get_vendor_from_mac(scan_result.mac_address)
-        
-        # Step 6: OS detection
-        if scan_options.os_detection and scan_result.ttl:
+    
+    def _guess_os(self, ip_address: str, scan_result: AddressData) -> None:
+        if scan_result.ttl:
             self._print_status(f"{ip_address} Detecting OS from TTL")
             scan_result.os_guess = self.ping_service.get_os_from_ttl(scan_result.ttl)
-        
-        # Step 7: Port scanning
-        if scan_options.port_scan:
-            self._print_status(f"{ip_address} Port scanning started")
-            scan_result.open_ports = self.port_service.scan_ports(ip_address, TCP_COMMON_PORTS, UDP_COMMON_PORTS)
-        
-        #Step 8: Service detection
+    
+    def _scan_ports(self, ip_address: str, scan_result: AddressData) -> None:
+        self._print_status(f"{ip_address} Port scanning started")
+        scan_result.open_ports = self.port_service.scan_ports(ip_address, TCP_COMMON_PORTS, UDP_COMMON_PORTS)
+    
+    def _detect_http(self, ip_address: str, scan_result: AddressData) -> None:
+        """Fingerprint all web ports of the host at once."""
+        web_ports = self._web_ports(scan_result)
+        if web_ports:
+            self._print_status(f"{ip_address} Checking HTTP services on {len(web_ports)} ports")
+            http_services = self.protocol_service.detect_http_many([(ip_address, port) for port in web_ports])
+            for (_, port), result in http_services.items():
+                scan_result.services_info[port] = result
+    
+    def _collect_certificates(self, ip_address: str, scan_result: AddressData) -> None:
+        """Collect the certificates of all TLS ports of the host at once."""
+        tls_ports = self._tls_ports(scan_result)
+        if tls_ports:
+            self._print_status(f"{ip_address} Collecting TLS certificates on {len(tls_ports)} ports")
+            certificates = self.protocol_service.inspect_tls_many([(ip_address, port) for port in tls_ports])
+            for (_, port), certificate in certificates.items():
+                tls_ports[port].certificate = certificate
+    
+    def _detect_banners(self, ip_address: str, scan_options: ScanOptions, scan_result: AddressData) -> None:
+        """SSH and banner detection, from the greeting grabbed by the port scan where there is one."""
         for port_info in scan_result.open_ports:
-            self._print_status(f"{ip_address}:{port_info.number} Service detection started")
-            service_name = port_info.service.lower() if port_info.service else "unknown"
-        
-            # Step 8.1: HTTP detection
-            if scan_options.detect_http and (port_info.number in HTTP_PORTS or HTTP_SERVICE_NAME in service_name):
-                self._print_status(f"{ip_address}:{port_info.number} Checking HTTP service")
-                result = self.protocol_service.detect_http(ip_address, port_info.number)
-                if result:
-                    scan_result.services_info[port_info.number] = result
-
-            # Step 8.2: SSH detection
-            if scan_options.detect_ssh and (port_info.number == SSH_PORT or SSH_SERVICE_NAME in service_name):
+            service_name = self.services.name(port_info.number, port_info.protocol)
+            service_kind = self.services.kind(port_info.number, port_info.protocol)
+            
+            if scan_options.detect_ssh and service_kind == SERVICE_KIND_SSH:
                 self._print_status(f"{ip_address}:{port_info.number} Checking SSH service")
-                result = self.protocol_service.detect_ssh(ip_address, port_info.number)
+                result = self.protocol_service.detect_ssh(ip_address, port_info.number, port_info.banner)
                 if result:
                     scan_result.services_info[port_info.number] = result
-
-            # Step 8.3: Generic banner detection
-            if scan_options.detect_banners and service_name in BANNER_SERVICE_NAMES:
+            
+            if scan_options.detect_banners and service_kind == SERVICE_KIND_BANNER:
                 self._print_status(f"{ip_address}:{port_info.number} Checking banner")
-                result = self.protocol_service.detect_banner(ip_address, port_info.number, service_name)
+                result = self.protocol_service.detect_banner(ip_address, port_info.number, service_name, port_info.banner)
                 if result:
                     scan_result.services_info[port_info.number] = result
-
-        # Step 9: Device discovery
-        if scan_options.discover_netbios:
-            self._print_status(f"{ip_address} Discovering NetBIOS devices")
-            discovery_info = self.discovery_service.discover_netbios(ip_address)
+    
+    def _discover(self, ip_address: str, protocol: str) -> DiscoveryInfo | None:
+        self._print_status(f"{ip_address} Discovering {protocol} devices")
+        discover: Callable[[str], DiscoveryInfo | None] = getattr(self.discovery_service, f"discover_{protocol}")
+        return discover(ip_address)
+    
+    def _add_discoveries(self, scan_result: AddressData, discoveries: dict[str, DiscoveryInfo | None]) -> None:
+        """Record the discoveries in protocol order, whichever answered first."""
+        for protocol in (NETBIOS_PROTOCOL_NAME, UPNP_PROTOCOL_NAME, MDNS_PROTOCOL_NAME):
+            discovery_info = discoveries.get(protocol)
             if discovery_info:
                 scan_result.discovered_info.append(discovery_info)
+    
+    def _has_fingerprint(self, ip_address: str, scan_options: ScanOptions) -> bool:
+        """Whether the host's deep probes may be skipped after a successful verification."""
+        if not scan_options.port_scan or not config.incremental_full_scans:
+            return False
+        with self.fingerprint_lock:
+            fingerprint = self.fingerprints.get(ip_address)
+        return fingerprint is not None and fingerprint.scan_options == scan_options and fingerprint.verified_scans < config.deep_scan_every
+    
+    def _verify_host(self, ip_address: str, scan_options: ScanOptions, scan_result: AddressData) -> None:
+        """Carry the last deep scan over when the host still matches its fingerprint.
         
-        # Step 10: UPnP discovery
-        if scan_options.discover_upnp:
-            self._print_status(f"{ip_address} Discovering UPnP devices")
-            discovery_info = self.discovery_service.discover_upnp(ip_address)
-            if discovery_info:
-                scan_result.discovered_info.append(discovery_info)
+        MAC, TTL and hostname must be unchanged and every known open TCP port must
+        still accept a connection; the host's deep probes are then skipped.
+        """
+        with self.fingerprint_lock:
+            fingerprint = self.fingerprints.get(ip_address)
+        if fingerprint is None:
+            return
+        if (scan_result.mac_address, scan_result.ttl, scan_result.hostname) != (fingerprint.mac_address, fingerprint.ttl, fingerprint.hostname):
+            return
         
-        # Step 11: mDNS discovery
-        if scan_options.discover_mdns:
-            self._print_status(f"{ip_address} Discovering mDNS devices")
-            discovery_info = self.discovery_service.discover_mdns(ip_address)
-            if discovery_info:
-                scan_result.discovered_info.append(discovery_info)
-                        
-        return scan_result
+        previous = fingerprint.result
+        tcp_ports = [port_info.number for port_info in previous.open_ports if port_info.protocol == TCP_PROTOCOL]
+        open_ports = [port_info for port_info in previous.open_ports if port_info.protocol != TCP_PROTOCOL]
+        if tcp_ports:
+            self._print_status(f"{ip_address} Verifying {len(tcp_ports)} known open ports")
+            open_ports += [port_info for port_info in self.port_service.scan_tcp_hosts({ip_address: tcp_ports})[ip_address] if port_info.state == PORT_STATE_OPEN]
+        if self._ports_hash(open_ports) != fingerprint.ports_hash:
+            return
+        
+        scan_result.open_ports = list(previous.open_ports)
+        scan_result.services_info = dict(previous.services_info)
+        scan_result.discovered_info = list(previous.discovered_info)
+        with self.fingerprint_lock:
+            fingerprint.verified_scans += 1
+            self.verified.add(ip_address)
+    
+    def _is_verified(self, ip_address: str) -> bool:
+        with self.fingerprint_lock:
+            return ip_address in self.verified
+    
+    def _remember_host(self, scan_options: ScanOptions, scan_result: AddressData) -> None:
+        """Keep the fingerprint of a deep-scanned host for the next full scan."""
+        if not scan_options.port_scan or not config.incremental_full_scans:
+            return
+        
+        with self.fingerprint_lock:
+            if scan_result.ip_address in self.verified:
+                self.verified.discard(scan_result.ip_address)
+                self.hosts_verified += 1
+                return
+            
+            self.hosts_deep_scanned += 1
+            self.fingerprints[scan_result.ip_address] = HostFingerprint(
+                mac_address=scan_result.mac_address,
+                ttl=scan_result.ttl,
+                hostname=scan_result.hostname,
+                ports_hash=self._ports_hash(scan_result.open_ports),
+                scan_options=scan_options,
+                result=scan_result,
+            )
+    
+    def _ports_hash(self, open_ports: list[PortInfo]) -> int:
+        return hash(frozenset((port_info.number, port_info.protocol) for port_info in open_ports))
+    
+    def _web_ports(self, scan_result: AddressData) -> list[int]:
+        return [port_info.number for port_info in scan_result.open_ports if self.services.kind(port_info.number, port_info.protocol) == SERVICE_KIND_HTTP]
+    
+    def _tls_ports(self, scan_result: AddressData) -> dict[int, PortInfo]:
+        return {port_info.number: port_info for port_info in scan_result.open_ports if self.services.tls_capable(port_info.number, port_info.protocol)}
+    
+    def _sweep_arp(self, ip_range: list[str], scan_options: ScanOptions) -> list[AddressData] | None:
+        """Answer MAC-only scans with one ARP sweep and no ICMP at all.
+        
+        Returns None when the options need more than MAC resolution or the sweep
+        could not be sent, in which case the regular per-host scan runs.
+        """
+        if not scan_options.is_mac_only():
+            return None
+        
+        self._refresh_neighbors(scan_options)
+        self._print_status(f"ARP sweeping {len(ip_range)} addresses")
+        arp_results = self.mac_service.sweep_arp(ip_range)
+        if arp_results is None:
+            return None
+        
+        # An ARP reply is a sign of life even from hosts that drop ICMP
+        self.suppression_service.revive(list(arp_results))
+        return [
+            AddressData(ip_address=ip, mac_address=mac_address, arp_time_ms=arp_time_ms)
+            for ip, (mac_address, arp_time_ms) in arp_results.items()
+        ]
+    
+    def _skip_suppressed(self, ip_range: list[str]) -> list[str]:
+        """Leave out the unresponsive addresses that are not due for their next probe."""
+        due = self.suppression_service.filter_due(ip_range)
+        if len(due) < len(ip_range):
+            self._print_status(f"Skipping {len(ip_range) - len(due)} unresponsive addresses until their next probe")
+        return due
+    
+    def _refresh_neighbors(self, scan_options: ScanOptions) -> None:
+        """Snapshot the kernel neighbor cache once liveness checks have filled it; a usable entry is a sign of life."""
+        if not scan_options.mac_resolution:
+            return
+        
+        self.mac_service.refresh_neighbor_table()
+        self.suppression_service.revive(self.mac_service.get_neighbor_addresses())
+    
+    def _sweep_ping(self, ip_range: list[str]) -> dict[str, tuple[int, str | PingReply]] | None:
+        """Check liveness of the whole range from one ICMP socket.
+        
+        Suppressed addresses get a single echo request. Returns ping results for
+        live addresses only, or None when sweeping is disabled or unavailable and
+        every address must be pinged individually.
+        """
+        if not config.icmp_sweep:
+            return None
+        
+        self._print_status(f"Sweeping {len(ip_range)} addresses")
+        replies = self.ping_service.sweep(ip_range, once={ip for ip in ip_range if self.suppression_service.is_suppressed(ip)})
+        if replies is None:
+            return None
+        
+        for ip in ip_range:
+            if ip not in replies:
+                self.suppression_service.record(ip, alive=False)
+        return {ip: (int(round(reply.rtt_ms)), reply) for ip, reply in replies.items()}
     
     def _print_status(self, message: str) -> None:
         if len(message) > MAX_MESSAGE_LENGTH:
@@ -1,8 +1,13 @@
+import math
+import queue
 import threading
+import time
 from datetime import datetime
 
 from app import config
+from app.common.objects import AddressData, SchedulerStats
 from app.common.objects.scan_options import ScanOptions
+from app.common.utilities import HostScheduler, read_neighbor_table
 from app.services.interfaces import (ScanningServiceInterface,
                                      ScanServiceInterface)
 
@@ -19,12 +24,14 @@ class ScanningService(ScanningServiceInterface):
         
         self.last_scan_time: datetime | None = None
         self.scan_error: str | None = None
-        self.last_scan_results = []
+        self.last_scan_count = 0
         
         self.scan_check_interval = config.scan_check_interval_s
         self.basic_scan_interval = config.background_scan_interval_s
         self.full_scan_interval = config.background_full_scan_interval_s
         
+        self.scheduler: HostScheduler | None = None
+        self.neighbors: dict[str, str] = {}
         
     def start_continuous_scan(self):
         self.stop_event.clear()
@@ -38,9 +45,16 @@ class ScanningService(ScanningServiceInterface):
     
     def get_last_scan_time(self) -> datetime | None:
         return self.last_scan_time
+    
+    def get_scheduler_stats(self) -> SchedulerStats | None:
+        return self.scheduler.stats(time.monotonic()) if self.scheduler is not None else None
         
     def _scan_loop(self):
         """Main scanning loop that runs in background thread."""        
+        if config.adaptive_scheduling:
+            self._scheduled_scan_loop()
+            return
+        
         self._perform_scan(full_scan=True)
         
         last_full_scan = datetime.now()
@@ -63,34 +77,121 @@ class ScanningService(ScanningServiceInterface):
                     self._perform_scan(full_scan=False)
                     last_basic_scan = datetime.now()
             
-    def _perform_scan(self, full_scan: bool = False):
-        """Perform the actual scan logic."""
-        self.is_scanning = True
+    def _scheduled_scan_loop(self) -> None:
+        """Scanning loop that checks every host when its own interval is due.
         
-        try:
-            if full_scan:
-                scan_options = ScanOptions.full_scan()
-                save_func = self.scan_service.save_full_scan
-            else:
-                scan_options = ScanOptions.mac_only()
-                save_func = self.scan_service.save_mac_scan                
+        Full scans still cover the whole range every full_scan_interval. In between,
+        only the hosts the scheduler reports due get a basic check, so stable hosts
+        and empty addresses are checked less and less often while changing ones are
+        watched closely. Addresses that show up or change in the neighbor table are
+        checked right away.
+        """
+        ip_range = self.scan_service.get_scan_range()
+        scheduler = self.scheduler = HostScheduler(
+            ip_range,
+            base_interval_s=self.basic_scan_interval,
+            min_interval_s=config.host_min_interval_s,
+            max_interval_s=config.host_max_interval_s,
+            dead_max_interval_s=config.dead_host_max_interval_s,
+            now=time.monotonic(),
+        )
+        self._check_hosts(scheduler, ip_range, full_scan=True)
+        last_full_scan = time.monotonic()
+        
+        while not self.stop_event.is_set():
+            next_due = min(scheduler.next_due() or math.inf, last_full_scan + self.full_scan_interval)
+            # Wake at least every scan_check_interval to watch the neighbor table
+            if self.stop_event.wait(timeout=min(self.scan_check_interval, max(0.0, next_due - time.monotonic()))):
+                break
             
-            scanned_devices = self.scan_service.scan_network(scan_options)
+            now = time.monotonic()
+            if now - last_full_scan >= self.full_scan_interval:
+                self._check_hosts(scheduler, ip_range, full_scan=True)
+                last_full_scan = time.monotonic()
+                continue
             
-            if scanned_devices:
-                for device in scanned_devices:
-                    if device.mac_address:
-                        save_func(device)
-                            
-                self.last_scan_results = scanned_devices             
+            for ip_address, mac_address in self._read_neighbors().items():
+                if self.neighbors.get(ip_address) != mac_address:
+                    scheduler.pull_forward(ip_address, now)
+            due = scheduler.pop_due(now)
+            if due:
+                self._check_hosts(scheduler, due, full_scan=False)
+    
+    def _check_hosts(self, scheduler: HostScheduler, ip_addresses: list[str], full_scan: bool) -> None:
+        """Scan the hosts and schedule the next check of each from what the scan found."""
+        found = self._perform_scan(full_scan, ip_addresses)
+        now = time.monotonic()
+        for ip_address in ip_addresses:
+            if found is None:
+                scheduler.postpone(ip_address, now)
             else:
-                self.last_scan_results = []
+                scheduler.record(ip_address, found.get(ip_address), now)
+        
+        # Entries our own probes just refreshed are not news
+        self.neighbors = self._read_neighbors()
+    
+    def _read_neighbors(self) -> dict[str, str]:
+        return {entry.ip_address: entry.mac_address for entry in read_neighbor_table()}
+    
+    def _perform_scan(self, full_scan: bool = False, ip_addresses: list[str] | None = None) -> dict[str, str] | None:
+        """Perform the actual scan logic.
+        
+        Returns the MAC address (empty when unknown) of every host found, or None
+        when the scan failed.
+        """
+        self.is_scanning = True
+        found: dict[str, str] = {}
+        
+        results: queue.Queue[AddressData | None] = queue.Queue(maxsize=config.scan_result_queue_size)
+        saver = threading.Thread(target=self._save_results, args=(results, full_scan), daemon=True)
+        saver.start()
+        
+        try:
+            scan_options = ScanOptions.full_scan() if full_scan else ScanOptions.mac_only()
+            
+            scanned_count = 0
+            for device in self.scan_service.scan_network_stream(scan_options, ip_addresses):
+                results.put(device)
+                found[device.ip_address] = device.mac_address or ""
+                scanned_count += 1
                 
+            self.last_scan_count = scanned_count
             self.last_scan_time = datetime.now()
             
         except Exception as e:
             print(f"Scan error during {'full' if full_scan else 'basic'} scan: {e}")
+            return None
         finally:
+            results.put(None)
+            saver.join()
             self.is_scanning = False
+        return found
+    
+    def _save_results(self, results: "queue.Queue[AddressData | None]", full_scan: bool) -> None:
+        """Persist scanned hosts while the scan is still running.
+        
+        Whatever has queued up since the last save is written in one transaction
+        (up to scan_save_batch_size hosts), so a slow database makes the bounded
+        queue fill up and pauses the scan instead of buffering the whole range.
+        """
+        done = False
+        while not done:
+            devices: list[AddressData] = []
+            item = results.get()
+            while item is not None:
+                devices.append(item)
+                if len(devices) >= config.scan_save_batch_size:
+                    break
+                try:
+                    item = results.get_nowait()
+                except queue.Empty:
+                    break
+            done = item is None
+            
+            if devices:
+                try:
+                    self.scan_service.save_scan_results(devices, full_scan)
+                except Exception as e:
+                    print(f"Save error during {'full' if full_scan else 'basic'} scan: {e}")
     
  
\ No newline at end of file
@@ -0,0 +1,107 @@
+import threading
+from datetime import datetime, timedelta
+
+from app import config
+from app.common.constants import *
+from app.database.interfaces import DatabaseInterface
+from app.database.models import UnresponsiveAddress
+from app.services.interfaces import SuppressionServiceInterface
+
+
+class SuppressionService(SuppressionServiceInterface):
+    """Service keeping scans from paying the full liveness check for dead addresses.
+
+    An address that missed dead_address_misses checks in a row is suppressed:
+    scans leave it out until its next probe is due and then send it a single echo
+    request instead of ping_count requests with retries. Each further miss doubles
+    the wait, from dead_address_min_interval_s up to dead_address_max_interval_s.
+    An answer or a passive sign of life clears the address at once. The table is
+    loaded from the database on first use and save() writes the changes back.
+    """
+
+    def __init__(self, database: DatabaseInterface) -> None:
+        self.database = database
+        self._lock = threading.Lock()
+        self._addresses: dict[str, tuple[int, datetime | None]] | None = None
+        self._changed: set[str] = set()
+
+    def filter_due(self, ip_addresses: list[str]) -> list[str]:
+        if not config.dead_address_suppression:
+            return ip_addresses
+
+        now = datetime.now()
+        with self._lock:
+            addresses = self._load()
+            return [ip for ip in ip_addresses if not self._waiting(addresses.get(ip), now)]
+
+    def is_suppressed(self, ip_address: str) -> bool:
+        if not config.dead_address_suppression:
+            return False
+
+        with self._lock:
+            misses, _ = self._load().get(ip_address, (0, None))
+        return misses >= config.dead_address_misses
+
+    def record(self, ip_address: str, alive: bool) -> None:
+        if not config.dead_address_suppression:
+            return
+
+        with self._lock:
+            addresses = self._load()
+            if alive:
+                if addresses.pop(ip_address, None) is not None:
+                    self._changed.add(ip_address)
+                return
+
+            misses = addresses.get(ip_address, (0, None))[0] + 1
+            next_probe_at = None
+            if misses >= config.dead_address_misses:
+                doublings = min(misses - config.dead_address_misses, SUPPRESSION_MAX_DOUBLINGS)
+                interval_s = min(config.dead_address_min_interval_s * SUPPRESSION_BACKOFF ** doublings, config.dead_address_max_interval_s)
+                next_probe_at = datetime.now() + timedelta(seconds=interval_s)
+            addresses[ip_address] = (misses, next_probe_at)
+            self._changed.add(ip_address)
+
+    def revive(self, ip_addresses: list[str]) -> None:
+        for ip_address in ip_addresses:
+            self.record(ip_address, alive=True)
+
+    def get_suppressed_count(self) -> int:
+        with self._lock:
+            return sum(1 for misses, _ in self._load().values() if misses >= config.dead_address_misses)
+
+    def save(self) -> None:
+        """Write the addresses changed since the last save in one transaction."""
+        with self._lock:
+            if not self._changed:
+                return
+            changed, self._changed = self._changed, set()
+            known = self._load()
+            addresses = {ip: known[ip] for ip in changed if ip in known}
+
+        with self.database.batch() as batch:
+            rows = {row.ip_address: row for row in batch.select_in(UnresponsiveAddress, UnresponsiveAddress.ip_address, list(changed))}
+            batch.hard_delete_in(UnresponsiveAddress, UnresponsiveAddress.ip_address, [ip for ip in changed if ip not in addresses])
+            for ip_address, (misses, next_probe_at) in addresses.items():
+                row = rows.get(ip_address)
+                if row is None:
+                    batch.create(UnresponsiveAddress(ip_address=ip_address, misses=misses, next_probe_at=next_probe_at))
+                else:
+                    row.misses, row.next_probe_at = misses, next_probe_at
+                    batch.update(row)
+
+    def _load(self) -> dict[str, tuple[int, datetime | None]]:
+        """The address table, read from the database the first time it is needed."""
+        if self._addresses is None:
+            self._addresses = {
+                row.ip_address: (row.misses, row.next_probe_at)
+                for row in self.database.select(UnresponsiveAddress).all()
+            }
+        return self._addresses
+
+    def _waiting(self, address: tuple[int, datetime | None] | None, now: datetime) -> bool:
+        """Whether a suppressed address is still waiting for its next probe."""
+        if address is None:
+            return False
+        misses, next_probe_at = address
+        return misses >= config.dead_address_misses and next_probe_at is not None and next_probe_at > now
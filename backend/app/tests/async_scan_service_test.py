@@ -0,0 +1,128 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from pytest import MonkeyPatch
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import app.services.async_scan_service as async_scan_module
+import app.services.scan_service as scan_module
+from app.common.objects import DiscoveryInfo, PingReply, PortInfo, ScanOptions, ServiceInfo
+from app.common.utilities import ResourceBudget
+from app.database import Database
+from app.services import AsyncScanService, MacService, SuppressionService
+
+
+class InFlight:
+    def __init__(self) -> None:
+        self.current = 0
+        self.peak = 0
+        self.peak_tasks = 0
+
+    async def probe(self) -> None:
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        self.peak_tasks = max(self.peak_tasks, len(asyncio.all_tasks()))
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.current -= 1
+
+
+def make_service(in_flight: InFlight, live_ips: set[str], max_probes: int = 8) -> AsyncScanService:
+    class FakePing:
+        async def ping_async(self, ip_address: str, once: bool = False) -> tuple[int, str] | None:
+            await in_flight.probe()
+            return (1, "ttl=64") if ip_address in live_ips else None
+
+        def sweep(self, ip_addresses: list[str], once: set[str] | None = None) -> dict[str, PingReply] | None:
+            return None
+
+        async def get_hostname_async(self, ip_address: str) -> str | None:
+            return f"host-{ip_address}"
+
+        def get_ttl_from_ping(self, ping_result: str) -> int | None:
+            return 64
+
+        def get_rtts_from_ping(self, ping_result: str) -> list[float]:
+            return [0.5]
+
+        def get_os_from_ttl(self, ttl: int) -> str:
+            return "Linux/Unix/macOS"
+
+    class FakePort:
+        async def scan_ports_async(self, ip_address: str, ports: list[int], udp_ports: list[int]) -> list[PortInfo]:
+            return [PortInfo(number=22, service="ssh")]
+
+    class FakeProtocol:
+        async def detect_ssh_async(self, ip: str, port: int, banner: str | None = None) -> ServiceInfo | None:
+            return ServiceInfo(service_name="ssh", version="SSH-2.0-Test")
+
+    class FakeDiscovery:
+        async def discover_netbios_async(self, ip_address: str) -> DiscoveryInfo | None:
+            return DiscoveryInfo(protocol="netbios", device_name="NAS")
+
+    database = Database("sqlite:///:memory:")
+    budget = ResourceBudget(max_sockets=64, max_subprocesses=8, max_probes=max_probes)
+    return AsyncScanService(database, FakePing(), MacService(database, budget), FakePort(), FakeDiscovery(), FakeProtocol(), SuppressionService(database), budget)  # type: ignore[arg-type]
+
+
+def test_scan_ip_collects_probe_results():
+    service = make_service(InFlight(), {"192.0.2.5"})
+    options = ScanOptions(ttl_resolution=True, hostname_resolution=True, os_detection=True, port_scan=True, detect_ssh=True, discover_netbios=True)
+
+    result = service.scan_ip("192.0.2.5", options)
+
+    assert result is not None
+    assert result.ttl == 64
+    assert result.hostname == "host-192.0.2.5"
+    assert result.services_info[22].version == "SSH-2.0-Test"
+    assert result.discovered_info[0].device_name == "NAS"
+    assert service.scan_ip("192.0.2.6", options) is None
+
+
+def test_scan_network_respects_probe_limit(monkeypatch: MonkeyPatch):
+    scan_config = SimpleNamespace(subnet="192.0.2", min_scan_ip=1, max_scan_ip=40, icmp_sweep=False, discovery_sweeps=False, scan_result_queue_size=1)
+    monkeypatch.setattr(async_scan_module, "config", scan_config, raising=False)
+    monkeypatch.setattr(scan_module, "config", scan_config, raising=False)
+    in_flight = InFlight()
+    service = make_service(in_flight, {"192.0.2.1", "192.0.2.40"}, max_probes=4)
+
+    devices = service.scan_network(ScanOptions())
+
+    assert sorted(device.ip_address for device in devices) == ["192.0.2.1", "192.0.2.40"]
+    assert in_flight.peak == 4
+    # The scan loop's main task plus one worker per probe slot, not a task per address
+    assert in_flight.peak_tasks == 5
+
+
+def test_scan_network_stream_yields_hosts_as_they_complete(monkeypatch: MonkeyPatch):
+    scan_config = SimpleNamespace(subnet="192.0.2", min_scan_ip=1, max_scan_ip=10, icmp_sweep=False, discovery_sweeps=False, scan_result_queue_size=1)
+    monkeypatch.setattr(async_scan_module, "config", scan_config, raising=False)
+    monkeypatch.setattr(scan_module, "config", scan_config, raising=False)
+    service = make_service(InFlight(), {"192.0.2.2", "192.0.2.5", "192.0.2.9"})
+
+    stream = service.scan_network_stream(ScanOptions())
+    first = next(stream)
+
+    assert first.ip_address in {"192.0.2.2", "192.0.2.5", "192.0.2.9"}
+    assert sorted([first.ip_address] + [device.ip_address for device in stream]) == ["192.0.2.2", "192.0.2.5", "192.0.2.9"]
+
+
+def test_scan_network_stream_stops_producer_when_consumer_stops(monkeypatch: MonkeyPatch):
+    scan_config = SimpleNamespace(subnet="192.0.2", min_scan_ip=1, max_scan_ip=200, icmp_sweep=False, discovery_sweeps=False, scan_result_queue_size=1)
+    monkeypatch.setattr(async_scan_module, "config", scan_config, raising=False)
+    monkeypatch.setattr(scan_module, "config", scan_config, raising=False)
+    in_flight = InFlight()
+    service = make_service(in_flight, {f"192.0.2.{i}" for i in range(1, 201)}, max_probes=2)
+
+    stream = service.scan_network_stream(ScanOptions())
+    next(stream)
+    stream.close()
+
+    assert not any(thread.name == async_scan_module.ASYNC_PRODUCER_THREAD_NAME for thread in threading.enumerate())
+    assert in_flight.current == 0
@@ -0,0 +1,44 @@
+import shutil
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from app.common.objects import AddressData
+from app.database import Database
+from app.database.migrations import SCHEMA_VERSION
+from app.database.models import Port
+from app.services import MacService
+
+TLS_COLUMNS = {"tls_subject", "tls_issuer", "tls_san", "tls_not_after", "tls_sha256"}
+
+
+def _port_columns(path: Path) -> set[str]:
+    with sqlite3.connect(path) as connection:
+        return {row[1] for row in connection.execute("PRAGMA table_info(port)")}
+
+
+def test_migrate_upgrades_a_baseline_database_file(tmp_path):
+    # The example database was created by the first released schema
+    path = tmp_path / "network_monitor.db"
+    shutil.copy(ROOT / "network_monitor.db.example", path)
+    assert not TLS_COLUMNS & _port_columns(path)
+
+    database = Database(f"sqlite:///{path}")
+    assert database.migrate() == SCHEMA_VERSION
+    assert TLS_COLUMNS <= _port_columns(path)
+    assert database.migrate() == 0
+
+    mac = MacService(database).save_mac(AddressData(ip_address="192.0.2.1", mac_address="aa:bb:cc:dd:ee:01"))
+    database.create(Port(number=443, mac_id=mac.id, tls_subject="CN=router", tls_not_after=datetime(2030, 1, 1)))
+    assert [port.tls_subject for port in database.select(Port).where(Port.mac_id == mac.id).all()] == ["CN=router"]
+
+
+def test_new_databases_need_no_migrations(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'new.db'}")
+
+    assert database.migrate() == 0
+    assert TLS_COLUMNS <= _port_columns(tmp_path / "new.db")
@@ -1,5 +1,12 @@
+import asyncio
+import socket
+import struct
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
+from types import SimpleNamespace
 
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT))
@@ -7,7 +14,10 @@ sys.path.insert(0, str(ROOT))
 from app.common.objects import AddressData, DiscoveryInfo
 from app.database import Database
 from app.database.models import Discovery
+from app.common.utilities import ProbeTimeouts, parse_dns_message
+from app.common.utilities import probe_timeouts as timeouts_module
 from app.services import DiscoveryService, MacService
+from app.services import discovery_service as discovery_module
 
 
 def test_save_discoveries_persists():
@@ -23,3 +33,189 @@ def test_save_discoveries_persists():
     found = database.select(Discovery).where(Discovery.mac_id == mac.id).all()
     assert len(found) == 1
     assert found[0].device_name == "DeviceA"
+
+
+def test_discovery_timeout_adapts_to_host_rtt(monkeypatch):
+    monkeypatch.setattr(discovery_module, "config", SimpleNamespace(discovery_timeout_ms=3000), raising=False)
+    monkeypatch.setattr(timeouts_module, "config", SimpleNamespace(adaptive_timeouts=True, rtt_variance_factor=4.0, min_probe_timeout_ms=20, min_service_timeout_ms=50), raising=False)
+    timeouts = ProbeTimeouts()
+    timeouts.observe("127.0.0.1", [0.3, 0.4, 0.2])
+    service = DiscoveryService(Database("sqlite:///:memory:"), timeouts=timeouts)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as silent:
+        silent.bind(("127.0.0.1", 0))
+        started = time.perf_counter()
+        response = asyncio.run(service._request_async("127.0.0.1", silent.getsockname()[1], b"query"))
+        elapsed = time.perf_counter() - started
+
+    stats = timeouts.get_stats()
+    assert response is None
+    assert elapsed < 1
+    assert (stats.adaptive, stats.expired) == (1, 1)
+    assert round(stats.saved_ms) == 2950
+
+
+def _dns_name(name: str) -> bytes:
+    return b"".join(bytes([len(label)]) + label.encode() for label in name.split(".")) + b"\x00"
+
+
+def _dns_message(records: list[tuple[str | bytes, int, bytes]]) -> bytes:
+    """Build a response whose record names are plain names or raw (compressed) name bytes."""
+    packet = struct.pack(">HHHHHH", 0, 0x8400, 0, len(records), 0, 0)
+    for name, record_type, rdata in records:
+        packet += (_dns_name(name) if isinstance(name, str) else name) + struct.pack(">HHIH", record_type, 1, 120, len(rdata)) + rdata
+    return packet
+
+
+def _printer_response() -> bytes:
+    # Offset 12 holds "_ipp._tcp.local", offset 22 "local" and offset 39 the instance name
+    return _dns_message([
+        ("_ipp._tcp.local", 12, b"\x0aOffice Jet\xc0\x0c"),
+        (b"\xc0\x27", 33, struct.pack(">HHH", 0, 0, 631) + b"\x08printer1\xc0\x16"),
+        (b"\xc0\x27", 16, b"\x09txtvers=1\x0dty=LaserJet 4\x0fusb_MFG=Acme Co"),
+        ("printer1.local", 1, bytes([192, 0, 2, 20])),
+    ])
+
+
+def test_parse_dns_message_follows_compression_pointers():
+    records = parse_dns_message(_printer_response())
+
+    assert records is not None
+    assert [(record.name, record.record_type, record.value) for record in records] == [
+        ("_ipp._tcp.local", 12, "Office Jet._ipp._tcp.local"),
+        ("Office Jet._ipp._tcp.local", 33, "printer1.local"),
+        ("Office Jet._ipp._tcp.local", 16, None),
+        ("printer1.local", 1, "192.0.2.20"),
+    ]
+    assert records[1].port == 631
+    assert records[2].attributes == {"txtvers": "1", "ty": "LaserJet 4", "usb_mfg": "Acme Co"}
+    assert parse_dns_message(_printer_response()[:-3]) is None
+    assert parse_dns_message(struct.pack(">HHHHHH", 0, 0x8400, 0, 1, 0, 0) + b"\xc0\x0c") is None
+
+
+def test_mdns_info_uses_instance_name_and_txt_model():
+    service = DiscoveryService(Database("sqlite:///:memory:"))
+
+    info = service._mdns_info(_printer_response(), "192.0.2.20")
+
+    assert info is not None
+    assert (info.device_name, info.model, info.manufacturer) == ("Office Jet", "LaserJet 4", "Acme Co")
+    assert info.services == ["_ipp._tcp"]
+
+    # Instance names may contain dots; only the service type is cut off
+    dotted = service._mdns_info(_dns_message([("_airplay._tcp.local", 12, b"\x11Living Room TV.v2\xc0\x0c")]), "192.0.2.21")
+    assert dotted is not None and dotted.device_name == "Living Room TV.v2"
+
+
+def test_sweep_mdns_answers_host_lookups(monkeypatch):
+    monkeypatch.setattr(discovery_module, "config", SimpleNamespace(mdns_listen_window_ms=10, discovery_sweep_max_age_s=300, discovery_timeout_ms=3000), raising=False)
+    queries: list[tuple[str, int]] = []
+
+    def fake_multicast_query(group: str, port: int, payload: bytes, window_s: float) -> list[tuple[str, bytes]]:
+        queries.append((group, port))
+        answer = _dns_message([("_services._dns-sd._udp.local", 12, _dns_name("_http._tcp.local"))])
+        return [("192.0.2.7", answer), ("192.0.2.7", answer), ("192.0.2.8", b"\x00" * 12)]
+
+    monkeypatch.setattr(discovery_module, "multicast_query", fake_multicast_query)
+    service = DiscoveryService(Database("sqlite:///:memory:"))
+
+    results = service.sweep_mdns()
+
+    assert queries == [("224.0.0.251", 5353)]
+    assert list(results) == ["192.0.2.7"]
+    info = service.discover_mdns("192.0.2.7")
+    assert info is not None and info.device_name == "mDNS-7"
+    assert info.services == ["_http._tcp"]
+    assert service.discover_mdns("192.0.2.8") is None
+    assert asyncio.run(service.discover_mdns_async("192.0.2.7")) == info
+
+
+def test_sweep_upnp_indexes_responses_and_caches_descriptions(monkeypatch):
+    monkeypatch.setattr(discovery_module, "config", SimpleNamespace(
+        ssdp_mx_s=1, upnp_fetch_descriptions=True, upnp_fetch_workers=4,
+        service_detection_timeout_ms=2000, discovery_sweep_max_age_s=300,
+    ), raising=False)
+    description = (
+        b'<?xml version="1.0"?><root xmlns="urn:schemas-upnp-org:device-1-0"><device>'
+        b'<deviceType>urn:schemas-upnp-org:device:MediaRenderer:1</deviceType>'
+        b'<friendlyName>Living Room TV</friendlyName><manufacturer>Acme</manufacturer>'
+        b'<modelName>TV-42</modelName></device></root>'
+    )
+    requests: list[str | None] = []
+
+    class DescriptionHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            requests.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(description)))
+            self.end_headers()
+            self.wfile.write(description)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), DescriptionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    location = f"http://127.0.0.1:{server.server_address[1]}/desc.xml"
+    reply = (
+        "HTTP/1.1 200 OK\r\nCACHE-CONTROL: max-age=1800\r\nLOCATION: " + location + "\r\n"
+        "SERVER: Linux/5.10 UPnP/1.0 Acme/1.0\r\nST: upnp:rootdevice\r\nUSN: uuid:1234::upnp:rootdevice\r\n\r\n"
+    ).encode()
+    monkeypatch.setattr(discovery_module, "multicast_query", lambda group, port, payload, window_s: [("127.0.0.1", reply), ("192.0.2.9", b"garbage")])
+    service = DiscoveryService(Database("sqlite:///:memory:"))
+
+    try:
+        index = service.sweep_upnp()
+        service.sweep_upnp()
+    finally:
+        server.shutdown()
+
+    assert list(index) == ["127.0.0.1"]
+    assert index["127.0.0.1"].usn == "uuid:1234::upnp:rootdevice"
+    assert index["127.0.0.1"].location == location
+    assert requests == [None, '"v1"']
+    info = service.discover_upnp("127.0.0.1")
+    assert info is not None
+    assert (info.device_name, info.manufacturer, info.model) == ("Living Room TV", "Acme", "TV-42")
+    assert service.discover_upnp("192.0.2.9") is None
+
+
+def test_sweep_netbios_decodes_name_tables_from_one_socket(monkeypatch):
+    monkeypatch.setattr(discovery_module, "config", SimpleNamespace(
+        netbios_sweep_window_ms=1000, discovery_timeout_ms=3000, discovery_sweep_max_age_s=300,
+    ), raising=False)
+    responder = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    responder.bind(("127.0.0.1", 0))
+    monkeypatch.setattr(discovery_module, "NETBIOS_PORT", responder.getsockname()[1])
+
+    def name_entry(name: bytes, suffix: int, flags: int) -> bytes:
+        return name.ljust(15) + bytes([suffix]) + flags.to_bytes(2, "big")
+
+    def respond() -> None:
+        query, source = responder.recvfrom(1024)
+        entries = name_entry(b"WORKGROUP", 0x00, 0x8400) + name_entry(b"FILESERVER", 0x20, 0x0400) + name_entry(b"FILESERVER", 0x00, 0x0400)
+        rdata = bytes([3]) + entries + bytes.fromhex("001122334455") + bytes(40)
+        answer = b"\xc0\x0c" + (0x21).to_bytes(2, "big") + (1).to_bytes(2, "big") + bytes(4) + len(rdata).to_bytes(2, "big") + rdata
+        responder.sendto(query[:2] + b"\x84\x00\x00\x00\x00\x01\x00\x00\x00\x00" + answer, source)
+
+    thread = threading.Thread(target=respond, daemon=True)
+    thread.start()
+    service = DiscoveryService(Database("sqlite:///:memory:"))
+
+    with responder:
+        tables = service.sweep_netbios(["127.0.0.1"])
+        thread.join(timeout=5)
+
+    table = tables["127.0.0.1"]
+    assert [(entry.name, entry.suffix, entry.group) for entry in table.names] == [
+        ("WORKGROUP", 0x00, True), ("FILESERVER", 0x20, False), ("FILESERVER", 0x00, False),
+    ]
+    assert table.mac_address == "00:11:22:33:44:55"
+    info = service.discover_netbios("127.0.0.1")
+    assert info is not None and info.device_name == "FILESERVER"
+    assert service.discover_netbios("192.0.2.9") is None
@@ -1,12 +1,18 @@
+import os
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 
 from pytest import MonkeyPatch
 
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT))
 
-from app.common.objects import AddressData
+from app.common.objects import AddressData, NeighborEntry, NeighborStats
+from app.common.utilities import OuiIndex
+from app.common.utilities import neighbor_table as neighbor_module
+from app.common.utilities import oui_index as oui_module
 from app.database import Database
 from app.database.models import Mac
 from app.services import MacService
@@ -71,15 +77,150 @@ def test_get_by_address():
     assert found.address == mac.address
 
 
-def test_get_vendor_from_mac(monkeypatch: MonkeyPatch) -> None:
+def test_get_vendor_from_mac(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(oui_module, "config", SimpleNamespace(oui_registry_paths="", oui_reload_check_s=0), raising=False)
+    mal = tmp_path / "oui.csv"
+    mal.write_text(
+        "Registry,Assignment,Organization Name,Organization Address\n"
+        'MA-L,001B21,ACME Corp,"1 Main St"\n'
+        "MA-L,70B3D5,IEEE Registration Authority,Piscataway\n"
+    )
+    mas = tmp_path / "oui36.csv"
+    mas.write_text("Registry,Assignment,Organization Name,Organization Address\nMA-S,70B3D5F3A,Tiny Sensors,Somewhere\n")
+    legacy = tmp_path / "mac-vendors.txt"
+    legacy.write_text("F041C8:Old Name\n")
+    service = MacService(Database("sqlite:///:memory:"), vendors=OuiIndex([str(mal), str(mas), str(legacy)]))
+
+    assert service.get_vendor_from_mac("00:1b:21:aa:bb:cc") == "ACME Corp"
+    assert service.get_vendor_from_mac("70-B3-D5-F3-A1-23") == "Tiny Sensors"
+    assert service.get_vendor_from_mac("70:b3:d5:00:00:01") == "IEEE Registration Authority"
+    assert service.get_vendor_from_mac("da:a1:19:00:00:01") == "Locally administered"
+    assert service.get_vendor_from_mac("01:00:5e:00:00:fb") is None
+    assert service.get_vendors_from_macs(["f0:41:c8:00:00:01", "00:00:00:00:00:01"]) == {
+        "f0:41:c8:00:00:01": "Old Name", "00:00:00:00:00:01": None,
+    }
+
+    legacy.write_text("F041C8:New Name Ltd\n")
+    os.utime(legacy, ns=(0, 10**18))
+    assert service.get_vendor_from_mac("f0:41:c8:00:00:01") == "New Name Ltd"
+
+
+def test_sweep_arp_maps_replies_to_targets(monkeypatch: MonkeyPatch) -> None:
+    database = Database("sqlite:///:memory:")
+    service = MacService(database)
+    sent_packets: list[object] = []
+
+    class FakeSent:
+        sent_time = 100.0
+
+    class FakeReply:
+        def __init__(self, ip: str, mac: str) -> None:
+            self.psrc = ip
+            self.hwsrc = mac
+            self.time = 100.004
+
+    def fake_srp(packet: object, **kwargs: object) -> tuple[list[tuple[FakeSent, FakeReply]], list[object]]:
+        sent_packets.append(packet)
+        answered = [
+            (FakeSent(), FakeReply("192.0.2.1", "AA:BB:CC:00:00:01")),
+            (FakeSent(), FakeReply("192.0.2.7", "aa:bb:cc:00:00:07")),
+            (FakeSent(), FakeReply("198.51.100.1", "aa:bb:cc:00:00:99")),
+        ]
+        return answered, []
+
+    monkeypatch.setattr("app.services.mac_service.srp", fake_srp)
+    monkeypatch.setattr(service, "_get_interface", lambda: "eth0")
+
+    results = service.sweep_arp([f"192.0.2.{i}" for i in range(1, 11)])
+
+    assert len(sent_packets) == 1
+    assert results == {"192.0.2.1": ("aa:bb:cc:00:00:01", 4), "192.0.2.7": ("aa:bb:cc:00:00:07", 4)}
+
+
+def test_interface_resolved_once_until_routes_change(monkeypatch: MonkeyPatch) -> None:
     database = Database("sqlite:///:memory:")
     service = MacService(database)
+    header = "Iface\tDestination\tGateway\tFlags\tRefCnt\tUse\tMetric\tMask\tMTU\tWindow\tIRTT\n"
+    route_tables = [
+        header + "eth0\t00000000\t0100A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+                 "eth1\t0000A8C0\t00000000\t0001\t0\t0\t0\t00FFFFFF\t0\t0\t0\n"
+    ]
+    resolutions: list[str | None] = []
+
+    def fake_resolve(route_table: str | None) -> str | None:
+        resolutions.append(route_table)
+        return MacService._resolve_interface(service, route_table)  # type: ignore[reportPrivateUsage]
+
+    monkeypatch.setattr("app.services.mac_service.read_route_table", lambda: route_tables[-1])
+    monkeypatch.setattr(service, "_resolve_interface", fake_resolve)
+
+    assert service._get_interface() == "eth1"  # type: ignore[reportPrivateUsage]
+    assert service._get_interface() == "eth1"  # type: ignore[reportPrivateUsage]
+    assert len(resolutions) == 1
+
+    route_tables.append(header + "wlan0\t0000A8C0\t00000000\t0001\t0\t0\t0\t00FFFFFF\t0\t0\t0\n")
+    assert service._get_interface() == "wlan0"  # type: ignore[reportPrivateUsage]
+    assert len(resolutions) == 2
+
+
+def test_neighbor_table_answers_lookups_before_arp(monkeypatch: MonkeyPatch) -> None:
+    database = Database("sqlite:///:memory:")
+    service = MacService(database)
+    neighbors = [
+        NeighborEntry(ip_address="192.0.2.1", mac_address="aa:bb:cc:00:00:01", state="REACHABLE", age_s=5),
+        NeighborEntry(ip_address="192.0.2.2", mac_address="aa:bb:cc:00:00:02", state="STALE", age_s=3600),
+        NeighborEntry(ip_address="192.0.2.3", mac_address="aa:bb:cc:00:00:03", state="FAILED", age_s=1),
+        NeighborEntry(ip_address="192.0.2.4", mac_address="aa:bb:cc:00:00:04", state="STALE"),
+    ]
+    arp_targets: list[list[str]] = []
+
+    def fake_srp(packet: Any, **kwargs: Any) -> tuple[list[Any], list[Any]]:
+        arp_targets.append(list(packet[1].pdst))
+        return [], []
+
+    monkeypatch.setattr("app.services.mac_service.read_neighbor_table", lambda: neighbors)
+    monkeypatch.setattr("app.services.mac_service.srp", fake_srp)
+    monkeypatch.setattr(service, "_get_interface", lambda: None)
+
+    service.refresh_neighbor_table()
+    results = service.sweep_arp(["192.0.2.1", "192.0.2.2", "192.0.2.3", "192.0.2.4"])
+
+    assert results == {"192.0.2.1": ("aa:bb:cc:00:00:01", None), "192.0.2.4": ("aa:bb:cc:00:00:04", None)}
+    assert arp_targets == [["192.0.2.2", "192.0.2.3"]]
+    assert service.get_neighbor_stats() == NeighborStats(entries=2, hits=2, misses=2)
+
+
+def test_neighbor_table_falls_back_to_proc_arp(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    proc_arp = tmp_path / "arp"
+    proc_arp.write_text(
+        "IP address       HW type     Flags       HW address            Mask     Device\n"
+        "192.0.2.7        0x1         0x2         AA:BB:CC:00:00:07     *        eth0\n"
+        "192.0.2.8        0x1         0x0         00:00:00:00:00:00     *        eth0\n"
+    )
+    read_proc_arp = neighbor_module._read_proc_arp  # type: ignore[reportPrivateUsage]
+    monkeypatch.setattr(neighbor_module, "_read_ip_neigh", lambda: None)
+    monkeypatch.setattr(neighbor_module, "_read_proc_arp", lambda: read_proc_arp(str(proc_arp)))
+    service = MacService(Database("sqlite:///:memory:"))
+
+    service.refresh_neighbor_table()
+
+    assert service.get_neighbor_addresses() == ["192.0.2.7"]
+    assert service.resolve_mac_address("192.0.2.7") == ("aa:bb:cc:00:00:07", None)
+    assert service.get_neighbor_stats() == NeighborStats(entries=1, hits=1, misses=0)
+
+
+def test_save_mac_preserve_keeps_ping_time_when_missing():
+    database = Database("sqlite:///:memory:")
+    service = MacService(database)
+    service.save_mac(make_address_data(), preserve=False)
+
+    arp_only = AddressData(ip_address="192.0.2.1", mac_address="aa:bb:cc:dd:ee:ff", arp_time_ms=2)
+    updated = service.save_mac(arp_only, preserve=True)
 
-    class FakeLookup:
-        def lookup(self, mac: str) -> str:
-            return "ACME Corp"
+    assert updated.ping_time_ms == 10
+    assert updated.arp_time_ms == 2
 
-    monkeypatch.setattr("app.services.mac_service.MacLookup", lambda: FakeLookup())
+    # A neighbor cache hit sends no ARP and keeps the measured time
+    cached = service.save_mac(AddressData(ip_address="192.0.2.1", mac_address="aa:bb:cc:dd:ee:ff"), preserve=False)
+    assert cached.arp_time_ms == 2
 
-    vendor = service.get_vendor_from_mac("aa:bb:cc:dd:ee:ff")
-    assert vendor == "ACME Corp"
@@ -1,9 +1,17 @@
+import socket
+import struct
 import sys
+import threading
+import time
 from pathlib import Path
+from types import SimpleNamespace
 
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT))
 
+from app.common.objects import PingReply
+from app.common.utilities import ReverseResolver, encode_dns_name
+from app.common.utilities import reverse_resolver as resolver_module
 from app.services import PingService
 
 
@@ -24,3 +32,130 @@ def test_get_os_from_ttl_via_router():
     service = PingService()
     # TTL of 62 (within 60 +/-10) should map via router to Other Linux
     assert "via router" in service.get_os_from_ttl(62)
+
+
+def test_get_ttl_from_ping_reply():
+    service = PingService()
+    reply = PingReply(ip_address="192.0.2.1", rtt_ms=0.4, ttl=128)
+    assert service.get_ttl_from_ping(reply) == 128
+    assert service.get_os_from_ttl(service.get_ttl_from_ping(reply) or 0).startswith("Windows")
+
+
+def test_parse_echo_reply_reads_ttl_from_ip_header():
+    service = PingService()
+    request = service._build_echo_request(identifier=0x1234, sequence=7)  # type: ignore[reportPrivateUsage]
+    assert service._icmp_checksum(request) == 0  # type: ignore[reportPrivateUsage]
+
+    # Turn the request into a reply and prepend a minimal IPv4 header with TTL 57
+    reply = bytes([0]) + request[1:]
+    ip_header = bytes([0x45, 0, 0, 0, 0, 0, 0, 0, 57, 1]) + bytes(10)
+    parsed = service._parse_echo_reply(ip_header + reply, "192.0.2.9", ip_header=True)  # type: ignore[reportPrivateUsage]
+
+    assert parsed is not None
+    assert (parsed.ttl, parsed.identifier, parsed.sequence) == (57, 0x1234, 7)
+    assert service._parse_echo_reply(ip_header + request, "192.0.2.9", ip_header=True) is None  # type: ignore[reportPrivateUsage]
+
+
+def test_get_rtts_from_ping():
+    svc = PingService()
+    output = "64 bytes from 192.0.2.1: icmp_seq=1 ttl=64 time=0.412 ms\n64 bytes from 192.0.2.1: icmp_seq=2 ttl=64 time=1.05 ms\n"
+    assert svc.get_rtts_from_ping(output) == [0.412, 1.05]
+    assert svc.get_rtts_from_ping("Reply from 192.0.2.1: bytes=32 time<1ms TTL=128") == [1.0]
+    assert svc.get_rtts_from_ping(PingReply(ip_address="192.0.2.1", rtt_ms=0.7)) == [0.7]
+
+
+def test_reverse_resolver_queries_stub_server_once_and_caches_answers(monkeypatch):
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    monkeypatch.setattr(resolver_module, "config", SimpleNamespace(
+        dns_server="127.0.0.1", dns_port=server.getsockname()[1], hostname_timeout_ms=1000,
+        dns_cache_max_ttl_s=3600, dns_negative_ttl_s=300, dns_timeout_ttl_s=60,
+    ), raising=False)
+    names = {"5.2.0.192.in-addr.arpa": "printer.lan"}
+    questions: list[str] = []
+
+    def serve(count: int) -> None:
+        for _ in range(count):
+            query, client = server.recvfrom(512)
+            transaction_id = query[:2]
+            question = query[12:]
+            labels, offset = [], 0
+            while question[offset]:
+                labels.append(question[offset + 1:offset + 1 + question[offset]].decode())
+                offset += 1 + question[offset]
+            name = ".".join(labels)
+            questions.append(name)
+            question = question[:offset + 5]
+            if name in names:
+                rdata = encode_dns_name(names[name])
+                answer = b"\xc0\x0c" + struct.pack(">HHIH", 12, 1, 60, len(rdata)) + rdata
+                server.sendto(transaction_id + struct.pack(">HHHHH", 0x8180, 1, 1, 0, 0) + question + answer, client)
+            else:
+                server.sendto(transaction_id + struct.pack(">HHHHH", 0x8183, 1, 0, 0, 0) + question, client)
+
+    thread = threading.Thread(target=serve, args=(2,), daemon=True)
+    thread.start()
+    resolver = ReverseResolver()
+
+    with server:
+        first = resolver.resolve_many(["192.0.2.5", "192.0.2.6"])
+        thread.join(timeout=5)
+        second = resolver.resolve_many(["192.0.2.5", "192.0.2.6"])
+
+    assert first == second == {"192.0.2.5": "printer.lan", "192.0.2.6": None}
+    assert sorted(questions) == ["5.2.0.192.in-addr.arpa", "6.2.0.192.in-addr.arpa"]
+    stats = resolver.get_stats()
+    assert (stats.lookups, stats.cache_hits, stats.queries, stats.answered, stats.timeouts) == (4, 2, 2, 2, 0)
+    assert stats.mean_latency_ms > 0
+
+
+def test_reverse_resolver_remembers_timeouts_briefly(monkeypatch):
+    # Nothing answers on this port, so every query times out
+    silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    silent.bind(("127.0.0.1", 0))
+    monkeypatch.setattr(resolver_module, "config", SimpleNamespace(
+        dns_server="127.0.0.1", dns_port=silent.getsockname()[1], hostname_timeout_ms=100,
+        dns_cache_max_ttl_s=3600, dns_negative_ttl_s=300, dns_timeout_ttl_s=60,
+    ), raising=False)
+    resolver = ReverseResolver()
+
+    with silent:
+        assert resolver.resolve_many(["192.0.2.7", "192.0.2.8"]) == {"192.0.2.7": None, "192.0.2.8": None}
+        assert resolver.resolve("192.0.2.7") is None
+
+    stats = resolver.get_stats()
+    assert (stats.lookups, stats.cache_hits, stats.queries, stats.timeouts) == (3, 1, 2, 2)
+
+
+def test_reverse_resolver_falls_back_to_concurrent_system_lookups(monkeypatch, tmp_path):
+    resolv_conf = tmp_path / "resolv.conf"
+    resolv_conf.write_text("nameserver 2001:db8::53\n")
+    monkeypatch.setattr(resolver_module, "RESOLV_CONF_PATH", str(resolv_conf))
+    monkeypatch.setattr(resolver_module, "config", SimpleNamespace(
+        dns_server="", dns_port=53, hostname_timeout_ms=300,
+        dns_cache_max_ttl_s=3600, dns_negative_ttl_s=300, dns_timeout_ttl_s=60,
+    ), raising=False)
+    release = threading.Event()
+
+    def gethostbyaddr(ip_address: str) -> tuple[str, list[str], list[str]]:
+        if ip_address == "192.0.2.3":
+            release.wait(5)
+        if ip_address == "192.0.2.2":
+            raise socket.herror("unknown host")
+        return f"host-{ip_address.rsplit('.', 1)[1]}.lan", [], [ip_address]
+
+    monkeypatch.setattr(resolver_module.socket, "gethostbyaddr", gethostbyaddr)
+    resolver = ReverseResolver()
+
+    try:
+        start = time.monotonic()
+        answers = resolver.resolve_many(["192.0.2.1", "192.0.2.2", "192.0.2.3"])
+        elapsed = time.monotonic() - start
+        assert resolver.resolve("192.0.2.3") is None
+    finally:
+        release.set()
+
+    assert answers == {"192.0.2.1": "host-1.lan", "192.0.2.2": None, "192.0.2.3": None}
+    assert elapsed < 2
+    stats = resolver.get_stats()
+    assert (stats.lookups, stats.cache_hits, stats.queries, stats.answered, stats.timeouts) == (4, 1, 3, 2, 1)
@@ -1,13 +1,19 @@
+import asyncio
+import socket
+import threading
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT))
 
 from app.common.objects import AddressData, PortInfo, ServiceInfo
+from app.common.utilities import ResourceBudget, ServiceRegistry
 from app.database import Database
 from app.database.models import Port
 from app.services import MacService, PortService
+from app.services import port_service as port_module
 
 
 def test_save_port_persists():
@@ -26,3 +32,145 @@ def test_save_port_persists():
     assert len(found) == 1
     assert found[0].number == 22
     assert found[0].service is not None and 'ssh' in found[0].service
+
+
+def test_scan_ports_async_finds_listening_port():
+    database = Database("sqlite:///:memory:")
+    port_service = PortService(database)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        open_port = listener.getsockname()[1]
+
+        found = asyncio.run(port_service.scan_ports_async("127.0.0.1", [open_port], []))
+
+    assert [port_info.number for port_info in found] == [open_port]
+    assert found[0].protocol == "tcp"
+
+
+def test_scan_tcp_hosts_reports_port_states(monkeypatch):
+    monkeypatch.setattr(port_module, "config", SimpleNamespace(port_scan_timeout_ms=200, tcp_max_in_flight=4, tcp_max_in_flight_per_host=2), raising=False)
+    port_service = PortService(Database("sqlite:///:memory:"))
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as closed:
+        closed.bind(("127.0.0.1", 0))
+        closed_port = closed.getsockname()[1]
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        open_port = listener.getsockname()[1]
+
+        results = port_service.scan_tcp_hosts({"127.0.0.1": [open_port, closed_port], "192.0.2.2": []})
+        open_ports = port_service.scan_ports("127.0.0.1", [open_port, closed_port], [])
+
+    states = {port_info.number: port_info.state for port_info in results["127.0.0.1"]}
+    assert states == {open_port: "open", closed_port: "closed"}
+    assert results["192.0.2.2"] == []
+    assert [port_info.number for port_info in open_ports] == [open_port]
+
+
+def test_port_scans_share_socket_budget(monkeypatch):
+    monkeypatch.setattr(port_module, "config", SimpleNamespace(port_scan_timeout_ms=200, tcp_max_in_flight=64, tcp_max_in_flight_per_host=64), raising=False)
+    budget = ResourceBudget(max_sockets=3, max_subprocesses=1, max_probes=2)
+    port_service = PortService(Database("sqlite:///:memory:"), budget)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        open_port = listener.getsockname()[1]
+        ports = [open_port] + list(range(40000, 40020))
+
+        results = port_service.scan_tcp_hosts({"127.0.0.1": ports})
+        found = asyncio.run(port_service.scan_ports_async("127.0.0.1", ports, []))
+
+    usage = {pool.name: pool for pool in budget.usage()}
+    assert [p.number for p in results["127.0.0.1"] if p.state == "open"] == [open_port]
+    assert [p.number for p in found] == [open_port]
+    assert usage["sockets"].peak <= 3 and usage["sockets"].in_use == 0
+    assert usage["probes"].peak == 2 and usage["probes"].in_use == 0
+
+
+def test_udp_ports_share_one_socket_without_threads(monkeypatch):
+    monkeypatch.setattr(port_module, "config", SimpleNamespace(port_scan_timeout_ms=300, tcp_max_in_flight=4, tcp_max_in_flight_per_host=2), raising=False)
+    budget = ResourceBudget(max_sockets=8, max_subprocesses=1, max_probes=2)
+    port_service = PortService(Database("sqlite:///:memory:"), budget)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as responder, socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as silent:
+        responder.bind(("127.0.0.1", 0))
+        silent.bind(("127.0.0.1", 0))
+        responder.settimeout(2)
+        answering_port, silent_port = responder.getsockname()[1], silent.getsockname()[1]
+
+        def answer() -> None:
+            _, source = responder.recvfrom(1024)
+            responder.sendto(b"pong", source)
+
+        server = threading.Thread(target=answer)
+        server.start()
+        found = port_service.scan_ports("127.0.0.1", [], [answering_port, silent_port])
+        server.join()
+
+    usage = {pool.name: pool for pool in budget.usage()}
+    assert [(p.number, p.protocol) for p in found] == [(answering_port, "udp")]
+    assert usage["sockets"].peak == 1
+
+
+def test_service_registry_merges_sources_by_protocol(tmp_path):
+    etc_services = tmp_path / "services"
+    etc_services.write_text("domain\t53/tcp\n# comment line\nsunrpc\t111/tcp\tportmapper\nwww\t80/tcp\thttp\n")
+    nmap_services = tmp_path / "nmap-services"
+    nmap_services.write_text(
+        "http\t80/tcp\t0.484143\t# World Wide Web HTTP\n"
+        "rpcbind\t111/tcp\t0.042052\n"
+        "unknown\t2222/tcp\t0.000100\n"
+        "snmp\t161/udp\t0.433467\n"
+        "ms-wbt-server\t3389/tcp\t0.083904\n"
+    )
+    registry = ServiceRegistry(nmap_services_path=str(nmap_services), services_paths=(str(etc_services),))
+
+    assert registry.name(53, "tcp") == "dns"
+    assert registry.name(111, "tcp") == "rpcbind"
+    assert registry.name(3389, "tcp") == "rdp"
+    assert registry.name(2222, "tcp") == "unknown"
+    assert registry.name(161, "udp") == "snmp"
+    assert registry.name(111, "udp") == "unknown"
+    assert registry.frequency(161, "udp") == 0.433467
+    assert registry.frequency(161, "tcp") == 0.0
+    assert registry.by_frequency([22, 3389, 111, 80], "tcp") == [80, 3389, 111, 22]
+    assert (registry.kind(8443), registry.kind(22), registry.kind(25), registry.kind(3306)) == ("http", "ssh", "banner", None)
+    assert registry.kind(80, "udp") is None
+
+
+def test_tcp_scans_grab_greeting_on_the_scan_connection(monkeypatch, tmp_path):
+    monkeypatch.setattr(port_module, "config", SimpleNamespace(port_scan_timeout_ms=500, tcp_max_in_flight=4, tcp_max_in_flight_per_host=4, banner_grab_window_ms=300), raising=False)
+    greeting = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    silent = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    for listener in (greeting, silent):
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+    greeting_port, silent_port = greeting.getsockname()[1], silent.getsockname()[1]
+    services_file = tmp_path / "services"
+    services_file.write_text(f"smtp\t{greeting_port}/tcp\nftp\t{silent_port}/tcp\n")
+    port_service = PortService(Database("sqlite:///:memory:"), services=ServiceRegistry(services_paths=(str(services_file),)))
+    accepted: list[socket.socket] = []
+
+    def serve() -> None:
+        for _ in range(2):
+            connection, _ = greeting.accept()
+            connection.sendall(b"220 mail.example ESMTP ready\r\n")
+            accepted.append(connection)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    with greeting, silent:
+        results = port_service.scan_tcp_hosts({"127.0.0.1": [greeting_port, silent_port]})
+        found = asyncio.run(port_service.scan_ports_async("127.0.0.1", [greeting_port], []))
+        thread.join(timeout=5)
+    for connection in accepted:
+        connection.close()
+
+    banners = {port_info.number: (port_info.state, port_info.banner) for port_info in results["127.0.0.1"]}
+    assert banners == {greeting_port: ("open", "220 mail.example ESMTP ready"), silent_port: ("open", None)}
+    assert [(port_info.service, port_info.banner) for port_info in found] == [("smtp", "220 mail.example ESMTP ready")]
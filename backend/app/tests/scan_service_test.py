@@ -1,17 +1,28 @@
 import sys
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
+from types import SimpleNamespace
 
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT))
 
 from typing import List
 
-from app.common.objects import (AddressData, DiscoveryInfo, PortInfo,
-                                ServiceInfo)
+from sqlalchemy import event
+
+import pytest
+
+from app.common.objects import (AddressData, DiscoveryInfo, NeighborStats,
+                                PingReply, PipelineStage, PortInfo, ProbeStage,
+                                ScanOptions, ServiceInfo)
+from app.common.utilities import ResourcePool, StagePipeline, run_probe_graph
 from app.database import Database
-from app.database.models import Mac
-from app.services import MacService, ScanService
+from app.database.models import Discovery, Mac, Port
+from app.services import DiscoveryService, MacService, PortService, ScanService, SuppressionService
+from app.services import scan_service as scan_module
+from app.services import suppression_service as suppression_module
 
 
 def test_get_latest_scan_date():
@@ -30,7 +41,7 @@ def test_get_latest_scan_date():
     mac_svc.save_mac(address_data, preserve=False)
 
     class FakePing:
-        def ping(self, ip_address: str) -> tuple[bool | None, int, str | None]:
+        def ping(self, ip_address: str, once: bool = False) -> tuple[bool | None, int, str | None]:
             # success, rtt_ms, stdout (or None)
             return True, 1, ""
 
@@ -70,13 +81,278 @@ def test_get_latest_scan_date():
         def detect_http(self, ip: str, port: int) -> ServiceInfo | None:
             return None
 
-        def detect_ssh(self, ip: str, port: int) -> ServiceInfo | None:
+        def detect_ssh(self, ip: str, port: int, banner: str | None = None) -> ServiceInfo | None:
             return None
 
-        def detect_banner(self, ip: str, port: int, service_name: str) -> ServiceInfo | None:
+        def detect_banner(self, ip: str, port: int, service_name: str, banner: str | None = None) -> ServiceInfo | None:
             return None
 
-    service = ScanService(database, FakePing(), mac_svc, FakePort(), FakeDiscovery(), FakeProtocol())
+    service = ScanService(database, FakePing(), mac_svc, FakePort(), FakeDiscovery(), FakeProtocol(), SuppressionService(database))
 
     latest = service.get_latest_scan_date()
-    assert isinstance(latest, datetime)
\ No newline at end of file
+    assert isinstance(latest, datetime)
+
+def test_mac_only_scan_uses_single_arp_sweep():
+    database = Database("sqlite:///:memory:")
+
+    class FailingPing:
+        def sweep(self, ip_addresses: list[str], once: set[str] | None = None) -> None:
+            raise AssertionError("basic scans must not send ICMP")
+
+        def ping(self, ip_address: str, once: bool = False) -> None:
+            raise AssertionError("basic scans must not send ICMP")
+
+    class FakeMac:
+        def __init__(self) -> None:
+            self.sweeps: list[list[str]] = []
+
+        def refresh_neighbor_table(self) -> None:
+            pass
+
+        def get_neighbor_stats(self) -> NeighborStats:
+            return NeighborStats()
+
+        def get_neighbor_addresses(self) -> list[str]:
+            return []
+
+        def sweep_arp(self, ip_addresses: list[str]) -> dict[str, tuple[str, int]] | None:
+            self.sweeps.append(ip_addresses)
+            return {"192.168.0.10": ("aa:bb:cc:dd:ee:10", 3)}
+
+    mac_service = FakeMac()
+    service = ScanService(database, FailingPing(), mac_service, None, None, None, SuppressionService(database))  # type: ignore[arg-type]
+
+    devices = service.scan_network(ScanOptions.mac_only())
+
+    assert len(mac_service.sweeps) == 1
+    assert [(device.ip_address, device.mac_address, device.arp_time_ms) for device in devices] == [("192.168.0.10", "aa:bb:cc:dd:ee:10", 3)]
+
+
+def test_save_scan_results_uses_one_transaction():
+    database = Database("sqlite:///:memory:")
+    mac_service = MacService(database)
+    mac_service.save_mac(AddressData(ip_address="192.0.2.1", mac_address="aa:bb:cc:dd:ee:01", ping_time_ms=9, hostname="old"))
+    service = ScanService(database, None, mac_service, PortService(database), DiscoveryService(database), None, SuppressionService(database))  # type: ignore[arg-type]
+
+    commits: list[bool] = []
+    event.listen(database.engine, "commit", lambda connection: commits.append(True))  # type: ignore[reportUnknownLambdaType]
+
+    devices = [
+        AddressData(ip_address=f"192.0.2.{i}", mac_address=f"aa:bb:cc:dd:ee:{i:02x}", ping_time_ms=i,
+                    open_ports=[PortInfo(number=22, service="ssh")],
+                    discovered_info=[DiscoveryInfo(protocol="mdns", device_name=f"device-{i}")])
+        for i in range(1, 6)
+    ]
+    devices.append(AddressData(ip_address="192.0.2.99"))
+    service.save_scan_results(devices, full_scan=True)
+    service.save_scan_results([AddressData(ip_address="192.0.2.1", mac_address="aa:bb:cc:dd:ee:01", open_ports=[PortInfo(number=80, service="http")])], full_scan=True)
+
+    assert len(commits) == 2
+    macs = database.select(Mac).all()
+    assert len(macs) == 5
+    first = mac_service.get_mac_by_address("aa:bb:cc:dd:ee:01")
+    assert first is not None and first.hostname is None
+    assert [port.number for port in database.select(Port).where(Port.mac_id == first.id).all()] == [80]
+    assert len(database.select(Discovery).all()) == 5
+
+
+def test_probe_graph_overlaps_independent_stages():
+    finished: List[str] = []
+    ports_started = threading.Event()
+
+    def mac() -> None:
+        # Only returns if the port stage runs at the same time
+        assert ports_started.wait(5)
+        finished.append("mac")
+
+    def ports() -> None:
+        ports_started.set()
+        finished.append("ports")
+
+    stages = [
+        ProbeStage("mac", mac),
+        ProbeStage("ports", ports),
+        ProbeStage("vendor", lambda: finished.append("vendor"), after=("mac", "ttl")),
+    ]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        run_probe_graph(stages, executor, ResourcePool("probes", 4))
+
+    assert finished == ["ports", "mac", "vendor"]
+
+
+def test_probe_graph_runs_stages_on_the_caller_without_free_probe_slots():
+    threads: List[str] = []
+    slots = ResourcePool("probes", 1)
+    slots.acquire()
+
+    def record() -> None:
+        threads.append(threading.current_thread().name)
+
+    stages = [ProbeStage("mac", record), ProbeStage("ttl", record), ProbeStage("ports", record), ProbeStage("http", record, after=("ports",))]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        run_probe_graph(stages, executor, slots)
+
+    assert threads == [threading.current_thread().name] * 4
+    assert slots.usage().in_use == 1
+
+
+def test_probe_graph_skips_dependents_of_a_failed_stage():
+    finished: List[str] = []
+
+    def fail() -> None:
+        raise OSError("unreachable")
+
+    stages = [
+        ProbeStage("ports", fail),
+        ProbeStage("http", lambda: finished.append("http"), after=("ports",)),
+    ]
+    with ThreadPoolExecutor(max_workers=2) as executor, pytest.raises(OSError):
+        run_probe_graph(stages, executor, ResourcePool("probes", 2))
+
+    assert finished == []
+
+
+def test_stage_pipeline_starts_later_stages_on_the_first_items():
+    first_item_reached_ports = threading.Event()
+
+    def liveness(host: int) -> int | None:
+        if host == 2:
+            # Only returns if host 1 was port scanned while the sweep was still running
+            assert first_item_reached_ports.wait(5)
+        return host if host % 2 else None
+
+    def ports(host: int) -> int:
+        first_item_reached_ports.set()
+        return host * 10
+
+    pipeline = StagePipeline([PipelineStage("liveness", 1, liveness), PipelineStage("ports", 2, ports)], queue_size=1)
+
+    assert sorted(pipeline.run(range(1, 6))) == [10, 30, 50]
+    throughput = {stage.name: stage for stage in pipeline.throughput()}
+    assert (throughput["liveness"].processed, throughput["liveness"].dropped) == (3, 2)
+    assert (throughput["ports"].processed, throughput["ports"].workers) == (3, 2)
+
+
+def test_stage_pipeline_raises_the_first_stage_error():
+    def fail(host: int) -> int:
+        raise OSError("unreachable")
+
+    pipeline = StagePipeline([PipelineStage("ports", 2, fail)], queue_size=1)
+
+    with pytest.raises(OSError):
+        list(pipeline.run(range(100)))
+
+
+def test_full_scans_only_verify_unchanged_hosts(monkeypatch):
+    monkeypatch.setattr(scan_module, "config", SimpleNamespace(incremental_full_scans=True, deep_scan_every=12), raising=False)
+    open_ports = {22, 80}
+    calls: List[str] = []
+
+    class FakePing:
+        def ping(self, ip_address: str, once: bool = False) -> tuple[int, str]:
+            return 1, "ttl=64"
+
+        def get_rtts_from_ping(self, ping_result: str) -> list[float]:
+            return [1.0]
+
+        def get_ttl_from_ping(self, ping_result: str) -> int | None:
+            return 64
+
+    class FakeMac:
+        def resolve_mac_address(self, ip_address: str) -> tuple[str, int]:
+            return "aa:bb:cc:dd:ee:20", 1
+
+    class FakePort:
+        def scan_ports(self, ip_address: str, ports: list[int], udp_ports: list[int]) -> list[PortInfo]:
+            calls.append("scan_ports")
+            return [PortInfo(number=port) for port in sorted(open_ports)]
+
+        def scan_tcp_hosts(self, targets: dict[str, list[int]]) -> dict[str, list[PortInfo]]:
+            calls.append("verify")
+            return {ip: [PortInfo(number=port, state="open" if port in open_ports else "closed") for port in ports] for ip, ports in targets.items()}
+
+    class FakeProtocol:
+        def detect_http_many(self, targets: list[tuple[str, int]]) -> dict[tuple[str, int], ServiceInfo]:
+            calls.append("http")
+            return {target: ServiceInfo(service_name="http", product="nginx") for target in targets}
+
+    class FakeDiscovery:
+        def discover_mdns(self, ip_address: str) -> DiscoveryInfo | None:
+            calls.append("mdns")
+            return DiscoveryInfo(protocol="mdns", device_name="printer")
+
+    database = Database("sqlite:///:memory:")
+    service = ScanService(database, FakePing(), FakeMac(), FakePort(), FakeDiscovery(), FakeProtocol(), SuppressionService(database))  # type: ignore[arg-type]
+    options = ScanOptions(mac_resolution=True, ttl_resolution=True, port_scan=True, detect_http=True, discover_mdns=True)
+
+    first = service.scan_ip("192.0.2.20", options)
+    assert sorted(calls) == ["http", "mdns", "scan_ports"]
+
+    calls.clear()
+    second = service.scan_ip("192.0.2.20", options)
+    assert calls == ["verify"]
+    assert second is not None and first is not None
+    assert [port.number for port in second.open_ports] == [22, 80]
+    assert second.services_info == first.services_info
+    assert second.discovered_info == first.discovered_info
+
+    # A known port closing makes the host due for a deep scan again
+    open_ports.discard(80)
+    calls.clear()
+    third = service.scan_ip("192.0.2.20", options)
+    assert sorted(calls) == ["mdns", "scan_ports", "verify"]
+    assert third is not None and [port.number for port in third.open_ports] == [22]
+
+
+def test_dead_addresses_get_single_probes_at_growing_intervals(monkeypatch):
+    monkeypatch.setattr(scan_module, "config", SimpleNamespace(icmp_sweep=True, discovery_sweeps=False, scan_order="host", max_threads=4), raising=False)
+    monkeypatch.setattr(suppression_module, "config", SimpleNamespace(
+        dead_address_suppression=True, dead_address_misses=2, dead_address_min_interval_s=60, dead_address_max_interval_s=600,
+    ), raising=False)
+    sweeps: list[tuple[list[str], set[str]]] = []
+
+    class FakePing:
+        def sweep(self, ip_addresses: list[str], once: set[str] | None = None) -> dict[str, PingReply]:
+            sweeps.append((ip_addresses, once or set()))
+            return {"192.0.2.1": PingReply(ip_address="192.0.2.1", rtt_ms=1.0, ttl=64)}
+
+        def get_rtts_from_ping(self, ping_result: PingReply) -> list[float]:
+            return [ping_result.rtt_ms]
+
+    database = Database("sqlite:///:memory:")
+    service = ScanService(database, FakePing(), None, None, None, None, SuppressionService(database))  # type: ignore[arg-type]
+    ip_range = ["192.0.2.1", "192.0.2.2"]
+
+    # Two misses suppress the dead address: it gets one single-packet probe, then waits
+    for _ in range(3):
+        assert [device.ip_address for device in service.scan_network_stream(ScanOptions(), ip_range)] == ["192.0.2.1"]
+    assert sweeps == [(ip_range, set()), (ip_range, set()), (["192.0.2.1"], set())]
+
+    # The suppressed address is probed once again when its next probe is due
+    monkeypatch.setattr(suppression_module, "datetime", SimpleNamespace(now=lambda: datetime.now() + timedelta(seconds=61)))
+    list(service.scan_network_stream(ScanOptions(), ip_range))
+    assert sweeps[-1] == (ip_range, {"192.0.2.2"})
+
+
+def test_stage_throughput_only_reports_the_current_scan(monkeypatch):
+    scan_config = SimpleNamespace(
+        icmp_sweep=True, discovery_sweeps=False, scan_order="stage", max_threads=4, pipeline_queue_size=4,
+        pipeline_liveness_workers=1, pipeline_link_workers=1, pipeline_port_workers=1, pipeline_service_workers=1, pipeline_discovery_workers=1,
+    )
+    monkeypatch.setattr(scan_module, "config", scan_config, raising=False)
+
+    class FakePing:
+        def sweep(self, ip_addresses: list[str], once: set[str] | None = None) -> dict[str, PingReply]:
+            return {ip: PingReply(ip_address=ip, rtt_ms=1.0, ttl=64) for ip in ip_addresses}
+
+        def get_rtts_from_ping(self, ping_result: PingReply) -> list[float]:
+            return [ping_result.rtt_ms]
+
+    database = Database("sqlite:///:memory:")
+    service = ScanService(database, FakePing(), None, None, None, None, SuppressionService(database))  # type: ignore[arg-type]
+    list(service.scan_network_stream(ScanOptions(), ["192.0.2.1"]))
+    assert [stage.processed for stage in service.get_stage_throughput()][0] == 1
+
+    scan_config.scan_order = "host"
+    list(service.scan_network_stream(ScanOptions(), ["192.0.2.1"]))
+    assert service.get_stage_throughput() == []
@@ -0,0 +1,85 @@
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from collections.abc import Iterator
+
+from app.common.objects import AddressData, ScanOptions
+from app.common.utilities import HostScheduler
+from app.services import scanning_service as scanning_module
+from app.services import ScanningService
+
+
+def test_perform_scan_saves_hosts_while_scan_is_running(monkeypatch):
+    monkeypatch.setattr(scanning_module, "config", SimpleNamespace(
+        scan_check_interval_s=10,
+        background_scan_interval_s=60,
+        background_full_scan_interval_s=300,
+        scan_result_queue_size=2,
+        scan_save_batch_size=2,
+    ), raising=False)
+
+    class FakeScan:
+        def __init__(self) -> None:
+            self.saved: list[list[str]] = []
+            self.first_save = threading.Event()
+            self.saved_before_scan_finished = False
+
+        def scan_network_stream(self, scan_options: ScanOptions, ip_addresses: list[str] | None = None) -> Iterator[AddressData]:
+            yield AddressData(ip_address="192.0.2.1", mac_address="aa:bb:cc:dd:ee:01")
+            self.saved_before_scan_finished = self.first_save.wait(timeout=5)
+            for i in range(2, 6):
+                yield AddressData(ip_address=f"192.0.2.{i}", mac_address=f"aa:bb:cc:dd:ee:{i:02x}")
+
+        def save_scan_results(self, devices: list[AddressData], full_scan: bool) -> None:
+            self.saved.append([device.ip_address for device in devices])
+            self.first_save.set()
+
+    scan_service = FakeScan()
+    service = ScanningService(scan_service)  # type: ignore[arg-type]
+
+    service._perform_scan(full_scan=True)
+
+    assert scan_service.saved_before_scan_finished
+    assert all(len(batch) <= 2 for batch in scan_service.saved)
+    assert sorted(ip for batch in scan_service.saved for ip in batch) == [f"192.0.2.{i}" for i in range(1, 6)]
+    assert service.last_scan_count == 5
+    assert service.last_scan_time is not None
+    assert not service.is_scanning
+
+
+def test_host_scheduler_adapts_intervals_per_host():
+    stable, moved, empty = "192.0.2.1", "192.0.2.2", "192.0.2.3"
+    scheduler = HostScheduler([stable, moved, empty], base_interval_s=60, min_interval_s=20, max_interval_s=600, dead_max_interval_s=3600, now=0)
+
+    # First results just set the base interval
+    assert scheduler.pop_due(59) == []
+    assert scheduler.pop_due(65) == [stable, moved, empty]
+    scheduler.record(stable, "aa:bb:cc:dd:ee:01", 65)
+    scheduler.record(moved, "aa:bb:cc:dd:ee:02", 65)
+    scheduler.record(empty, None, 65)
+
+    assert scheduler.pop_due(125) == [stable, moved, empty]
+    scheduler.record(stable, "aa:bb:cc:dd:ee:01", 125)  # unchanged: 90 s
+    scheduler.record(moved, "aa:bb:cc:dd:ee:99", 125)  # new MAC: 20 s
+    scheduler.record(empty, None, 125)  # still silent: 120 s
+
+    assert scheduler.pop_due(145) == [moved]
+    scheduler.record(moved, "aa:bb:cc:dd:ee:99", 145)  # settling: 30 s
+    assert scheduler.pop_due(215) == [moved, stable]
+    scheduler.record(moved, "aa:bb:cc:dd:ee:99", 215)
+    scheduler.record(stable, "aa:bb:cc:dd:ee:01", 215)
+
+    # Neighbor activity makes the silent address due at once
+    scheduler.pull_forward(empty, 220)
+    assert scheduler.pop_due(220) == [empty]
+    assert scheduler.pop_due(10_000) == [moved, stable]
+
+    stats = scheduler.stats(10_000)
+    assert stats.queue_depth == 0
+    assert stats.pulled_forward == 1
+    assert stats.max_lateness_s > 9_000
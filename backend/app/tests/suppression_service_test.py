@@ -0,0 +1,50 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from app.database import Database
+from app.database.models import UnresponsiveAddress
+from app.services import SuppressionService
+from app.services import suppression_service as suppression_module
+
+
+def test_dead_addresses_back_off_and_survive_restarts(monkeypatch):
+    monkeypatch.setattr(suppression_module, "config", SimpleNamespace(
+        dead_address_suppression=True, dead_address_misses=2, dead_address_min_interval_s=60, dead_address_max_interval_s=200,
+    ), raising=False)
+    database = Database("sqlite:///:memory:")
+    service = SuppressionService(database)
+    dead, live = "192.0.2.10", "192.0.2.11"
+
+    # One miss is not enough to stop paying for the full check
+    service.record(dead, alive=False)
+    service.record(live, alive=True)
+    assert service.filter_due([dead, live]) == [dead, live]
+    assert not service.is_suppressed(dead)
+
+    waits = []
+    for _ in range(3):
+        service.record(dead, alive=False)
+        service.save()
+        row = database.select(UnresponsiveAddress).first()
+        assert row is not None and row.next_probe_at is not None
+        waits.append(round((row.next_probe_at - datetime.now()).total_seconds() / 10) * 10)
+    assert waits == [60, 120, 200]
+    assert row.misses == 4
+
+    # A restarted service reads the table back
+    restarted = SuppressionService(database)
+    assert restarted.is_suppressed(dead)
+    assert restarted.filter_due([dead, live]) == [live]
+    assert restarted.get_suppressed_count() == 1
+
+    # A passive sign of life clears the address at once
+    restarted.revive([dead])
+    restarted.save()
+    assert database.select(UnresponsiveAddress).all() == []
+    assert restarted.filter_due([dead, live]) == [dead, live]
+    assert not restarted.is_suppressed(dead)
@@ -0,0 +1,69 @@
+"""
+Measure how many mDNS responses per second the DNS message parser decodes.
+
+The packets are recorded responses from a printer (PTR/SRV/TXT/A with name
+compression), a media player and a service enumeration reply. Each is parsed
+and turned into DiscoveryInfo the same way the mDNS sweep does:
+
+    cd backend
+    python -m benchmarks.dns_parser_benchmark --iterations 50000
+
+A busy multicast segment delivers a few thousand mDNS packets per second, so
+the decode rate should stay well above that on one core.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.common.utilities import parse_dns_message
+from app.database import Database
+from app.services import DiscoveryService
+
+RECORDED_PACKETS = {
+    "printer": bytes.fromhex(
+        "000084000000000400000000045f697070045f746370056c6f63616c00000c000100000078000d0a4f6666696365204a6574c00c"
+        "c02700210001000000780011000000000277087072696e74657231c016c0270010000100000078002809747874766572733d310d"
+        "74793d4c617365724a657420340f7573625f4d46473d41636d6520436f087072696e74657231056c6f63616c0000010001000000"
+        "780004c0000214"
+    ),
+    "media player": bytes.fromhex(
+        "0000840000000004000000000b5f676f6f676c6563617374045f746370056c6f63616c00000c000100000078000e0b4c6976696e"
+        "6720526f6f6dc00cc02e00210001000000780018000000001f490f4368726f6d65636173742d31613262c01dc02e001000010000"
+        "0078002d0d6d643d4368726f6d65636173740e666e3d4c6976696e6720526f6f6d0572733d6f6e0963613d3230313232310f4368"
+        "726f6d65636173742d31613262056c6f63616c0000010001000000780004c000021f"
+    ),
+    "service enumeration": bytes.fromhex(
+        "000084000000000400000000095f7365727669636573075f646e732d7364045f756470056c6f63616c00000c0001000000780012"
+        "055f68747470045f746370056c6f63616c00c00c000c0001000000780015085f616972706c6179045f746370056c6f63616c00c0"
+        "0c000c0001000000780012055f72616f70045f746370056c6f63616c00c00c000c00010000007800190c5f6465766963652d696e"
+        "666f045f746370056c6f63616c00"
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    service = DiscoveryService(Database("sqlite:///:memory:"))
+    print(f"\n{'packet':<20} {'bytes':>6} {'parse/s':>10} {'info/s':>10}")
+    for name, packet in RECORDED_PACKETS.items():
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            parse_dns_message(packet)
+        parse_rate = args.iterations / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            service._mdns_info(packet, "192.0.2.20")
+        info_rate = args.iterations / (time.perf_counter() - start)
+
+        print(f"{name:<20} {len(packet):>6} {parse_rate:>10.0f} {info_rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measure MAC vendor lookup throughput and memory of the in-memory OUI index.
+
+The registry is whatever MacService would load (oui_registry_paths, or the
+mac_vendor_lookup vendor list), and the addresses are random MACs built from
+registered prefixes plus a share of randomized ones:
+
+    cd backend
+    python -m benchmarks.oui_index_benchmark --lookups 200000
+
+Reported: index load time and size, traced Python memory and resident set
+growth of the loaded index, lookups per second for single and bulk lookups,
+and the previous per-call MacLookup() path for comparison.
+"""
+import argparse
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.common.utilities import OuiIndex
+
+
+def resident_kib() -> int:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def random_macs(index: OuiIndex, count: int) -> list[str]:
+    prefixes = [(bits, prefix) for bits, block in index._index for prefix in block]
+    macs: list[str] = []
+    for _ in range(count):
+        if random.random() < 0.1:
+            value = (random.getrandbits(48) & ~(0x01 << 40)) | (0x02 << 40)
+        else:
+            bits, prefix = random.choice(prefixes)
+            value = (prefix << (48 - bits)) | random.getrandbits(48 - bits)
+        macs.append(":".join(f"{value:012x}"[i:i + 2] for i in range(0, 12, 2)))
+    return macs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--legacy-lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    rss_before = resident_kib()
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = OuiIndex()
+    index.lookup("00:00:00:00:00:00")
+    load_s = time.perf_counter() - start
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = resident_kib()
+
+    print(f"\nIndex: {index.size()} prefixes loaded in {load_s * 1000:.0f}ms, "
+          f"{traced / 1024:.0f} KiB traced, {rss_after - rss_before} KiB resident growth")
+
+    macs = random_macs(index, args.lookups)
+
+    start = time.perf_counter()
+    found = sum(1 for mac in macs if index.lookup(mac))
+    single_rate = len(macs) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    index.lookup_many(macs)
+    bulk_rate = len(macs) / (time.perf_counter() - start)
+
+    print(f"{'path':<22} {'lookups/s':>12}")
+    print(f"{'OuiIndex.lookup':<22} {single_rate:>12.0f}")
+    print(f"{'OuiIndex.lookup_many':<22} {bulk_rate:>12.0f}")
+    print(f"({found}/{len(macs)} addresses matched a vendor or were locally administered)")
+
+    try:
+        from mac_vendor_lookup import MacLookup  # type: ignore
+    except ImportError:
+        return
+
+    legacy = macs[:args.legacy_lookups]
+    start = time.perf_counter()
+    for mac in legacy:
+        try:
+            MacLookup().lookup(mac)
+        except Exception:
+            pass
+    print(f"{'MacLookup() per call':<22} {len(legacy) / (time.perf_counter() - start):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare the threaded and asyncio scan engines on the same target list.
+
+The target list is the configured scan range, so it can be pointed at any network
+through the usual settings. By default it scans a loopback range, which needs no
+network access:
+
+    cd backend
+    SUBNET=127.0.0 MAX_SCAN_IP=64 python -m benchmarks.scan_engine_benchmark --options ports
+
+Reported per engine: wall time, peak thread count and peak traced Python memory.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("SUBNET", "127.0.0")
+os.environ.setdefault("MIN_SCAN_IP", "1")
+os.environ.setdefault("MAX_SCAN_IP", "32")
+
+from app.common.objects import ScanOptions
+from app.database import Database
+from app.services import *
+
+SCAN_OPTIONS = {
+    "basic": ScanOptions.mac_only,
+    "ports": lambda: ScanOptions(ttl_resolution=True, os_detection=True, port_scan=True, detect_http=True, detect_ssh=True, detect_banners=True),
+    "full": ScanOptions.full_scan,
+}
+
+
+class ThreadSampler:
+    """Samples the process thread count in the background."""
+
+    def __init__(self, interval_s: float = 0.01) -> None:
+        self.interval_s = interval_s
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "ThreadSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.peak = max(self.peak, threading.active_count())
+
+
+def run_engine(scan_service_type: type[ScanService], options: ScanOptions) -> tuple[float, int, int, int]:
+    database = Database("sqlite:///:memory:")
+    service = scan_service_type(
+        database, PingService(), MacService(database), PortService(database), DiscoveryService(database), ProtocolService(),
+        SuppressionService(database),
+    )
+
+    tracemalloc.start()
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        devices = service.scan_network(options)
+        elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The sampler thread itself is not part of the engine
+    return elapsed, sampler.peak - 1, peak_memory, len(devices)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--options", choices=SCAN_OPTIONS.keys(), default="ports")
+    args = parser.parse_args()
+
+    options = SCAN_OPTIONS[args.options]()
+    print(f"\nTarget range: {os.environ['SUBNET']}.{os.environ['MIN_SCAN_IP']}-{os.environ['MAX_SCAN_IP']} ({args.options})")
+    print(f"{'engine':<10} {'wall s':>8} {'threads':>8} {'peak KiB':>10} {'hosts':>6}")
+    for name, scan_service_type in (("threaded", ScanService), ("asyncio", AsyncScanService)):
+        elapsed, threads, memory, hosts = run_engine(scan_service_type, options)
+        print(f"{name:<10} {elapsed:>8.2f} {threads:>8} {memory / 1024:>10.0f} {hosts:>6}")
+
+
+if __name__ == "__main__":
+    main()
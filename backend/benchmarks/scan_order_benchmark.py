@@ -0,0 +1,75 @@
+"""
+Compare host-major and stage-major scans of the same target list, end to end.
+
+Host-major is the default loop: every host runs all of its probes before its
+thread takes the next host. Stage-major (SCAN_ORDER=stage) sweeps each stage
+across all live hosts, with a worker pool per stage and bounded queues between
+them. Like the engine benchmark it scans the configured range, a loopback range
+by default:
+
+    cd backend
+    SUBNET=127.0.0 MAX_SCAN_IP=64 python -m benchmarks.scan_order_benchmark --options ports
+
+Reported per order: wall time, hosts per second and peak thread count, followed
+by the per-stage throughput counters of the stage-major run.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("SUBNET", "127.0.0")
+os.environ.setdefault("MIN_SCAN_IP", "1")
+os.environ.setdefault("MAX_SCAN_IP", "32")
+
+from app import config
+from app.common.constants import *
+from app.common.objects import ScanOptions, StageThroughput
+from app.database import Database
+from app.services import *
+from benchmarks.scan_engine_benchmark import SCAN_OPTIONS, ThreadSampler
+
+
+def run_order(scan_order: str, options: ScanOptions) -> tuple[float, int, int, list[StageThroughput]]:
+    # Settings are read when used, so switching the loaded config switches the loop
+    config._config.scan_order = scan_order
+    database = Database("sqlite:///:memory:")
+    service = ScanService(
+        database, PingService(), MacService(database), PortService(database), DiscoveryService(database), ProtocolService(),
+        SuppressionService(database),
+    )
+
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        devices = service.scan_network(options)
+        elapsed = time.perf_counter() - start
+
+    # The sampler thread itself is not part of the scan
+    return elapsed, sampler.peak - 1, len(devices), service.get_stage_throughput()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--options", choices=SCAN_OPTIONS.keys(), default="ports")
+    args = parser.parse_args()
+
+    options = SCAN_OPTIONS[args.options]()
+    print(f"\nTarget range: {os.environ['SUBNET']}.{os.environ['MIN_SCAN_IP']}-{os.environ['MAX_SCAN_IP']} ({args.options})")
+    print(f"{'order':<8} {'wall s':>8} {'hosts/s':>8} {'threads':>8} {'hosts':>6}")
+    stages: list[StageThroughput] = []
+    for scan_order in (SCAN_ORDER_HOST, SCAN_ORDER_STAGE):
+        elapsed, threads, hosts, throughput = run_order(scan_order, options)
+        stages = throughput or stages
+        print(f"{scan_order:<8} {elapsed:>8.2f} {hosts / elapsed:>8.1f} {threads:>8} {hosts:>6}")
+
+    print(f"\n{'stage':<10} {'workers':>8} {'passed':>7} {'dropped':>8} {'busy s':>8} {'hosts/s':>8}")
+    for stage in stages:
+        rate = stage.processed / stage.elapsed_s if stage.elapsed_s else 0.0
+        print(f"{stage.name:<10} {stage.workers:>8} {stage.processed:>7} {stage.dropped:>8} {stage.busy_s:>8.2f} {rate:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
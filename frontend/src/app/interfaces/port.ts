@@ -7,5 +7,10 @@ export interface Port {
   service: string;
   banner?: string;
   state: string;
+  tls_subject?: string;
+  tls_issuer?: string;
+  tls_san?: string;
+  tls_not_after?: string;
+  tls_sha256?: string;
   mac: Mac;
 }